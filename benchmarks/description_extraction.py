@@ -0,0 +1,108 @@
+"""Compares the extraction of the items descriptions by BeautifulSoup with first_link_text.
+Verifies both produce the same descriptions, and reports the time per description.
+The corpus is the descriptions of the given feeds [urls or files], for example:
+
+    $ python benchmarks/description_extraction.py --rounds 20 \
+          https://news.google.com/rss https://hnrss.org/frontpage https://www.reddit.com/r/python/.rss
+
+Without feeds, a built-in sample of descriptions in the styles of common feeds is used.
+"""
+
+import argparse
+import itertools
+import timeit
+from typing import Callable, List
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from contentaggregator.lib.feeds.htmltext import first_link_text
+
+SAMPLE_DESCRIPTIONS = [
+    # Aggregators, a list of links to the sources.
+    '<ol><li><a href="https://news.example.com/articles/1?oc=5" target="_blank">'
+    "Markets rally as inflation cools &amp; rates hold</a>&nbsp;&nbsp;"
+    '<font color="#6f6f6f">The Example Times</font></li><li>'
+    '<a href="https://news.example.com/articles/2?oc=5" target="_blank">'
+    "What the rate decision means for you</a>&nbsp;&nbsp;"
+    '<font color="#6f6f6f">Example Daily</font></li></ol>',
+    # Blogs, the excerpt followed by a "read more" link.
+    "<p>In this post we look at how the new release speeds up the startup time "
+    "by lazily importing the plugins, and what it means for the &#8220;cold&#8221; starts "
+    'of the command line tools.</p><p>The post <a rel="nofollow" '
+    'href="https://blog.example.com/faster-startup/">Faster startup</a> '
+    'appeared first on <a rel="nofollow" href="https://blog.example.com">Example Blog</a>.</p>',
+    # Communities, a table with a thumbnail and the submitter.
+    '<table><tr><td><a href="https://community.example.com/r/python/comments/abc/">'
+    '<img src="https://img.example.com/abc.jpg" alt="thumbnail" title="What are you working on?"/>'
+    '</a></td><td> submitted by <a href="https://community.example.com/user/someone">'
+    " /u/someone </a> <br/> <span><a href=\"https://community.example.com/r/python/comments/abc/\">"
+    "[link]</a></span></td></tr></table>",
+    # News sites, plain text.
+    "The committee said on Tuesday that it will publish its findings next month, "
+    "after reviewing more than 2,000 submissions from the public.",
+    # Podcasts, html without links.
+    "<p>This week: the history of the <em>transistor</em>, and why it took "
+    "<strong>twenty years</strong> to reach the radio.</p>",
+]
+
+
+def soup_extraction(description: str) -> str:
+    """Extracts the description like XMLFeedItem did by BeautifulSoup."""
+    description_soup = BeautifulSoup(description, "html.parser")
+    if description_str := description_soup.find("a"):
+        return description_str.text.strip()
+    return description
+
+
+def fast_extraction(description: str) -> str:
+    """Extracts the description like XMLFeedItem does by first_link_text."""
+    link_text = first_link_text(description)
+    return description if link_text is None else link_text
+
+
+def load_corpus(feeds: List[str], size: int) -> List[str]:
+    """Collects the descriptions of the items of the given feeds.
+
+    Args:
+        feeds (List[str]): Urls or paths of the feeds, the built-in sample is used if empty.
+        size (int): The number of descriptions, the collected ones are repeated to fill it.
+
+    Returns:
+        List[str]: The descriptions.
+    """
+    descriptions = [
+        entry.description
+        for feed in feeds
+        for entry in feedparser.parse(feed).entries
+        if entry.get("description")
+    ] or SAMPLE_DESCRIPTIONS
+    return list(itertools.islice(itertools.cycle(descriptions), size))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("feeds", nargs="*")
+    parser.add_argument("--descriptions", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    corpus = load_corpus(args.feeds, args.descriptions)
+    mismatches = [
+        description
+        for description in corpus
+        if soup_extraction(description) != fast_extraction(description)
+    ]
+    print(f"{len(corpus)} descriptions, {len(mismatches)} mismatches")
+    extract: Callable[[str], str]
+    for name, extract in (("soup", soup_extraction), ("fast", fast_extraction)):
+        seconds = timeit.timeit(
+            lambda: [extract(description) for description in corpus],
+            number=args.rounds,
+        )
+        print(
+            f"{name:>5}: {seconds / args.rounds / len(corpus) * 10**6:8.1f} us/description"
+        )
+
+
+if __name__ == "__main__":
+    main()
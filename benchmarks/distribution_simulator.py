@@ -0,0 +1,423 @@
+"""Simulates the distribution system end to end, under a synthetic load.
+Seeds users with a realistic spread of sending times and feeds into the configured database,
+serves the feeds from a local RSS server and accepts the messages by a local SMTP sink,
+then runs a Messenger in accelerated time and reports its throughput, lateness and memory.
+
+The seeded rows replace the ones of the previous simulation, so it should run against
+a dedicated database, for example:
+
+    $ DATABASE_NAME=contentaggregator_sim python benchmarks/distribution_simulator.py \
+          --users 5000 --feeds 200 --hours 3 --speed 60 --feed-latency 0.2
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import queue
+import random
+import resource
+import socketserver
+import statistics
+import threading
+import time
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+from contentaggregator.lib import config
+from contentaggregator.lib.distributionsystem import Messenger
+from contentaggregator.lib.metrics import METRICS
+from contentaggregator.lib.smtppool import SMTPSessionPool
+from contentaggregator.lib.sqlmanagement import databaseapi
+from contentaggregator.lib.sqlmanagement.databasecursor import MySQLCursorCM
+from contentaggregator.lib.user.userauthentications.pwdhandler import encrypt_password
+from contentaggregator.lib.user.userproperties import address
+from contentaggregator.lib.user.userproperties.time import (
+    DAILY_DAYS,
+    MINUTES_IN_DAY,
+    Time,
+    Timing,
+)
+
+# Usernames are limited to 8 characters, so up to 99999 simulated users.
+USERNAME_PREFIX = "sim"
+EMAIL_DOMAIN = "sim.test"
+# Monday, so that the daily schedule [all days but saturday] sends at every simulated day.
+SIMULATION_START_DATE = datetime.date(2024, 1, 1)
+
+
+class SimulatedClock:
+    """A clock that runs speed times faster than real time, from the given start time."""
+
+    def __init__(self, start: datetime.datetime, speed: float) -> None:
+        """
+        Args:
+            start (datetime.datetime): Naive UTC time the clock starts at.
+            speed (float): How many simulated seconds pass in a real second.
+        """
+        self.start = start
+        self.speed = speed
+        self.real_start = time.time()
+
+    def __call__(self) -> datetime.datetime:
+        return self.start + datetime.timedelta(
+            seconds=(time.time() - self.real_start) * self.speed
+        )
+
+
+def random_sending_minute() -> int:
+    """Draws a sending minute of the day, most users read their feeds in the morning.
+
+    Returns:
+        int: Minutes since midnight.
+    """
+    if random.random() < 0.7:
+        return int(random.gauss(7.5 * 60, 45)) % MINUTES_IN_DAY
+    if random.random() < 0.5:
+        return int(random.gauss(19 * 60, 60)) % MINUTES_IN_DAY
+    return random.randrange(MINUTES_IN_DAY)
+
+
+def rss_document(feed_id: int, items_number: int, description_size: int) -> bytes:
+    """Generates a synthetic RSS document.
+
+    Args:
+        feed_id (int): The id of the feed, used in it's titles and links.
+        items_number (int): The number of the items of the feed.
+        description_size (int): The size of each item description, in characters.
+
+    Returns:
+        bytes: The RSS document.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    description = ("lorem ipsum " * (description_size // 12 + 1))[:description_size]
+    items = "".join(
+        f"<item><title>Item {item} of feed {feed_id}</title>"
+        f"<link>http://{EMAIL_DOMAIN}/{feed_id}/{item}</link>"
+        f"<description>{description}</description>"
+        f"<pubDate>{format_datetime(now - datetime.timedelta(hours=item))}</pubDate></item>"
+        for item in range(items_number)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Feed {feed_id}</title><link>http://{EMAIL_DOMAIN}/{feed_id}</link>"
+        f"<description>Synthetic feed {feed_id}</description>{items}</channel></rss>"
+    ).encode()
+
+
+def serve_rss(
+    port: int, latency: float, items_number: int, description_size: int
+) -> ThreadingHTTPServer:
+    """Serves synthetic RSS feeds at http://localhost:<port>/<feed id>, in a background thread.
+
+    Args:
+        port (int): The port to listen on.
+        latency (float): Delay of each response, in seconds.
+        items_number (int): The number of the items of each feed.
+        description_size (int): The size of each item description, in characters.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+
+    class RSSHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            body = rss_document(
+                int(self.path.strip("/") or 0), items_number, description_size
+            )
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("localhost", port), RSSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_smtp_sink(
+    port: int, on_message: Callable[[str], None]
+) -> socketserver.ThreadingTCPServer:
+    """Accepts SMTP messages at localhost:<port> and discards them, in a background thread.
+    Supports just the commands sent by yagmail without login and TLS.
+
+    Args:
+        port (int): The port to listen on.
+        on_message (Callable[[str], None]): Called with the recipient of each accepted message.
+
+    Returns:
+        socketserver.ThreadingTCPServer: The running server.
+    """
+
+    class SMTPSinkHandler(socketserver.StreamRequestHandler):
+        def reply(self, line: str) -> None:
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self) -> None:
+            self.reply("220 localhost SMTP sink")
+            recipients: List[str] = []
+            while line := self.rfile.readline():
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+                if verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    while self.rfile.readline() not in (b".\r\n", b""):
+                        pass
+                    for recipient in recipients:
+                        on_message(recipient)
+                    recipients.clear()
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.partition(":")[2].strip(" <>"))
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                elif verb == "RSET":
+                    recipients.clear()
+                    self.reply("250 OK")
+                else:
+                    self.reply("250 OK")
+
+    class SMTPSinkServer(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    server = SMTPSinkServer(("localhost", port), SMTPSinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_servers(
+    args: argparse.Namespace,
+    clock: SimulatedClock,
+    received: multiprocessing.Queue,
+    ready: multiprocessing.Event,
+) -> None:
+    """Runs the RSS server and the SMTP sink, in a process of their own,
+    so they are not counted in the memory of the Messenger.
+
+    Args:
+        args (argparse.Namespace): The simulation arguments.
+        clock (SimulatedClock): The simulated clock, to timestamp the received messages by.
+        received (multiprocessing.Queue): Receives a tuple of recipient and simulated time per message.
+        ready (multiprocessing.Event): Set once the servers listen.
+    """
+    serve_rss(args.rss_port, args.feed_latency, args.feed_items, args.description_size)
+    serve_smtp_sink(
+        args.smtp_port, lambda recipient: received.put((recipient, clock()))
+    )
+    ready.set()
+    threading.Event().wait()
+
+
+def seed(args: argparse.Namespace, start: datetime.datetime) -> Dict[str, int]:
+    """Replaces the users and feeds of the previous simulation by new ones.
+
+    Args:
+        args (argparse.Namespace): The simulation arguments.
+        start (datetime.datetime): Naive UTC time the simulation starts at.
+
+    Returns:
+        Dict[str, int]: The email address of each user as keys, and it's sending minute as values.
+    """
+    users_columns = config.USERS_DATA_COLUMNS
+    feeds_columns = config.FEEDS_DATA_COLUMNS
+    feeds_url_prefix = f"http://localhost:{args.rss_port}/"
+    databaseapi.delete(
+        table=config.DATABASE_TABLES_NAMES.outbox_table,
+        condition_expr=f"{config.OUTBOX_DATA_COLUMNS.user_id} IN "
+        f"(SELECT {users_columns.id} FROM {config.DATABASE_TABLES_NAMES.users_table} "
+        f"WHERE {users_columns.username} LIKE '{USERNAME_PREFIX}%')",
+    )
+    databaseapi.delete(
+        table=config.DATABASE_TABLES_NAMES.users_table,
+        condition_expr=f"{users_columns.username} LIKE '{USERNAME_PREFIX}%'",
+    )
+    databaseapi.delete(
+        table=config.DATABASE_TABLES_NAMES.feeds_table,
+        condition_expr=f"{feeds_columns.link} LIKE '{feeds_url_prefix}%'",
+    )
+    with MySQLCursorCM() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {config.DATABASE_TABLES_NAMES.feeds_table} "
+            f"({feeds_columns.link}, {feeds_columns.rating}, {feeds_columns.feed_type}, "
+            f"{feeds_columns.categories}, {feeds_columns.items_size}) "
+            "VALUES (%s, 0, %s, '[]', %s)",
+            [
+                (f"{feeds_url_prefix}{feed_number}", config.FEED_TYPES.xml, args.feed_items)
+                for feed_number in range(args.feeds)
+            ],
+        )
+    feeds_ids = [
+        feed_id
+        for (feed_id,) in databaseapi.select(
+            cols=feeds_columns.id,
+            table=config.DATABASE_TABLES_NAMES.feeds_table,
+            condition_expr=f"{feeds_columns.link} LIKE '{feeds_url_prefix}%'",
+            case_sensitive=False,
+        )
+    ]
+    password = encrypt_password("simulated")
+    today = f"{start:%Y-%m-%d}"
+    users_minutes: Dict[str, int] = {}
+    users_rows: List[Tuple] = []
+    for user_number in range(args.users):
+        username = f"{USERNAME_PREFIX}{user_number}"
+        sending_minute = random_sending_minute()
+        sending_time = Time(
+            datetime.time(*divmod(sending_minute, 60)), Timing.DAILY, "UTC"
+        )
+        users_minutes[f"{username}@{EMAIL_DOMAIN}"] = sending_minute
+        users_rows.append(
+            (
+                username,
+                password,
+                today,
+                f"{sending_time.sending_time:%H:%M}",
+                Timing.DAILY.value,
+                json.dumps(
+                    random.sample(feeds_ids, min(args.subscriptions, len(feeds_ids)))
+                ),
+                json.dumps({config.ADDRESSES_KEYS.email: f"{username}@{EMAIL_DOMAIN}"}),
+                "UTC",
+                sending_time.next_sending(start),
+                DAILY_DAYS.value,
+                sending_minute,
+            )
+        )
+    with MySQLCursorCM() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {config.DATABASE_TABLES_NAMES.users_table} "
+            f"({users_columns.username}, {users_columns.password}, "
+            f"{users_columns.last_password_change_date}, {users_columns.sending_time}, "
+            f"{users_columns.sending_schedule}, {users_columns.subscriptions}, "
+            f"{users_columns.addresses}, {users_columns.timezone}, "
+            f"{users_columns.next_send_at}, {users_columns.sending_days}, "
+            f"{users_columns.sending_minute}) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            users_rows,
+        )
+    return users_minutes
+
+
+def lateness(sending_minute: int, received_at: datetime.datetime) -> float:
+    """Calculates how late a message was received, by the latest sending of the user before it.
+
+    Args:
+        sending_minute (int): The sending minute of the day of the user.
+        received_at (datetime.datetime): Naive UTC time the message was received at.
+
+    Returns:
+        float: The lateness, in seconds.
+    """
+    scheduled = datetime.datetime.combine(
+        received_at.date(), datetime.time(*divmod(sending_minute, 60))
+    )
+    if scheduled > received_at:
+        scheduled -= datetime.timedelta(days=1)
+    return (received_at - scheduled).total_seconds()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Returns the value at the given fraction of the sorted values [nearest rank]."""
+    return sorted(values)[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--feeds", type=int, default=100)
+    parser.add_argument("--subscriptions", type=int, default=5, help="Feeds per user.")
+    parser.add_argument("--start-hour", type=int, default=6, help="Simulated UTC hour to start at.")
+    parser.add_argument("--hours", type=float, default=3, help="Simulated hours to run.")
+    parser.add_argument("--speed", type=float, default=60, help="Simulated seconds per real second.")
+    parser.add_argument("--feed-latency", type=float, default=0.1, help="Seconds per RSS response.")
+    parser.add_argument("--feed-items", type=int, default=20)
+    parser.add_argument("--description-size", type=int, default=500)
+    parser.add_argument("--rss-port", type=int, default=8080)
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    args = parser.parse_args()
+
+    start = datetime.datetime.combine(
+        SIMULATION_START_DATE, datetime.time(args.start_hour)
+    )
+    end = start + datetime.timedelta(hours=args.hours)
+    users_minutes = seed(args, start)
+    expected = sum(
+        1
+        for sending_minute in users_minutes.values()
+        for day in range(int(args.hours // 24) + 2)
+        if start
+        <= datetime.datetime.combine(
+            SIMULATION_START_DATE + datetime.timedelta(days=day),
+            datetime.time(*divmod(sending_minute, 60)),
+        )
+        < end
+    )
+
+    clock = SimulatedClock(start, args.speed)
+    received: multiprocessing.Queue = multiprocessing.Queue()
+    ready = multiprocessing.Event()
+    servers = multiprocessing.Process(
+        target=run_servers, args=(args, clock, received, ready), daemon=True
+    )
+    servers.start()
+    ready.wait()
+    address.EMAIL_SESSIONS = SMTPSessionPool(
+        config.SMTP_POOL_SIZE,
+        config.SMTP_SESSION_MAX_MESSAGES,
+        user=config.EMAIL_SENDER_ADDRESS,
+        host="localhost",
+        port=args.smtp_port,
+        smtp_ssl=False,
+        smtp_starttls=False,
+        smtp_skip_login=True,
+    )
+    messenger = Messenger(clock=clock, time_scale=args.speed)
+    messenger_thread = threading.Thread(target=messenger.run)
+    messenger_thread.start()
+    real_start = time.perf_counter()
+    latenesses: List[float] = []
+    while clock() < end:
+        try:
+            recipient, received_at = received.get(timeout=1)
+        except queue.Empty:
+            continue
+        latenesses.append(lateness(users_minutes[recipient], received_at))
+    messenger.stop()
+    messenger_thread.join()
+    while True:
+        try:
+            recipient, received_at = received.get(timeout=1)
+        except queue.Empty:
+            break
+        latenesses.append(lateness(users_minutes[recipient], received_at))
+    real_duration = time.perf_counter() - real_start
+    servers.terminate()
+
+    print(f"simulated {start} - {end} in {real_duration:.1f}s")
+    print(f"messages: {len(latenesses)} received of {expected} expected")
+    print(f"throughput: {len(latenesses) / real_duration:.1f} messages/s")
+    if latenesses:
+        print(
+            f"lateness [simulated seconds]: p50 {percentile(latenesses, 0.5):.1f}, "
+            f"p99 {percentile(latenesses, 0.99):.1f}, "
+            f"mean {statistics.fmean(latenesses):.1f}"
+        )
+    # ru_maxrss is in kilobytes on Linux.
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak memory: {peak_memory:.1f} MiB")
+    print(f"delivery: {messenger.delivery_stats}")
+    print(f"smtp: {address.EMAIL_SESSIONS.stats()}")
+    print(METRICS.report())
+
+
+if __name__ == "__main__":
+    main()
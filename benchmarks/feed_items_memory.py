@@ -0,0 +1,133 @@
+"""Compares the memory retained by the feeds items, extracted eagerly into compact records,
+with the previous lazy items that kept the parse tree alive.
+Parses a synthetic RSS document per feed and reports the retained memory and the pickled size, for example:
+
+    $ python benchmarks/feed_items_memory.py --feeds 1000 --items 20
+"""
+
+import argparse
+import gc
+import pickle
+import time
+import tracemalloc
+from email.utils import formatdate
+from typing import Any, Callable, List
+
+import feedparser
+
+from contentaggregator.lib.feeds.feed import XMLFeedItem
+
+
+class LegacyXMLFeedItem:
+    """The previous item, which references it's parsed entry and extracts the properties lazily."""
+
+    def __init__(
+        self, item_string: feedparser.util.FeedParserDict, feed_version: str
+    ) -> None:
+        self._item = item_string
+        self._version = feed_version
+        self._image = None
+        self._title = None
+        self._description = None
+        self._url = None
+        self._publication_time = None
+
+
+def synthetic_document(feed: int, items_number: int, description_size: int) -> str:
+    """Creates an RSS document, with thumbnails and html descriptions.
+
+    Args:
+        feed (int): The index of the feed, makes the urls unique.
+        items_number (int): The number of the items of the feed.
+        description_size (int): The size of each item description, in characters.
+
+    Returns:
+        str: The RSS document.
+    """
+    now = time.time()
+    description = ("Lorem ipsum dolor sit amet " * (description_size // 27 + 1))[
+        :description_size
+    ]
+    items = "".join(
+        f"""<item>
+            <title>Item {item} of feed {feed}</title>
+            <link>https://example.com/{feed}/items/{item}</link>
+            <description><![CDATA[<p>{description}</p>]]></description>
+            <pubDate>{formatdate(now - item * 3600)}</pubDate>
+            <media:thumbnail url="https://example.com/{feed}/images/{item}.jpg"/>
+        </item>"""
+        for item in range(items_number)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+        <rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+        <channel>
+            <title>Feed {feed}</title>
+            <link>https://example.com/{feed}</link>
+            <description>The synthetic feed {feed}</description>
+            <language>en</language>
+            {items}
+        </channel>
+        </rss>"""
+
+
+def legacy_feed(document: str) -> Any:
+    """Parses the document like the previous feeds, which kept the parse tree and the lazy items."""
+    parsed_feed = feedparser.parse(document)
+    return parsed_feed, [
+        LegacyXMLFeedItem(entry, parsed_feed.version) for entry in parsed_feed.entries
+    ]
+
+
+def compact_feed(document: str) -> Any:
+    """Parses the document like the current feeds, which keep only the extracted items."""
+    parsed_feed = feedparser.parse(document)
+    return [
+        XMLFeedItem.from_entry(entry, parsed_feed.version)
+        for entry in parsed_feed.entries
+    ]
+
+
+def retained_memory(parse: Callable[[str], Any], documents: List[str]) -> int:
+    """Measures the memory that is retained by the parsed feeds.
+
+    Args:
+        parse (Callable[[str], Any]): Parses a document into the retained feed state.
+        documents (List[str]): The documents of the feeds.
+
+    Returns:
+        int: The retained memory, in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    feeds = [parse(document) for document in documents]
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del feeds
+    return retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--description-size", type=int, default=500)
+    args = parser.parse_args()
+    documents = [
+        synthetic_document(feed, args.items, args.description_size)
+        for feed in range(args.feeds)
+    ]
+    for name, parse in (("legacy", legacy_feed), ("compact", compact_feed)):
+        retained = retained_memory(parse, documents)
+        print(
+            f"{name:>8}: retained {retained / 2**20:8.1f} MiB, "
+            f"{retained / args.feeds / 1024:6.1f} KiB/feed"
+        )
+    compact_items = compact_feed(documents[0])
+    print(
+        f"pickled items of a feed: {len(pickle.dumps(compact_items)) / 1024:.1f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
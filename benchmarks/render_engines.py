@@ -0,0 +1,68 @@
+"""Compares the html render engines of the messages on synthetic digests.
+Reports the render time and the peak allocated memory of each engine, for example:
+
+    $ python benchmarks/render_engines.py --items 50 --rounds 200
+"""
+
+import argparse
+import time
+import timeit
+import tracemalloc
+from types import SimpleNamespace
+
+from contentaggregator.lib.messagesgeneration import HTML_RENDERERS
+
+
+def synthetic_feed(items_number: int, description_size: int) -> SimpleNamespace:
+    """Creates an object with the attributes of a feed that are used by the renderers.
+
+    Args:
+        items_number (int): The number of the items of the feed.
+        description_size (int): The size of each item description, in characters.
+
+    Returns:
+        SimpleNamespace: The synthetic feed.
+    """
+    now = time.time()
+    description = ("Lorem & ipsum <dolor> " * (description_size // 22 + 1))[
+        :description_size
+    ]
+    return SimpleNamespace(
+        website="https://example.com/?source=feed&format=rss",
+        image="https://example.com/logo.png",
+        title="Example & Co. News",
+        content=[
+            SimpleNamespace(
+                url=f"https://example.com/items/{item}?ref=feed&id={item}",
+                title=f"Item {item}: <breaking> \"news\" & more",
+                description=description,
+                image=f"https://example.com/images/{item}.jpg",
+                publication_time=time.gmtime(now - item * 3600),
+            )
+            for item in range(items_number)
+        ],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--description-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    feed = synthetic_feed(args.items, args.description_size)
+    for engine, render in HTML_RENDERERS.items():
+        render(feed)
+        seconds = timeit.timeit(lambda: render(feed), number=args.rounds)
+        tracemalloc.start()
+        render(feed)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{engine:>10}: {seconds / args.rounds * 1000:8.3f} ms/digest, "
+            f"peak {peak_memory / 1024:8.1f} KiB/digest"
+        )
+
+
+if __name__ == "__main__":
+    main()
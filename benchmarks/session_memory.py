@@ -0,0 +1,84 @@
+"""Measures the server-side memory of the website sessions of logged in users.
+Creates the states of the given number of sessions, like the website does for each connected client,
+logs them in as the given account [the password is checked once], and reports the retained memory
+and the pickled size [as a redis state manager stores it] per session.
+The users objects are shared by the sessions of each user, so the memory of a single one is not included,
+for example:
+
+    $ python benchmarks/session_memory.py --sessions 1000 --username someone --password 'Secret!12'
+"""
+
+import argparse
+import copy
+import gc
+import tracemalloc
+from typing import List
+
+import cloudpickle
+import pynecone
+
+from contentaggregator.lib.user import userinterface
+from contentaggregator.lib.user.userauthentications import userentrancecontrol
+from contentaggregator.website.website import catalog
+from contentaggregator.website.website import dashboard
+from contentaggregator.website.website import entrance
+
+
+def logged_in_session(user_id: int) -> entrance.EntranceState:
+    """Creates the state of a session, and logs it in like EntranceState.log_in does.
+
+    Args:
+        user_id (int): The id of the user of the session.
+
+    Returns:
+        entrance.EntranceState: The root state of the session, with all the dashboard states.
+    """
+    state = entrance.EntranceState()
+    user = userinterface.User(user_id)
+    entrance.load_user_properties(user)
+    state._user_id = entrance.register_session_user(user)
+    state.initialize_dashboard()
+    state.get_substate([dashboard.DashboardState.get_name()]).reload_dashboard()
+    # Like after the processing of an event, once the changes were sent to the client.
+    state.clean()
+    return state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+    user_id = userentrancecontrol.log_in(args.username, args.password).id
+    # The catalog and the feeds instances are shared by all sessions, so they are created beforehand.
+    catalog.CATALOG.snapshot()
+    logged_in_session(user_id)
+    gc.collect()
+    tracemalloc.start()
+    sessions: List[entrance.EntranceState] = [
+        logged_in_session(user_id) for _ in range(args.sessions)
+    ]
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size for stat in snapshot.statistics("filename"))
+    # Without the state machinery of pynecone [the states objects, their event handlers and backend vars copies].
+    application_retained = sum(
+        stat.size
+        for stat in snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, f"{pynecone.__path__[0]}/*"),
+                tracemalloc.Filter(False, copy.__file__),
+            )
+        ).statistics("filename")
+    )
+    print(
+        f"{args.sessions} sessions: retained {retained / args.sessions / 1024:6.1f} KiB/session "
+        f"[{application_retained / args.sessions / 1024:6.1f} KiB/session by the application], "
+        f"pickled {len(cloudpickle.dumps(sessions[0])) / 1024:6.1f} KiB/session"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measures the email sending throughput with and without SMTP sessions reuse.
+Intended to run against a local SMTP stand-in, for example:
+
+    $ python -m aiosmtpd -n -l localhost:8025
+    $ python benchmarks/smtp_throughput.py --port 8025 --messages 500
+"""
+
+import argparse
+import time
+from concurrent import futures
+
+from contentaggregator.lib.smtppool import SMTPSessionPool
+
+
+def measure(pool: SMTPSessionPool, messages: int, threads: int) -> float:
+    """Sends the given number of messages through the pool, concurrently.
+
+    Args:
+        pool (SMTPSessionPool): The pool to send through.
+        messages (int): The number of messages to send.
+        threads (int): The number of sending threads.
+
+    Returns:
+        float: The throughput, in messages per second.
+    """
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        tasks = [
+            executor.submit(
+                pool.send,
+                to="reader@example.com",
+                subject="Benchmark",
+                contents=f"<h1>Message {message_number}</h1>",
+            )
+            for message_number in range(messages)
+        ]
+        for task in futures.as_completed(tasks):
+            task.result()
+    pool.close()
+    return messages / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--max-messages", type=int, default=100)
+    args = parser.parse_args()
+    smtp_params = dict(
+        user="sender@example.com",
+        host=args.host,
+        port=args.port,
+        smtp_ssl=False,
+        smtp_starttls=False,
+        smtp_skip_login=True,
+    )
+    for name, max_messages in (
+        ("session per message", 1),
+        ("pooled sessions", args.max_messages),
+    ):
+        pool = SMTPSessionPool(args.threads, max_messages, **smtp_params)
+        throughput = measure(pool, args.messages, args.threads)
+        print(f"{name:>20}: {throughput:8.1f} messages/s, {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
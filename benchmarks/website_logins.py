@@ -0,0 +1,97 @@
+"""Measures the head-of-line blocking of concurrent logins on the website event loop.
+Runs the password check of the given number of concurrent logins inline [like the previous handlers]
+and by the passwords executor, while a heartbeat task measures how long the loop was stalled, for example:
+
+    $ python benchmarks/website_logins.py --logins 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from contentaggregator.lib.user.userauthentications import pwdhandler
+from contentaggregator.website.website import executors
+
+PASSWORD = "correct horse battery staple"
+
+
+async def heartbeat(interval: float, stalls: List[float], stop: asyncio.Event) -> None:
+    """Wakes up every interval seconds, and records how late each wake up was.
+
+    Args:
+        interval (float): Seconds between the wake ups.
+        stalls (List[float]): Collects the delays of the wake ups, in seconds.
+        stop (asyncio.Event): Stops the heartbeat once set.
+    """
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - expected)
+
+
+async def inline_login(hashed_password: bytes) -> None:
+    """Checks the password on the event loop, like the previous log_in handler."""
+    pwdhandler.is_same_password(PASSWORD, hashed_password)
+
+
+async def offloaded_login(hashed_password: bytes) -> None:
+    """Checks the password by the passwords executor, like the log_in handler does."""
+    await executors.run_blocking(
+        executors.PASSWORDS_EXECUTOR,
+        pwdhandler.is_same_password,
+        PASSWORD,
+        hashed_password,
+    )
+
+
+async def measure(
+    login: Callable[[bytes], Awaitable[None]], logins: int, hashed_password: bytes
+) -> Tuple[List[float], List[float]]:
+    """Runs the given number of concurrent logins.
+
+    Args:
+        login (Callable[[bytes], Awaitable[None]]): The login handler.
+        logins (int): The number of concurrent logins.
+        hashed_password (bytes): The stored password of the users.
+
+    Returns:
+        Tuple[List[float], List[float]]: The latencies of the logins, and the stalls of the loop, in seconds.
+    """
+    stalls: List[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(0.01, stalls, stop))
+    # Lets the heartbeat start before the logins arrive.
+    await asyncio.sleep(0.02)
+
+    # All logins arrive together, so their latencies include their waiting.
+    arrival = time.perf_counter()
+
+    async def timed_login() -> float:
+        await login(hashed_password)
+        return time.perf_counter() - arrival
+
+    latencies = await asyncio.gather(*(timed_login() for _ in range(logins)))
+    stop.set()
+    await beat
+    return list(latencies), stalls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+    hashed_password = pwdhandler.encrypt_password(PASSWORD)
+    for name, login in (("inline", inline_login), ("executor", offloaded_login)):
+        latencies, stalls = asyncio.run(measure(login, args.logins, hashed_password))
+        latencies.sort()
+        print(
+            f"{name:>8}: login p50 {statistics.median(latencies) * 1000:8.1f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.1f} ms, "
+            f"max loop stall {max(stalls, default=0) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
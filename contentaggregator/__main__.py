@@ -2,10 +2,11 @@
 """
 
 import os
+import time
 import subprocess
 import multiprocessing
 
-from contentaggregator.lib import distributionsystem
+from contentaggregator.lib import config, distributionsystem
 
 
 def start_server() -> subprocess.CompletedProcess:
@@ -20,22 +21,51 @@ def start_server() -> subprocess.CompletedProcess:
         print(e)
 
 
-def start_distribution_system() -> None:
-    """Starts the distribution system to work while True."""
+def start_distribution_system(shard_index: int = 0, shards_number: int = 1) -> None:
+    """Starts the distribution system of a single shard to work while True.
+
+    Args:
+        shard_index (int, optional): The index of the shard to serve. Defaults to 0.
+        shards_number (int, optional): The number of shards. Defaults to 1.
+    """
     try:
-        postman = distributionsystem.Messenger()
+        postman = distributionsystem.Messenger(shard_index, shards_number)
         postman.run()
     except Exception as e:
         # Log it
         print(e)
 
 
+def supervise_distribution_system(shards_number: int) -> None:
+    """Starts a distribution process for each shard,
+    and restarts any of them that dies, so that no shard is left without a Messenger.
+
+    Args:
+        shards_number (int): The number of shards.
+    """
+    processes = {}
+    while True:
+        for shard_index in range(shards_number):
+            process = processes.get(shard_index)
+            if process is None or not process.is_alive():
+                if process is not None:
+                    # Log it
+                    print(f"Distribution shard {shard_index} died, restarting...")
+                processes[shard_index] = multiprocessing.Process(
+                    target=start_distribution_system, args=(shard_index, shards_number)
+                )
+                processes[shard_index].start()
+        time.sleep(config.DISTRIBUTION_SUPERVISION_INTERVAL)
+
+
 if "website" not in os.getcwd():
     current_file_path = os.path.realpath(__file__)
     os.chdir(os.path.join(current_file_path[: current_file_path.rfind("/")], "website"))
 
 server_process = multiprocessing.Process(target=start_server)
-distribution_process = multiprocessing.Process(target=start_distribution_system)
+distribution_process = multiprocessing.Process(
+    target=supervise_distribution_system, args=(config.DISTRIBUTION_SHARDS_NUMBER,)
+)
 server_process.start()
 distribution_process.start()
 server_process.join()
@@ -2,7 +2,7 @@
 like data base credentials, database name, data tables name and columns of data tables.
 """
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Tuple
 import os
 
 SQL_USERNAME: str = os.environ["SQL_USERNAME"]
@@ -26,6 +26,7 @@ class TablesNames:
     Object Attributes:
         users_table (str): User table information name.
         feeds_table (str): Link table information name.
+        outbox_table (str): Name of the table of the due sends.
 
     Examples:
         >>> my_tables = TablesNames()
@@ -41,6 +42,8 @@ class TablesNames:
 
     users_table: str = "users_info"
     feeds_table: str = "feeds_info"
+    outbox_table: str = "outbox"
+    changes_table: str = "changes_log"
 
 
 DATABASE_TABLES_NAMES = TablesNames()
@@ -61,6 +64,10 @@ class UsersDataColumns:
         subscriptions (str): Name of the subscriptions column [contains a list of the user subscriptions as a json string]
         sending_schedule (str): Name of the sending_schedule column, It will contain a number of Enum class, represents if weekly or daily.
         sending_time (str): Name of the sending_time column, It will contain the time of sending.
+        timezone (str): Name of the timezone column, It will contain the IANA timezone name of the sending_time.
+        next_send_at (str): Name of the next_send_at column, It will contain the UTC time of the next sending.
+        sending_days (str): Name of the sending_days column, It will contain a bitmask of the sending weekdays.
+        sending_minute (str): Name of the sending_minute column, It will contain the minute of the day of sending.
 
     Examples:
         >>> my_user_data_attributes = UsersDataColumns()
@@ -79,6 +86,10 @@ class UsersDataColumns:
     subscriptions: str = "subscriptions"
     sending_schedule: str = "sending_schedule"
     sending_time: str = "sending_time"
+    timezone: str = "timezone"
+    next_send_at: str = "next_send_at"
+    sending_days: str = "sending_days"
+    sending_minute: str = "sending_minute"
 
 
 USERS_DATA_COLUMNS = UsersDataColumns()
@@ -105,6 +116,47 @@ class AddressesKeys:
 ADDRESSES_KEYS = AddressesKeys()
 
 
+@dataclass
+class MessageFormats:
+    """
+    The MessageFormats of the messages generation, each channel sends messages in one of them.
+
+    Object Attributes:
+        html (str): HTML messages [email].
+        text (str): Plain text messages [SMS].
+        whatsapp (str): Text with WhatsApp formatting marks [WhatsApp].
+        voice (str): TwiML documents with SSML tags, spoken by a text to speech voice [phone calls].
+    """
+
+    html: str = "html"
+    text: str = "text"
+    whatsapp: str = "whatsapp"
+    voice: str = "voice"
+
+
+MESSAGE_FORMATS = MessageFormats()
+
+# Number of the distribution processes. The users are partitioned between them by their id.
+DISTRIBUTION_SHARDS_NUMBER: int = int(os.environ.get("DISTRIBUTION_SHARDS_NUMBER", 1))
+
+# Interval (in seconds) between checks of the distribution processes, to restart the dead ones.
+DISTRIBUTION_SUPERVISION_INTERVAL: int = 10
+
+# Number of the threads that deliver the messages of the channels without a concurrency limit.
+DELIVERY_WORKERS_NUMBER: int = 16
+
+# Maximum number of deliveries of each channel waiting for a free worker, before the sending blocks.
+DELIVERY_QUEUE_SIZE: int = 1000
+
+# Maximum number of concurrent deliveries through each channel, each is served by as many threads of it's own.
+CHANNELS_CONCURRENCY_LIMITS: Dict[str, int] = {
+    ADDRESSES_KEYS.email: 8,
+    ADDRESSES_KEYS.whatsapp: 4,
+    ADDRESSES_KEYS.sms: 4,
+    ADDRESSES_KEYS.phone: 2,
+}
+
+
 @dataclass
 class FeedsDataColumns:
     """
@@ -115,6 +167,8 @@ class FeedsDataColumns:
         id (str): Name of the feeds id column.
         links (str): Name of the feeds links column.
         rating (str): Name of ratings column.
+        title, website, image, description (str): Names of the channel metadata columns,
+                                                  as it was last downloaded by the distribution system.
 
     Examples:
         >>> my_feeds_data_attributes = FeedsDataColumns()
@@ -131,6 +185,10 @@ class FeedsDataColumns:
     feed_type: str = "type"
     categories: str = "categories"
     items_size: str = "items_size"
+    title: str = "title"
+    website: str = "website"
+    image: str = "image"
+    description: str = "description"
 
 
 FEEDS_DATA_COLUMNS = FeedsDataColumns()
@@ -153,8 +211,242 @@ class FeedTypes:
 
 FEED_TYPES = FeedTypes()
 
+
+@dataclass
+class OutboxDataColumns:
+    """
+    The OutboxDataColumns for OUTBOX_DATA_COLUMNS modifying.
+    contains the names of columns in the outbox table.
+
+    Object Attributes:
+        id (str): Name of the sends id column.
+        idempotency_key (str): Name of the unique key column, made of user id, channel and slot.
+        user_id (str): Name of the column of the receiving user id.
+        channel (str): Name of the channel column [address key, like email].
+        slot (str): Name of the column of the scheduled date and minute of the send.
+        status (str): Name of the status column [one of OutboxStatuses].
+        attempts (str): Name of the column of the number of the sending attempts.
+        next_attempt_at (str): Name of the column of the time the send may be claimed at.
+        claimed_at (str): Name of the column of the time the send was last claimed at.
+        last_error (str): Name of the column of the last sending error.
+    """
+
+    id: str = "id"
+    idempotency_key: str = "idempotency_key"
+    user_id: str = "user_id"
+    channel: str = "channel"
+    slot: str = "slot"
+    status: str = "status"
+    attempts: str = "attempts"
+    next_attempt_at: str = "next_attempt_at"
+    claimed_at: str = "claimed_at"
+    last_error: str = "last_error"
+
+
+OUTBOX_DATA_COLUMNS = OutboxDataColumns()
+
+
+@dataclass
+class OutboxStatuses:
+    """
+    The OutboxStatuses allowed in OutboxDataColumns.status column.
+
+    Object Attributes:
+        pending (str): The send is waiting to be claimed.
+        claimed (str): The send is claimed by a Messenger.
+        sent (str): The send is done.
+        failed (str): The send failed, and it will not be retried.
+    """
+
+    pending: str = "pending"
+    claimed: str = "claimed"
+    sent: str = "sent"
+    failed: str = "failed"
+
+
+OUTBOX_STATUSES = OutboxStatuses()
+
+
+@dataclass
+class ChangesDataColumns:
+    """
+    The ChangesDataColumns for CHANGES_DATA_COLUMNS modifying.
+    contains the names of columns in the changes log table.
+
+    Object Attributes:
+        id (str): Name of the changes id column [monotonically increasing].
+        entity (str): Name of the column of the changed entity type [one of ChangedEntities].
+        entity_id (str): Name of the column of the changed entity id.
+        fields (str): Name of the column of the changed columns [json list, NULL if the entity was deleted].
+    """
+
+    id: str = "id"
+    entity: str = "entity"
+    entity_id: str = "entity_id"
+    fields: str = "fields"
+
+
+CHANGES_DATA_COLUMNS = ChangesDataColumns()
+
+
+@dataclass
+class ChangedEntities:
+    """
+    The ChangedEntities allowed in ChangesDataColumns.entity column.
+
+    Object Attributes:
+        user (str): A row of the users table.
+        feed (str): A row of the feeds table.
+    """
+
+    user: str = "user"
+    feed: str = "feed"
+
+
+CHANGED_ENTITIES = ChangedEntities()
+
+# Interval (in seconds) between reads of the new changes from the changes log.
+CHANGES_POLLING_INTERVAL: int = 5
+
+# Maximum number of changes read by a single query.
+CHANGES_BATCH_SIZE: int = 10000
+
+# Maximum number of sends claimed by a single query,
+# it's further limited by the free slots of the delivery queue.
+OUTBOX_CLAIM_BATCH_SIZE: int = 5000
+
+# Interval (in seconds) between claims of due sends.
+OUTBOX_POLLING_INTERVAL: int = 5
+
+# Seconds after which a claimed send that is not done, is considered abandoned and may be claimed again.
+OUTBOX_CLAIM_TIMEOUT: int = 600
+
+# Maximum number of attempts for each send, and the delay (in seconds) before the first retry.
+# The delay is doubled on each retry.
+OUTBOX_MAX_ATTEMPTS: int = 5
+OUTBOX_RETRY_DELAY: int = 60
+
 PASSWORD_ENCODING_METHOD: str | None = "utf-8"
 
+# Timezone of sending times that have been set without one.
+DEFAULT_TIMEZONE: str = os.environ.get("TZ", "UTC")
+
+# Interval (in seconds) between checks of the users that are due to be sent.
+DUE_USERS_POLLING_INTERVAL: int = 10
+
+# Interval (in seconds) between full rebuilds of the sending schedules index.
+# Edits are applied from the changes log, the rebuild recalculates timezone offsets [daylight saving].
+SCHEDULE_INDEX_REFRESH_INTERVAL: int = 3600
+
+# Number of the processes that hash and check the passwords [bcrypt is CPU-bound], defaults to the number of the cores.
+PASSWORDS_HASHING_PROCESSES: int = int(
+    os.environ.get("PASSWORDS_HASHING_PROCESSES", os.cpu_count() or 1)
+)
+
+# Maximum number of the passwords operations that are queued or running,
+# beyond it new ones are rejected with a "try again" error, instead of waiting behind a burst.
+PASSWORDS_HASHING_MAX_PENDING: int = int(
+    os.environ.get("PASSWORDS_HASHING_MAX_PENDING", 64)
+)
+
+# Sliding window (in seconds) of the logins and sign ups throttling, and the attempts allowed within it
+# per username from a single client ip [so others can't lock the user out], and per client ip,
+# before the passwords are hashed.
+LOGIN_ATTEMPTS_WINDOW: int = 300
+LOGIN_ATTEMPTS_PER_USERNAME: int = 10
+LOGIN_ATTEMPTS_PER_IP: int = 50
+
+# Maximum number of the usernames and ips whose attempts are tracked, the least recently used are forgotten.
+LOGIN_THROTTLE_MAX_KEYS: int = 100_000
+
+# Number of the worker threads of the website event handlers blocking work:
+# passwords operations [they mostly wait for the hashing processes and the database,
+# and at most PASSWORDS_HASHING_MAX_PENDING of them are handed off at once, beyond it they are rejected],
+# database queries, and addresses validation by http requests.
+WEBSITE_PASSWORDS_WORKERS: int = int(
+    os.environ.get("WEBSITE_PASSWORDS_WORKERS", PASSWORDS_HASHING_MAX_PENDING)
+)
+WEBSITE_DATABASE_WORKERS: int = int(os.environ.get("WEBSITE_DATABASE_WORKERS", 16))
+WEBSITE_VALIDATION_WORKERS: int = int(os.environ.get("WEBSITE_VALIDATION_WORKERS", 8))
+
+# Maximum number of the users objects of the logged in sessions that are kept by the website process,
+# the sessions keep only the ids of their users.
+WEBSITE_CACHED_USERS: int = 10_000
+
+# Interval (in seconds) of refreshing the feeds catalog presented by the website.
+FEEDS_CATALOG_REFRESH_INTERVAL: int = 60
+
+# Number of the available feeds presented in a page of the dashboard,
+# and the number of the search queries whose results are cached.
+FEEDS_CATALOG_PAGE_SIZE: int = 20
+FEEDS_CATALOG_CACHED_SEARCHES: int = 1024
+
+# Maximum number of feeds instances kept by the feeds registry, the least recently used are evicted.
+FEEDS_REGISTRY_MAX_INSTANCES: int = 100_000
+
+# Approximate memory budget (in bytes) of the downloaded feeds items,
+# the content of the least recently used feeds is released beyond it.
+FEEDS_CONTENT_MAX_BYTES: int = 256 * 1024 * 1024
+
+# Memory budget (in characters of rendered markup) for the feeds render cache.
+RENDER_CACHE_MAX_SIZE: int = 64 * 1024 * 1024
+
+# Engine of the html messages rendering, one of messagesgeneration.HTML_RENDERERS:
+# "jinja2" renders by a precompiled template, "tinyhtml" builds an element tree per message.
+HTML_RENDER_ENGINE: str = "jinja2"
+
+# If True, each message contains the MERGED_DIGEST_SIZE most recent items of all the user feeds together,
+# instead of a section per feed.
+MERGED_DIGEST: bool = False
+MERGED_DIGEST_SIZE: int = 20
+
+# The messages reference downscaled thumbnails of the images, stored in THUMBNAILS_DIRECTORY
+# and served by the website at THUMBNAILS_ROUTE. THUMBNAILS_BASE_URL is the public url of that route,
+# if it's unset the messages reference the original images.
+THUMBNAILS_BASE_URL: str | None = os.environ.get("THUMBNAILS_BASE_URL")
+THUMBNAILS_ROUTE: str = "/thumbnails"
+THUMBNAILS_DIRECTORY: str = os.environ.get(
+    "THUMBNAILS_DIRECTORY", os.path.join(os.path.dirname(__file__), "thumbnails_store")
+)
+THUMBNAIL_MAX_SIZE: Tuple[int, int] = (320, 320)
+THUMBNAIL_JPEG_QUALITY: int = 80
+
+# Maximum number of images urls whose thumbnails are remembered, so they are not fetched again.
+THUMBNAILS_MAX_URLS: int = 100_000
+
+# The images are fetched in the background by THUMBNAILS_FETCH_WORKERS threads,
+# up to THUMBNAILS_MAX_PENDING_FETCHES at once, the messages reference the original images meanwhile.
+THUMBNAILS_FETCH_WORKERS: int = 8
+THUMBNAILS_MAX_PENDING_FETCHES: int = 1000
+
+# Hosts the images may be fetched from [and their subdomains], comma separated in THUMBNAILS_ALLOWED_HOSTS,
+# any host if it's unset. Images on private, loopback and other non public addresses are never fetched.
+THUMBNAILS_ALLOWED_HOSTS: Tuple[str, ...] = tuple(
+    host.strip().lower()
+    for host in os.environ.get("THUMBNAILS_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+)
+# Seconds to wait for an image server, and the maximum number of redirects followed to an image.
+THUMBNAILS_FETCH_TIMEOUT: float = 10
+THUMBNAILS_MAX_REDIRECTS: int = 5
+# Maximum size (in bytes) and number of pixels of an original image, larger images are neither downloaded nor decoded.
+THUMBNAIL_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+THUMBNAIL_MAX_IMAGE_PIXELS: int = 40_000_000
+
+# Maximum size (in bytes) of THUMBNAILS_DIRECTORY, beyond it the least recently used thumbnails are removed.
+THUMBNAILS_MAX_BYTES: int = 512 * 1024 * 1024
+
+# Upper bounds (in seconds) of the buckets of the pipeline stages and lateness histograms.
+METRICS_BUCKETS: Tuple[float, ...] = (
+    0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600,
+)
+
+# Interval (in seconds) between reports of the distribution metrics.
+METRICS_REPORT_INTERVAL: int = 60
+
+# p99 sending lateness (in seconds) of a channel, above which the metrics report alerts.
+SEND_LATENESS_ALERT_THRESHOLD: int = 300
+
 RAPID_API_KEY: str = os.environ["RAPID_API_KEY"]
 HTTPS_PREFIX: str = "https://"
 RAPID_APIS_URL_SUFFIX: str = "p.rapidapi.com"
@@ -176,6 +468,27 @@ EMAIL_SENDER_ADDRESS: str = os.environ[
 # when is will enabled to make 2-step authentication for this google account.
 EMAIL_SENDER_PWD: str = os.environ["EMAIL_SENDER_PWD"]
 
+SMTP_HOST: str = "smtp.gmail.com"
+SMTP_PORT: int = 465
+SMTP_SSL: bool = True
+# Seconds to wait for the SMTP server, before the sending through the session fails.
+SMTP_TIMEOUT: float = 30
+
+# Maximum number of open SMTP sessions, and of messages sent through each session before it's replaced.
+SMTP_POOL_SIZE: int = CHANNELS_CONCURRENCY_LIMITS[ADDRESSES_KEYS.email]
+SMTP_SESSION_MAX_MESSAGES: int = 100
+
+# Twilio account, and the numbers it sends from, for the WhatsApp, SMS and phone channels.
+TWILIO_ACCOUNT_SID: str | None = os.environ.get("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN: str | None = os.environ.get("TWILIO_AUTH_TOKEN")
+TWILIO_WHATSAPP_NUMBER: str | None = os.environ.get("TWILIO_WHATSAPP_NUMBER")
+TWILIO_PHONE_NUMBER: str | None = os.environ.get("TWILIO_PHONE_NUMBER")
+
+# Maximum length of a Twilio message body [longer text messages are split],
+# and of the TwiML document of a call [longer voice messages are truncated].
+TWILIO_MESSAGE_MAX_LENGTH: int = 1600
+TWILIO_TWIML_MAX_LENGTH: int = 4000
+
 
 def create_rapidAPI_request_headers(api_name: str) -> Dict[str, str]:
     """Creates an headers dictionary for rapid API requests,'
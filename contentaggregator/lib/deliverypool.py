@@ -0,0 +1,175 @@
+"""A bounded pool of delivery workers.
+Enables the distribution system to send messages concurrently,
+so that a slow address or transport does not delay all other messages due at the same time.
+"""
+
+from __future__ import annotations
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple
+
+
+class DeliveryPoolStats(NamedTuple):
+    """Statistics of the DeliveryPool."""
+
+    queue_depth: int
+    completed_tasks: int
+    failed_tasks: int
+    average_wait: float
+    max_wait: float
+
+
+class _DeliveryTask(NamedTuple):
+    """A delivery waiting in the queue of the DeliveryPool."""
+
+    channel: str
+    function: Callable[..., Any]
+    args: tuple
+    kwargs: Dict[str, Any]
+    enqueued_at: float
+
+
+class DeliveryPool:
+    """Bounded work queues consumed by a fixed number of delivery threads.
+    Each channel with a concurrency limit has a queue of it's own, consumed by as many threads as it's limit,
+    so a backlog on a slow channel never occupies the threads of the other channels.
+    The channels without a limit share a queue, consumed by workers_number threads.
+    Submitting to a full queue blocks the submitter (backpressure).
+    """
+
+    def __init__(
+        self,
+        workers_number: int,
+        queue_size: int,
+        channels_limits: Dict[str, int] | None = None,
+    ) -> None:
+        """
+        Args:
+            workers_number (int): The number of the delivery threads of the channels without a limit.
+            queue_size (int): The maximum number of deliveries waiting in the queue of each channel.
+            channels_limits (Dict[str, int] | None, optional): The maximum number of concurrent deliveries
+                                                              for each channel (address key).
+                                                              Channels without a limit are limited
+                                                              by the workers_number only. Defaults to None.
+        """
+        # Channels as keys [None for the channels without a limit], and their number of threads as values.
+        self._queues_workers: Dict[str | None, int] = {
+            **(channels_limits or {}),
+            None: workers_number,
+        }
+        self._queues: Dict[str | None, queue.Queue[_DeliveryTask | None]] = {
+            channel: queue.Queue(maxsize=queue_size) for channel in self._queues_workers
+        }
+        self._workers: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self._completed_tasks: int = 0
+        self._failed_tasks: int = 0
+        self._total_wait: float = 0.0
+        self._max_wait: float = 0.0
+
+    def _queue_of(self, channel: str) -> queue.Queue[_DeliveryTask | None]:
+        """Returns the queue of the given channel, the shared one if it has no limit."""
+        return self._queues.get(channel, self._queues[None])
+
+    def start(self) -> None:
+        """Starts the delivery threads."""
+        for channel, workers_number in self._queues_workers.items():
+            for worker_number in range(workers_number):
+                worker = threading.Thread(
+                    target=self._work,
+                    args=(self._queues[channel],),
+                    name=f"delivery-worker-{channel or 'shared'}-{worker_number}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(
+        self, channel: str, function: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> None:
+        """Enqueues a delivery to the queue of it's channel. Blocks while the queue is full.
+
+        Args:
+            channel (str): The channel of the delivery, like 'email' or 'whatsapp'.
+            function (Callable[..., Any]): The function that performs the delivery.
+        """
+        self._queue_of(channel).put(
+            _DeliveryTask(channel, function, args, kwargs, time.monotonic())
+        )
+
+    def free_slots(self, channel: str) -> int:
+        """Returns the number of deliveries of the given channel that can be submitted without blocking,
+        as long as there is a single submitter.
+
+        Args:
+            channel (str): The channel of the deliveries.
+
+        Returns:
+            int: The number of the free places in the queue of the channel.
+        """
+        channel_queue = self._queue_of(channel)
+        return max(0, channel_queue.maxsize - channel_queue.qsize())
+
+    def _work(self, channel_queue: queue.Queue[_DeliveryTask | None]) -> None:
+        """Main loop of a delivery thread - performs the deliveries of it's queue until it gets None.
+
+        Args:
+            channel_queue (queue.Queue[_DeliveryTask | None]): The queue of the thread.
+        """
+        while (task := channel_queue.get()) is not None:
+            wait = time.monotonic() - task.enqueued_at
+            failed = False
+            try:
+                task.function(*task.args, **task.kwargs)
+            except Exception as e:
+                failed = True
+                # TODO log it
+                print(e)
+            finally:
+                self._record(wait, failed)
+                channel_queue.task_done()
+        channel_queue.task_done()
+
+    def _record(self, wait: float, failed: bool) -> None:
+        """Records the statistics of a finished delivery.
+
+        Args:
+            wait (float): How long the delivery waited in the queue, in seconds.
+            failed (bool): If the delivery raised an exception.
+        """
+        with self._stats_lock:
+            self._completed_tasks += 1
+            self._failed_tasks += failed
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    def stats(self) -> DeliveryPoolStats:
+        """Returns the statistics of the pool.
+
+        Returns:
+            DeliveryPoolStats: Queue depth [of all the queues], and the number and wait time of the finished deliveries.
+        """
+        with self._stats_lock:
+            return DeliveryPoolStats(
+                sum(channel_queue.qsize() for channel_queue in self._queues.values()),
+                self._completed_tasks,
+                self._failed_tasks,
+                self._total_wait / self._completed_tasks if self._completed_tasks else 0.0,
+                self._max_wait,
+            )
+
+    def join(self) -> None:
+        """Blocks until all the enqueued deliveries are done."""
+        for channel_queue in self._queues.values():
+            channel_queue.join()
+
+    def shutdown(self) -> None:
+        """Stops the delivery threads after the enqueued deliveries are done."""
+        if self._workers:
+            for channel, workers_number in self._queues_workers.items():
+                for _ in range(workers_number):
+                    self._queues[channel].put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
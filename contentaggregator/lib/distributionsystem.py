@@ -3,134 +3,424 @@ Should work ay anytime - as a server.
 Independent of any other system events, like client server interaction.
 """
 from __future__ import annotations
-import time
-import contextlib
+import dataclasses
+import datetime
+import threading
+from typing import Callable, Dict, Iterable, List, Set, Tuple
 
 import schedule
 
-from contentaggregator.lib.exceptions import TimingError
+from contentaggregator.lib import config, messagesgeneration
+from contentaggregator.lib.deliverypool import DeliveryPool, DeliveryPoolStats
+from contentaggregator.lib.exceptions import TimingError, UndeliverableMessage
+from contentaggregator.lib.metrics import METRICS
+from contentaggregator.lib.scheduleindex import ScheduleIndex, week_minute
+from contentaggregator.lib.feeds.feed import FEEDS_REGISTRY, Feed
 from contentaggregator.lib.sqlmanagement import databaseapi
+from contentaggregator.lib.thumbnails import THUMBNAILS
 from contentaggregator.lib.user.userinterface import User
-from contentaggregator.lib.user.userproperties.time import Timing
+from contentaggregator.lib.user.userproperties.address import Address
+from contentaggregator.lib.user.userproperties.time import Time, WeekDays
+
+
+def utc_now() -> datetime.datetime:
+    """Returns the current time as a naive UTC datetime, as stored in the database."""
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def deliver(
+    send_id: int,
+    attempts: int,
+    channel: str,
+    slot: str,
+    address: Address,
+    feeds: Iterable[Feed],
+    fragments: Dict[int, str],
+    clock: Callable[[], datetime.datetime] = utc_now,
+) -> None:
+    """Sends a claimed send of the outbox, and records it's result and lateness.
+    A failed send is retried with exponential backoff, up to config.OUTBOX_MAX_ATTEMPTS attempts,
+    unless it was rejected by it's transport.
+    The send is skipped if it has been claimed again [or done] since this claim.
+
+    Args:
+        send_id (int): The id of the send in the outbox.
+        attempts (int): The number of attempts of this send, including this one.
+        channel (str): The channel of the send [address key].
+        slot (str): The UTC minute the send was scheduled to, formatted as '%Y-%m-%d %H:%M'.
+        address (Address): The address to send to.
+        feeds (Iterable[Feed]): The feeds to be included in the message.
+        fragments (Dict[int, str]): Shared rendered fragments of the feeds.
+        clock (Callable[[], datetime.datetime], optional): Returns the current naive UTC time.
+                                                           Defaults to utc_now.
+
+    Raises:
+        Exception: If the sending failed.
+    """
+    if not databaseapi.renew_outbox_claim(send_id, attempts):
+        # Claimed again while it waited in the delivery queue, so the other claim sends it.
+        return
+    scheduled_at = datetime.datetime.strptime(slot, "%Y-%m-%d %H:%M")
+    # Labeled by the minute of the day, so that heavy minutes can be told apart.
+    METRICS.observe(
+        "send_lateness_seconds",
+        (clock() - scheduled_at).total_seconds(),
+        channel=channel,
+        slot=f"{scheduled_at:%H:%M}",
+    )
+    try:
+        with METRICS.timer("delivery_seconds", channel=channel):
+            address.send_message(*feeds, fragments=fragments)
+    except Exception as e:
+        databaseapi.fail_outbox_send(
+            send_id,
+            attempts,
+            str(e),
+            config.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+            if attempts < config.OUTBOX_MAX_ATTEMPTS
+            and not isinstance(e, UndeliverableMessage)
+            else None,
+        )
+        raise
+    databaseapi.complete_outbox_send(send_id, attempts)
 
 
 class Messenger:
-    """Sending messages to users - according to their preferences and settings."""
+    """Sending messages to users - according to their preferences and settings.
+    Due users are found by a compact index of the sending schedules,
+    which is kept up to date by the changes log of the users,
+    and users missed by the index are caught up by their next_send_at time in the database.
+    Users may be partitioned into several shards by their id,
+    each shard is served by a Messenger of it's own.
+    """
 
-    def __init__(self) -> None:
-        self._email_scheduler = schedule.Scheduler()
-        self._whatsapp_scheduler = schedule.Scheduler()
-        self._sms_scheduler = schedule.Scheduler()
-        self._phone_scheduler = schedule.Scheduler()
-        self._users_table = {}
-        if users_set := databaseapi.get_users_set():
-            self._users_table = {user_id: User(user_id) for user_id in users_set}
+    def __init__(
+        self,
+        shard_index: int = 0,
+        shards_number: int = 1,
+        clock: Callable[[], datetime.datetime] = utc_now,
+        time_scale: float = 1,
+    ) -> None:
+        """
+        Args:
+            shard_index (int, optional): The index of the shard served by this Messenger. Defaults to 0.
+            shards_number (int, optional): The number of shards. Defaults to 1 [a single Messenger for all users].
+            clock (Callable[[], datetime.datetime], optional): Returns the current naive UTC time.
+                                                               Defaults to utc_now.
+            time_scale (float, optional): How many times faster than real time the clock runs,
+                                          the polling intervals are shortened accordingly. Defaults to 1.
+        """
+        self._shard_index = shard_index
+        self._shards_number = shards_number
+        self._clock = clock
+        self._time_scale = time_scale
+        self._stopped = threading.Event()
+        self._scheduler = schedule.Scheduler()
+        self._delivery_pool = DeliveryPool(
+            config.DELIVERY_WORKERS_NUMBER,
+            config.DELIVERY_QUEUE_SIZE,
+            config.CHANNELS_CONCURRENCY_LIMITS,
+        )
+        # The channels that share a delivery queue are claimed together, limited by the free slots of their queue.
+        unlimited_channels = [
+            channel
+            for channel in dataclasses.astuple(config.ADDRESSES_KEYS)
+            if channel not in config.CHANNELS_CONCURRENCY_LIMITS
+        ]
+        self._channels_groups: List[List[str]] = [
+            [channel] for channel in config.CHANNELS_CONCURRENCY_LIMITS
+        ] + ([unlimited_channels] if unlimited_channels else [])
+        self._schedule_index = ScheduleIndex()
+        # The last change of the changes log that is applied to the schedule index.
+        self._last_change_id: int = 0
+        # The last minute whose due users have been materialized.
+        self._last_checked_minute: datetime.datetime = self._clock().replace(
+            second=0, microsecond=0
+        )
 
-    def _clear_user_tasks(self, user_id: int) -> None:
-        """Clear all tasks belonging to the given user, by it's id.
+    @staticmethod
+    def _advance_next_sendings(
+        users: Iterable[User], after: datetime.datetime
+    ) -> None:
+        """Advances the next_send_at of the given users, to their first sending after the given time.
+        Users with the same next sending are updated together.
 
         Args:
-            user_id (int): The user id.
+            users (Iterable[User]): The users to advance.
+            after (datetime.datetime): Naive UTC time.
         """
-        for scheduler in [
-            self._email_scheduler,
-            self._whatsapp_scheduler,
-            self._sms_scheduler,
-            self._phone_scheduler,
-        ]:
-            with contextlib.suppress(Exception):
-                scheduler.clear(tag=user_id)
-
-    def _ensure_users_table_correctness(self) -> None:
-        """Checks if any changes occurred in the database table.
-        If it did happen, the method will update self._users_table,
-        and reset schedules as necessary.
+        next_sendings: Dict[datetime.datetime | None, List[int]] = {}
+        for user in users:
+            try:
+                next_sending = (
+                    user.sending_time.next_sending(after) if user.sending_time else None
+                )
+            except TimingError:
+                next_sending = None
+            next_sendings.setdefault(next_sending, []).append(user.id)
+        for next_sending, users_ids in next_sendings.items():
+            databaseapi.set_next_send_at(users_ids, next_sending)
+
+    def _schedule_unscheduled_users(self) -> None:
+        """Completes the sending schedule of users who have a sending time without
+        next_send_at or sending days, like users who set their sending time before these existed.
         """
-        updated_users_set = databaseapi.get_users_set()
-        delete_users_set = set(self._users_table.keys()).difference(updated_users_set)
-        # delete deleted users and cancel it's jobs.
-        for user_id in delete_users_set:
-            self._users_table.pop(user_id)
-            self._clear_user_tasks(user_id)
-        # update all remaining users in users table and cancel it's old jobs.
-        # TODO consider improve the complexity by updating the modified only.
-        for user_id in self._users_table.keys():
-            self._users_table[user_id] = User(user_id)
-            self._clear_user_tasks(user_id)
-        # insert new users
-        new_users_set = updated_users_set.difference(self._users_table.keys())
-        for user_id in new_users_set:
-            self._users_table[user_id] = User(user_id)
-        self._set_sending_schedules()
-
-    def _create_job(self, job_timing: Timing, address_key: str) -> schedule.Job:
-        """Create a new schedule.Job object for specific self._..._scheduler
-        with accordance timing.
+        for user_info in databaseapi.get_unscheduled_users(
+            self._shard_index, self._shards_number
+        ):
+            user = User(user_info[0], user_info)
+            try:
+                # Resetting the same time, stores it in the current form.
+                user.sending_time = user.sending_time
+            except TimingError:
+                continue
+
+    def _index_schedules(
+        self,
+        schedule_index: ScheduleIndex,
+        users_ids: Iterable[int] | None = None,
+    ) -> None:
+        """Adds the sending schedules of users of this shard to the given index.
 
         Args:
-            job_timing (Timing): The timing of the sending, as determined by the user.
-            address_key (str) : The type of the address: email, whatsapp, sms or phone.
+            schedule_index (ScheduleIndex): The index to add to.
+            users_ids (Iterable[int] | None, optional): Add only these users. Defaults to None [all users].
+        """
+        now = self._clock()
+        for user_id, sending_days, sending_minute, time_zone in (
+            databaseapi.get_users_schedules(
+                self._shard_index, self._shards_number, users_ids
+            )
+        ):
+            try:
+                sending_time = Time(
+                    datetime.time(*divmod(sending_minute, 60)),
+                    WeekDays(sending_days),
+                    time_zone or config.DEFAULT_TIMEZONE,
+                )
+            except ValueError:
+                continue
+            schedule_index.add(user_id, sending_time, now)
 
-        Raises:
-            TimingError: If sending timed to saturday.
+    def _build_schedule_index(self) -> None:
+        """Builds the index of the sending schedules of this shard from scratch."""
+        # Read before the build, so changes made during it are applied again rather than missed.
+        last_change_id = databaseapi.get_last_change_id()
+        schedule_index = ScheduleIndex()
+        self._index_schedules(schedule_index)
+        self._schedule_index = schedule_index
+        self._last_change_id = last_change_id
 
-        Returns:
-            schedule.Job: The scheduled Job registered in accordance self._..._scheduler.
+    def _apply_changes(self) -> None:
+        """Applies the changes logged since the last applied one:
+        re-indexes the users of this shard whose schedule has changed,
+        and discards the changed feeds so they are reloaded.
         """
+        changes = databaseapi.get_changes(
+            self._last_change_id, config.CHANGES_BATCH_SIZE
+        )
+        if not changes:
+            return
+        columns = config.USERS_DATA_COLUMNS
+        schedule_fields = {
+            columns.sending_time,
+            columns.sending_schedule,
+            columns.sending_days,
+            columns.sending_minute,
+            columns.timezone,
+        }
+        changed_users: Set[int] = set()
+        for _, entity, entity_id, fields in changes:
+            if entity == config.CHANGED_ENTITIES.feed:
+                Feed.discard(entity_id)
+            elif (
+                entity == config.CHANGED_ENTITIES.user
+                and entity_id % self._shards_number == self._shard_index
+                and (fields is None or schedule_fields.intersection(fields))
+            ):
+                changed_users.add(entity_id)
+        for user_id in changed_users:
+            self._schedule_index.remove(user_id)
+        self._index_schedules(self._schedule_index, changed_users)
+        self._last_change_id = changes[-1][0]
 
-        match job_timing:
-            case Timing.DAILY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().day
-            case Timing.MONDAY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().monday
-            case Timing.TUESDAY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().tuesday
-            case Timing.WEDNESDAY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().wednesday
-            case Timing.THURSDAY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().thursday
-            case Timing.FRIDAY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().friday
-            case Timing.SATURDAY:
-                raise TimingError("It is Shabes Kodesh!!!, What are you doing?!")
-            case Timing.SUNDAY:
-                return self.__dict__[f"_{address_key}_scheduler"].every().sunday
-
-    def _set_updating_schedules(self) -> None:
-        """Set all updating schedules.
-        Used by self.run() to update the self.scheduler(s) according to changes made to the database
-        during program life-time.
+    def _materialize_sends(self, slots: Dict[int, datetime.datetime]) -> None:
+        """Materializes a send for each address of each given user in the outbox,
+        and advances the next_send_at of these users.
+
+        Args:
+            slots (Dict[int, datetime.datetime]): Users ids as keys, and the UTC minute they are due at as values.
         """
-        for scheduler in [
-                self._email_scheduler,
-                self._whatsapp_scheduler,
-                self._sms_scheduler,
-                self._phone_scheduler,
-            ]:
-                scheduler.every(5).minutes.do(self._ensure_users_table_correctness)
-
-    def _set_sending_schedules(self) -> None:
-        """Adds all sending tasks to the self._scheduler, each user as it's preferences.
+        users = [
+            User(user_info[0], user_info)
+            for user_info in databaseapi.get_users_info(slots.keys())
+        ]
+        databaseapi.materialize_outbox_sends(
+            (user.id, address_key, f"{slots[user.id]:%Y-%m-%d %H:%M}")
+            for user in users
+            if user.feeds and user.addresses
+            for address_key in user.addresses.collection
+        )
+        self._advance_next_sendings(users, self._clock())
+
+    def _materialize_due_sends(self) -> None:
+        """Materializes the sends of the users due since the last check, by the schedule index.
+        Users due at the same minute share a slot, and so they are claimed and rendered together.
         """
-        for user in self._users_table.values():
-            try:
-                for address_key, address in user.addresses.collection.items():
-                    job = self._create_job(
-                        user.sending_time.sending_schedule, address_key
-                    )
-                    # TODO match timezone also.
-                    job.at(user.sending_time.sending_time.strftime("%H:%M"))
-                    job.do(address.send_message, *user.feeds.collection).tag(user.id)
-            except TimingError:
+        now = self._clock().replace(second=0, microsecond=0)
+        slots: Dict[int, datetime.datetime] = {}
+        while self._last_checked_minute < now:
+            self._last_checked_minute += datetime.timedelta(minutes=1)
+            for user_id in self._schedule_index.due(
+                week_minute(self._last_checked_minute)
+            ):
+                slots[user_id] = self._last_checked_minute
+        if slots:
+            self._materialize_sends(slots)
+
+    def _catch_up_overdue_sends(self) -> None:
+        """Materializes the sends of users whose next_send_at has passed,
+        but were missed by the schedule index [like sends due while the Messenger was down].
+        """
+        overdue_until = self._last_checked_minute - datetime.timedelta(minutes=1)
+        slots = {
+            user_info[0]: user_info[9]
+            for user_info in databaseapi.get_due_users(
+                overdue_until, self._shard_index, self._shards_number
+            )
+        }
+        if slots:
+            self._materialize_sends(slots)
+
+    def _refresh_schedules(self) -> None:
+        """Rebuilds the schedule index, and catches up the sends it has missed."""
+        self._build_schedule_index()
+        self._catch_up_overdue_sends()
+
+    def _process_outbox(self) -> None:
+        """Claims a batch of due sends from the outbox,
+        renders every feed required by the batch once per message format,
+        and enqueues the messages to the delivery pool.
+        The sends of each channel are limited by the free slots of it's delivery queue,
+        so they are claimed only as fast as they are delivered, and enqueuing them never blocks.
+        """
+        claimed_sends: List[Tuple[int, int, str, str, int]] = []
+        for channels in self._channels_groups:
+            if batch_size := min(
+                config.OUTBOX_CLAIM_BATCH_SIZE,
+                self._delivery_pool.free_slots(channels[0]),
+            ):
+                claimed_sends += databaseapi.claim_outbox_sends(
+                    batch_size, self._shard_index, self._shards_number, channels
+                )
+        if not claimed_sends:
+            return
+        users = {
+            user_info[0]: User(user_info[0], user_info)
+            for user_info in databaseapi.get_users_info(
+                {user_id for _, user_id, *_ in claimed_sends}
+            )
+        }
+        deliveries: List[Tuple[int, int, str, str, User]] = []
+        for send_id, user_id, channel, slot, attempts in claimed_sends:
+            user = users.get(user_id)
+            if (
+                not user
+                or not user.feeds
+                or not user.addresses
+                or channel not in user.addresses
+            ):
+                databaseapi.fail_outbox_send(
+                    send_id, attempts, "The user or its address no longer exists.", None
+                )
                 continue
+            deliveries.append((send_id, attempts, channel, slot, user))
+        # Each format is rendered once for all the feeds of it's channels in the batch.
+        formats_feeds: Dict[str, Set[Feed]] = {}
+        for *_, channel, _, user in deliveries:
+            formats_feeds.setdefault(
+                user.addresses.collection[channel].message_format, set()
+            ).update(user.feeds.collection)
+        if config.MERGED_DIGEST:
+            # Merged digests are rendered per user, so only the downloads are shared.
+            messagesgeneration.ensure_updated_feeds(*set().union(*formats_feeds.values()))
+            formats_fragments = {message_format: {} for message_format in formats_feeds}
+        else:
+            formats_fragments = {
+                message_format: messagesgeneration.generate_feeds_fragments(
+                    message_format, *feeds
+                )
+                for message_format, feeds in formats_feeds.items()
+            }
+        for send_id, attempts, channel, slot, user in deliveries:
+            address = user.addresses.collection[channel]
+            self._delivery_pool.submit(
+                channel,
+                deliver,
+                send_id,
+                attempts,
+                channel,
+                slot,
+                address,
+                user.feeds.collection,
+                formats_fragments[address.message_format],
+                self._clock,
+            )
+
+    @staticmethod
+    def _report_metrics() -> None:
+        """Prints the metrics of the distribution pipeline,
+        and alerts about channels whose sending lateness exceeds config.SEND_LATENESS_ALERT_THRESHOLD.
+        """
+        # TODO log it
+        print(METRICS.report())
+        print(FEEDS_REGISTRY.info())
+        if THUMBNAILS is not None:
+            # TODO log it
+            print(THUMBNAILS.info())
+        for channel in config.CHANNELS_CONCURRENCY_LIMITS:
+            lateness = METRICS.merged("send_lateness_seconds", channel=channel)
+            if lateness.quantile(0.99) > config.SEND_LATENESS_ALERT_THRESHOLD:
+                # TODO log it
+                print(
+                    f"ALERT: p99 sending lateness of {channel} exceeds "
+                    f"{config.SEND_LATENESS_ALERT_THRESHOLD} seconds"
+                )
+
+    def _set_schedules(self) -> None:
+        """Set the schedules of checking due users, refreshing the schedule index,
+        applying the logged changes, claiming due sends from the outbox, and reporting the metrics.
+        """
+        for interval, job in (
+            (config.SCHEDULE_INDEX_REFRESH_INTERVAL, self._refresh_schedules),
+            (config.CHANGES_POLLING_INTERVAL, self._apply_changes),
+            (config.DUE_USERS_POLLING_INTERVAL, self._materialize_due_sends),
+            (config.OUTBOX_POLLING_INTERVAL, self._process_outbox),
+            (config.METRICS_REPORT_INTERVAL, self._report_metrics),
+        ):
+            self._scheduler.every(interval / self._time_scale).seconds.do(job)
 
     def run(self) -> None:
-        """Defines the schedules, and runs them."""
-        self._set_sending_schedules()
-        self._set_updating_schedules()
-        while True:
-            self._email_scheduler.run_pending()
-            self._whatsapp_scheduler.run_pending()
-            self._sms_scheduler.run_pending()
-            self._phone_scheduler.run_pending()
-            time.sleep(1)
+        """Defines the schedules, and runs them until stop() is called."""
+        self._schedule_unscheduled_users()
+        self._refresh_schedules()
+        self._set_schedules()
+        self._delivery_pool.start()
+        try:
+            while not self._stopped.wait(min(1, 1 / self._time_scale)):
+                self._scheduler.run_pending()
+        finally:
+            self._delivery_pool.shutdown()
+
+    def stop(self) -> None:
+        """Stops run(), after the messages already enqueued to the delivery pool are sent."""
+        self._stopped.set()
+
+    @property
+    def delivery_stats(self) -> DeliveryPoolStats:
+        """Statistics of the delivery pool, like queue depth and wait time.
+
+        Returns:
+            DeliveryPoolStats: The current statistics.
+        """
+        return self._delivery_pool.stats()
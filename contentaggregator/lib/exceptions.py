@@ -59,5 +59,26 @@ class IncorrectPassword(Exception):
         super().__init__(message)
         self.criticality: int = 5
 
+class TooManyAttempts(Exception):
+    """Exception for throttled logins or sign ups: Too many attempts of the username or the client recently"""
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.criticality: int = 11
+
+
+class ServerBusy(Exception):
+    """Exception for passwords operations that are rejected, since too many operations are pending"""
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.criticality: int = 11
+
 class TimingError(Exception):
     """Exception for disabled sending timing, like saturday."""
+
+
+class UndeliverableMessage(Exception):
+    """Exception for messages rejected by their transport, like an invalid number, so there is no point in retrying them."""
+
+
+class ImageRejected(Exception):
+    """Exception for images that are not fetched or decoded: Of a non public or not allowed host, or too large."""
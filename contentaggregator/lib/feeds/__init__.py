@@ -1,2 +1,3 @@
 from contentaggregator.lib.feeds import feed
+from contentaggregator.lib.feeds import htmltext
 from contentaggregator.lib.feeds import rating
\ No newline at end of file
@@ -3,17 +3,24 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import contextlib
-from typing import List, Tuple, Set, Any
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, List, NamedTuple, Tuple, Set, Any
+import calendar
+import itertools
+import sys
+import threading
 import time, datetime
 from enum import Enum
 import json
 
 import feedparser
-from bs4 import BeautifulSoup
 
 from contentaggregator.lib import config
+from contentaggregator.lib.metrics import METRICS
 from contentaggregator.lib.sqlmanagement import databaseapi
+from contentaggregator.lib.feeds.htmltext import first_link_text
 from contentaggregator.lib.feeds.rating import FeedRatingResetManager
 from contentaggregator.lib.common import ObjectResetOperationClassifier
 from contentaggregator.lib import webrequests
@@ -28,16 +35,167 @@ class FeedCategories(Enum):
     TRAVEL = 3
 
 
+# Versions of the feeds contents, unique in the process [also across instances of the same feed],
+# so a version of a re-created instance never matches one derived from a previous instance.
+_CONTENT_VERSIONS = itertools.count(1)
+
+
+class FeedsRegistryInfo(NamedTuple):
+    """Statistics of the FeedsRegistry."""
+
+    instances: int
+    max_instances: int
+    resident_bytes: int
+    max_resident_bytes: int
+    instances_evictions: int
+    contents_evictions: int
+
+
+class FeedsRegistry:
+    """A bounded registry of the feeds instances, a single instance per feed id.
+    The instances are evicted by LRU once there are more than max_instances,
+    and the content of the least recently used feeds is released once the items of all feeds
+    take more than max_resident_bytes [approximately]. Feeds without content keep their metadata,
+    and download the content again when it's required.
+    The content of evicted instances is released too, and if they are still referenced [by users]
+    and download it again, it's accounted like the content of the registered instances.
+    """
+
+    def __init__(self, max_instances: int, max_resident_bytes: int) -> None:
+        """
+        Args:
+            max_instances (int): Maximum number of feeds instances.
+            max_resident_bytes (int): Memory budget of the feeds items, in bytes.
+        """
+        self._max_instances = max_instances
+        self._max_resident_bytes = max_resident_bytes
+        # Feed ids as keys and instances as values, from the least to the most recently used.
+        self._instances: OrderedDict[int, Feed] = OrderedDict()
+        # The instances that hold content, from the least to the most recently used.
+        # Keyed by identity, since an evicted instance and the registered one of the same feed may both hold content.
+        # The instances and the sizes of their content as values.
+        self._contents: OrderedDict[int, Tuple[Feed, int]] = OrderedDict()
+        self._resident_bytes: int = 0
+        self._instances_evictions: int = 0
+        self._contents_evictions: int = 0
+        self._lock = threading.RLock()
+
+    def get(self, feed_id: int) -> Feed | None:
+        """Gets the instance of the given feed, if there is one.
+
+        Args:
+            feed_id (int): The id of the feed.
+
+        Returns:
+            Feed | None: The instance, None if the feed is not registered.
+        """
+        with self._lock:
+            if (instance := self._instances.get(feed_id)) is not None:
+                self._instances.move_to_end(feed_id)
+            return instance
+
+    def get_or_add(self, feed_id: int, create: Callable[[], Feed]) -> Feed:
+        """Gets the instance of the given feed, registers a new one if there isn't.
+
+        Args:
+            feed_id (int): The id of the feed.
+            create (Callable[[], Feed]): Creates a new instance of the feed.
+
+        Returns:
+            Feed: The instance.
+        """
+        with self._lock:
+            if (instance := self.get(feed_id)) is not None:
+                return instance
+            instance = self._instances[feed_id] = create()
+            while len(self._instances) > self._max_instances:
+                _, evicted_instance = self._instances.popitem(last=False)
+                self._release_content(evicted_instance)
+                self._instances_evictions += 1
+            return instance
+
+    def discard(self, feed_id: int) -> None:
+        """Forgets the instance of the given feed, and releases it's content, if there is one.
+
+        Args:
+            feed_id (int): The id of the feed.
+        """
+        with self._lock:
+            if (instance := self._instances.pop(feed_id, None)) is not None:
+                self._release_content(instance)
+
+    def _forget_content(self, feed: Feed) -> None:
+        """Stops accounting the content of the given instance."""
+        if (content := self._contents.pop(id(feed), None)) is not None:
+            self._resident_bytes -= content[1]
+
+    def _release_content(self, feed: Feed) -> None:
+        """Releases the content of the given instance, and stops accounting it."""
+        self._forget_content(feed)
+        feed.release_content()
+
+    def touch_content(self, feed: Feed) -> None:
+        """Marks the content of the given instance as the most recently used.
+
+        Args:
+            feed (Feed): The instance of the feed.
+        """
+        with self._lock:
+            if id(feed) in self._contents:
+                self._contents.move_to_end(id(feed))
+
+    def account_content(self, feed: Feed, size: int) -> None:
+        """Accounts the new content of the given feed, and releases the content of the least recently used feeds
+        while the contents exceed the memory budget.
+
+        Args:
+            feed (Feed): The feed whose content was downloaded.
+            size (int): The approximate size of the content, in bytes.
+        """
+        with self._lock:
+            self._forget_content(feed)
+            self._contents[id(feed)] = feed, size
+            self._resident_bytes += size
+            while (
+                self._resident_bytes > self._max_resident_bytes
+                and len(self._contents) > 1
+            ):
+                _, (evicted_feed, evicted_size) = self._contents.popitem(last=False)
+                self._resident_bytes -= evicted_size
+                self._contents_evictions += 1
+                evicted_feed.release_content()
+
+    def info(self) -> FeedsRegistryInfo:
+        """Returns the statistics of the registry.
+
+        Returns:
+            FeedsRegistryInfo: Number of instances, resident content bytes, their limits and evictions counters.
+        """
+        with self._lock:
+            return FeedsRegistryInfo(
+                len(self._instances),
+                self._max_instances,
+                self._resident_bytes,
+                self._max_resident_bytes,
+                self._instances_evictions,
+                self._contents_evictions,
+            )
+
+
+# Shared by the whole process, so each feed is downloaded by a single instance.
+FEEDS_REGISTRY = FeedsRegistry(
+    config.FEEDS_REGISTRY_MAX_INSTANCES, config.FEEDS_CONTENT_MAX_BYTES
+)
+
+
 class Feed(ABC):
     """Represents a feed in the system.
     An half-abstract class for all feed types.
     """
 
-    _instances = {}
-
     def __new__(cls, **kwargs) -> Feed:
         """Prevent instantiation of new feed with the same id as one that already exists
-        in _instances dictionary.
+        in FEEDS_REGISTRY.
         it's important to avoid unnecessary content downloads, for example.
 
         Returns:
@@ -45,9 +203,19 @@ class Feed(ABC):
         """
         if "feed_id" not in kwargs:
             return super(Feed, cls).__new__(cls)
-        if not cls._instances.get(kwargs["feed_id"], None):
-            cls._instances[kwargs["feed_id"]] = super(Feed, cls).__new__(cls)
-        return cls._instances[kwargs["feed_id"]]
+        return FEEDS_REGISTRY.get_or_add(
+            kwargs["feed_id"], lambda: super(Feed, cls).__new__(cls)
+        )
+
+    @classmethod
+    def discard(cls, feed_id: int) -> None:
+        """Forgets the instance of the given feed, if there is one.
+        So that the next instantiation reloads it from the database, like after it was changed.
+
+        Args:
+            feed_id (int): The id of the feed.
+        """
+        FEEDS_REGISTRY.discard(feed_id)
 
     def __init__(self, *, feed_id: int) -> None:
         self._id: int = feed_id
@@ -55,7 +223,8 @@ class Feed(ABC):
         self._rating: FeedRatingResetManager | None = None
         self._categories: Set[FeedCategories] | None = None
         self._content_info: Tuple[datetime.datetime, List[FeedItem]] | None = None
-        self._parsed_feed: feedparser.FeedParserDict | str | None = None
+        self._content_hash: int | None = None
+        self._content_version: int = 0
         self._language: str | bool | None = None
         self._title: str | None = None
         self._image: str | bool | None = None
@@ -92,6 +261,42 @@ class Feed(ABC):
             desired_rows_num=1,
         )
 
+    def set_database_info(self, info: Tuple[Any, ...]) -> None:
+        """Replaces the cached information of this feed by the given row of it,
+        like when the rows of many feeds are selected by a single query.
+        The properties that were read from the previous row are read again.
+
+        Args:
+            info (Tuple[Any, ...]): The row of this feed in the feeds table.
+        """
+        self._cached_info = [info]
+        self._url = self._rating = self._categories = self._items_size = None
+        self._title = self._website = self._image = self._description = None
+
+    def _stored_channel_info(self) -> Tuple[str | None, ...]:
+        """Returns the channel metadata of this feed, as it was last stored in the database.
+
+        Returns:
+            Tuple[str | None, ...]: The title, website, image and description [None if unavailable].
+        """
+        if not self._cached_info:
+            self._cache_database_info()
+        return tuple(self._cached_info[0][6:10])
+
+    def _update_database(self, updates_dict: Dict[str, Any]) -> None:
+        """Updates the row of this feed in the database,
+        and logs the change so other processes can apply it.
+
+        Args:
+            updates_dict (Dict[str, Any]): Dictionary of columns names as keys and the new values as values.
+        """
+        databaseapi.update(
+            table=config.DATABASE_TABLES_NAMES.feeds_table,
+            updates_dict=updates_dict,
+            condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {self._id}",
+        )
+        databaseapi.log_change(config.CHANGED_ENTITIES.feed, self._id, updates_dict)
+
     @property
     def id(self) -> int:
         """Property getter for feed id in the feeds table.
@@ -128,11 +333,7 @@ class Feed(ABC):
         if not self.is_valid(new_url):
             raise ValueError("Invalid url")
         self._url = new_url
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.feeds_table,
-            updates_dict={config.FEEDS_DATA_COLUMNS.link: repr(new_url)},
-            condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {self._id}",
-        )
+        self._update_database({config.FEEDS_DATA_COLUMNS.link: repr(new_url)})
 
     @property
     def rating(self) -> bool | float:
@@ -179,11 +380,7 @@ class Feed(ABC):
             _set_final_rating: Sets the final rating by the desired reset operation.
         """
         final_rating = self._set_final_rating(rating_amount)
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.feeds_table,
-            updates_dict={config.FEEDS_DATA_COLUMNS.rating: repr(final_rating)},
-            condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {self.id}",
-        )
+        self._update_database({config.FEEDS_DATA_COLUMNS.rating: repr(final_rating)})
         self._rating.rating = final_rating
 
     @property
@@ -212,26 +409,65 @@ class Feed(ABC):
         """
         if size <= 0:
             raise ValueError("Items_size must be greater than zero.")
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.feeds_table,
-            updates_dict={config.FEEDS_DATA_COLUMNS.items_size: size},
-            condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {self._id}",
-        )
+        self._update_database({config.FEEDS_DATA_COLUMNS.items_size: size})
         self._items_size = size
 
-    def should_be_updated(self) -> bool:
-        """Checks if self.content_info needs to be updated.
+    @staticmethod
+    def _is_outdated(
+        content_info: Tuple[datetime.datetime, List[FeedItem]] | None
+    ) -> bool:
+        """Checks if the given content info needs to be updated.
            Depends on the last download time [if more than five minutes have passed]
            and if there was one.
 
+        Args:
+            content_info (Tuple[datetime.datetime, List[FeedItem]] | None): The download time and the items,
+                                                                            None if there is no content.
+
         Returns:
-            bool: True if feed should be updated, False otherwise.
+            bool: True if it should be updated, False otherwise.
         """
         return (
-            not self._content_info
-            or (self._content_info[0] - datetime.datetime.now()).seconds // 60 > 5
+            not content_info
+            or (datetime.datetime.now() - content_info[0]).total_seconds() > 5 * 60
+        )
+
+    def should_be_updated(self) -> bool:
+        """Checks if self.content_info needs to be updated.
+
+        Returns:
+            bool: True if feed should be updated, False otherwise.
+        """
+        return self._is_outdated(self._content_info)
+
+    def _update_content_info(self, items: List[FeedItem]) -> None:
+        """Stores the given items as the content of this feed, sorted from the newest if they all have
+        a publication time, and gives it a new self._content_version if they differ from the current ones.
+        The items are sorted once here, so the renders share them without sorting.
+
+        Args:
+            items (List[FeedItem]): The newly downloaded items.
+        """
+        if all(item.publication_timestamp for item in items):
+            items.sort(key=lambda item: item.publication_timestamp, reverse=True)
+        content_hash = hash(
+            tuple((item.url, item.title, item.publication_timestamp) for item in items)
+        )
+        if content_hash != self._content_hash:
+            self._content_hash = content_hash
+            self._content_version = next(_CONTENT_VERSIONS)
+        self._content_info = datetime.datetime.now(), items
+        FEEDS_REGISTRY.account_content(
+            self, sum(item.approximate_size() for item in items)
         )
 
+    def release_content(self) -> None:
+        """Releases the items of this feed, they are downloaded again once required.
+        The content hash and version are kept, so an unchanged download doesn't invalidate
+        anything that was derived from the content.
+        """
+        self._content_info = None
+
     @property
     def categories(self) -> bool | Set[FeedCategories]:
         """Getter property, for categories of this feed.
@@ -266,12 +502,8 @@ class Feed(ABC):
                 "Feed category must be a type of FeedCategories Enum class."
             )
         new_categories = {category.value for category in categories}
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.feeds_table,
-            updates_dict={
-                config.FEEDS_DATA_COLUMNS.categories: json.dumps(new_categories)
-            },
-            condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {self._id}",
+        self._update_database(
+            {config.FEEDS_DATA_COLUMNS.categories: json.dumps(new_categories)}
         )
         self._categories = new_categories
 
@@ -323,8 +555,21 @@ class Feed(ABC):
         Returns:
             List[FeedItem]: The list of feed items.
         """
+        # Marked as used before it's ensured, so it's the last to be released.
+        FEEDS_REGISTRY.touch_content(self)
+        return self.ensure_updated_stream()
+
+    @property
+    def content_version(self) -> int:
+        """Property for the version of the feed content.
+        The version is advanced whenever a download produces new items,
+        so it can be used to invalidate anything derived from the content.
+
+        Returns:
+            int: The current content version.
+        """
         self.ensure_updated_stream()
-        return self._content_info[1]
+        return self._content_version
 
     @property
     @abstractmethod
@@ -353,8 +598,13 @@ class Feed(ABC):
             # TODO log it
 
     @abstractmethod
-    def ensure_updated_stream(self) -> None:
-        """Ensures that the self._content_info[1] is updated."""
+    def ensure_updated_stream(self) -> List[FeedItem]:
+        """Ensures that the self._content_info[1] is updated.
+
+        Returns:
+            List[FeedItem]: The updated items. Returned rather than read from self._content_info,
+                            since another thread may release the content meanwhile.
+        """
         pass
 
 
@@ -379,60 +629,82 @@ class XMLFeed(Feed):
                 return True
         return False
 
-    def ensure_updated_stream(self) -> None:
-        if self.should_be_updated():
-            self._parsed_feed = feedparser.parse(self._download())
-            self._content_info = datetime.datetime.now(), [
-                XMLFeedItem(item, self._parsed_feed.version)
-                for item in self._parsed_feed.entries[: self.items_size]
+    def ensure_updated_stream(self) -> List[FeedItem]:
+        content_info = self._content_info
+        if not self._is_outdated(content_info):
+            return content_info[1]
+        with METRICS.timer("feed_refresh_seconds"):
+            feed_document = self._download()
+        with METRICS.timer("feed_parse_seconds"):
+            parsed_feed = feedparser.parse(feed_document)
+            items = [
+                XMLFeedItem.from_entry(entry, parsed_feed.version)
+                for entry in parsed_feed.entries[: self.items_size]
+            ]
+            self._extract_channel(parsed_feed.feed)
+        # The parse tree is released here, only the extracted properties are kept.
+        self._update_content_info(items)
+        return items
+
+    def _extract_channel(self, channel: feedparser.util.FeedParserDict) -> None:
+        """Extracts the properties of the feed from the parsed channel element,
+        and stores the channel metadata in the database if it has changed,
+        so it can be read without downloading the feed.
+
+        Args:
+            channel (feedparser.util.FeedParserDict): The parsed channel.
+        """
+        self._language = channel.get("language", False)
+        if not channel:
+            # The download failed, the stored metadata is kept.
+            return
+        columns = config.FEEDS_DATA_COLUMNS
+        channel_info = {
+            columns.title: channel.get("title") or None,
+            columns.website: channel.get("link") or None,
+            columns.image: channel.get("image", {}).get("href") or None,
+            columns.description: channel.get("description") or None,
+        }
+        if tuple(channel_info.values()) != self._stored_channel_info():
+            # Not logged as a change, it's derived from the source rather than edited.
+            databaseapi.set_feed_channel(self._id, channel_info)
+            self._cached_info = [
+                self._cached_info[0][:6]
+                + tuple(channel_info.values())
+                + self._cached_info[0][10:]
             ]
+        self._title = self._website = self._image = self._description = None
 
     @property
     def language(self) -> str | bool:
-        if self._language is None:
-            try:
-                self._language = self._parsed_feed.channel.language
-            except AttributeError:
-                self._language = False
+        self.ensure_updated_stream()
         return self._language
 
     @property
     def title(self) -> str:
         if self._title is None:
-            try:
-                self._title = self._parsed_feed.channel.title
-            except AttributeError:
-                self._title = self.url[self.url.find("//") + 2 : self.url.find(".")]
+            self._title = self._stored_channel_info()[0] or self.url[
+                self.url.find("//") + 2 : self.url.find(".")
+            ]
         return self._title
 
     @property
-    def description(self) -> str | bool:
-        if self._description is None:
-            try:
-                self._description = self._parsed_feed.channel.description
-            except AttributeError:
-                self._description = False
-        return self._description
+    def website(self) -> str | bool:
+        if self._website is None:
+            self._website = self._stored_channel_info()[1] or False
+        return self._website
 
     @property
     def image(self) -> str | bool:
-        self.ensure_updated_stream()
         if self._image is None:
-            try:
-                self._image = self._parsed_feed.channel.image.href
-            except AttributeError:
-                self._image = False
+            self._image = self._stored_channel_info()[2] or False
         return self._image
 
     @property
-    def website(self) -> str | bool:
-        if self._website is None:
-            self.ensure_updated_stream()
-            try:
-                self._website = self._parsed_feed.channel.link
-            except AttributeError:
-                self._website = False
-        return self._website
+    def description(self) -> str | bool:
+        if self._description is None:
+            self._description = self._stored_channel_info()[3] or False
+        return self._description
 
 
 class HTMLFeed(Feed):
@@ -455,7 +727,7 @@ class HTMLFeed(Feed):
             == "text/html"
         )
 
-    def ensure_updated_stream(self) -> None:
+    def ensure_updated_stream(self) -> List[FeedItem]:
         raise NotImplementedError
 
     @property
@@ -483,138 +755,116 @@ class FeedFactory:
     """Factory for creating a custom feed object by url parameter"""
 
     @staticmethod
-    def create(feed_id: int, feed_type: str | None = None) -> Feed:
+    def create(
+        feed_id: int,
+        feed_type: str | None = None,
+        info: Tuple[Any, ...] | None = None,
+    ) -> Feed:
         """Creates a feed object by its type.
 
         Args:
             feed_id (int): The id of the feed.
             feed_type (str): The feed type. optional.
+            info (Tuple[Any, ...] | None): The row of the feed in the feeds table, optional.
+                                           Saves the query of it's properties if given.
 
         Returns:
             Feed: An Feed object matched to the feed type.
 
         """
-        # The reason for this private \ protected class member access,
-        # is to make sure we don't create a sql query unnecessarily.
-        if feed_id in Feed._instances:
-            return Feed._instances[feed_id]
-        if not feed_type:
-            feed_type = databaseapi.select(
-                cols=config.FEEDS_DATA_COLUMNS.feed_type,
-                table=config.DATABASE_TABLES_NAMES.feeds_table,
-                condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {feed_id}",
-            )[0][0]
-        match feed_type:
-            case config.FEED_TYPES.html:
-                return HTMLFeed(feed_id=feed_id)
-            case config.FEED_TYPES.xml:
-                return XMLFeed(feed_id=feed_id)
-
-
-class FeedItem(ABC):
+        # The registered instance is returned before the feed type is selected,
+        # to make sure we don't create a sql query unnecessarily.
+        if (feed_obj := FEEDS_REGISTRY.get(feed_id)) is None:
+            if not feed_type:
+                feed_type = databaseapi.select(
+                    cols=config.FEEDS_DATA_COLUMNS.feed_type,
+                    table=config.DATABASE_TABLES_NAMES.feeds_table,
+                    condition_expr=f"{config.FEEDS_DATA_COLUMNS.id} = {feed_id}",
+                )[0][0]
+            match feed_type:
+                case config.FEED_TYPES.html:
+                    feed_obj = HTMLFeed(feed_id=feed_id)
+                case config.FEED_TYPES.xml:
+                    feed_obj = XMLFeed(feed_id=feed_id)
+        if info is not None:
+            feed_obj.set_database_info(info)
+        return feed_obj
+
+
+@dataclass(frozen=True, slots=True)
+class FeedItem:
     """Represents a feed item, with link, image, title, and publication_time attributes.
     FeedItem can be a news item, a podcast item, or anything like that.
+    A compact record, its fields are extracted once when the feed is parsed,
+    so the parse tree can be released, and it's cheap to pickle.
     """
 
-    def __init__(
-        self, item_string: feedparser.util.FeedParserDict, feed_version: str
-    ) -> None:
-        self._item: feedparser.util.FeedParserDict = item_string
-        self._version: str = feed_version
-        self._image: str | bool | None = None
-        self._title: str | bool | None = None
-        self._description: str | bool | None = None
-        self._url: str | bool | None = None
-        self._publication_time: time.struct_time | bool | None = None
+    # The specific url of this item, False if not available.
+    url: str | bool
+    # The title \ header of the item, False if not available.
+    title: str | bool
+    # The description of the item, False if not available.
+    description: str | bool
+    # The url of the image describes this item, False if there isn't one.
+    image: str | bool
+    # The publication time of the item as UTC seconds since the epoch, for cheap comparisons.
+    # None if not available.
+    publication_timestamp: int | None
 
     @property
-    @abstractmethod
-    def image(self) -> str | bool | None:
-        """Returns the url of the image describes this item, if there is one.
-
-        Returns:
-            str | bool: The image url if available, False otherwise.
-        """
-        pass
-
-    @property
-    @abstractmethod
-    def title(self) -> str | bool:
-        """Returns the title \ header of the item.
-
-        Returns:
-            str: The title of the item as string.
-        """
-        pass
-
-    @property
-    @abstractmethod
-    def description(self) -> str | bool:
-        """Returns the description of the item, if available. else returns False"""
-        pass
-
-    @property
-    @abstractmethod
-    def url(self) -> str | bool:
-        """Returns the specific url of this item.
+    def publication_time(self) -> time.struct_time | bool:
+        """Returns the publication date and time of the item.
 
         Returns:
-            str: The url of the item.
+            time.struct_time | bool: The UTC publication date and time of the item if available, False otherwise.
         """
-        pass
+        if self.publication_timestamp is None:
+            return False
+        return time.gmtime(self.publication_timestamp)
 
-    @property
-    @abstractmethod
-    def publication_time(self) -> time.struct_time | bool:
-        """Returns the publication date and time of the item.
+    def approximate_size(self) -> int:
+        """Returns the approximate memory of the item and it's fields, in bytes.
 
         Returns:
-            datetime | bool: The publication date and time of the item if available, false otherwise.
+            int: The size in bytes.
         """
-        pass
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(getattr(self, field.name)) for field in fields(self)
+        )
 
 
 class XMLFeedItem(FeedItem):
-    """Construct of a feed item.
-    contains the feed properties, with easy and secure access.
-    """
+    """Construct of a feed item, of based-XML feeds."""
 
-    @property
-    def image(self) -> str | bool:
-        if "rss2" not in self._version:
-            self._image = False
-            return
-        if self._image is None:
-            try:
-                self._image = self._item.media_thumbnail[0]["url"]
-            except AttributeError:
-                self._image = False
-        return self._image
+    __slots__ = ()
 
-    @property
-    def title(self) -> str | bool:
-        if self._title is None:
-            self._title = self._item.get("title", False)
-        return self._title
+    @classmethod
+    def from_entry(
+        cls, entry: feedparser.util.FeedParserDict, feed_version: str
+    ) -> XMLFeedItem:
+        """Extracts the item properties from a parsed feed entry.
 
-    @property
-    def description(self) -> str | bool:
-        if self._description is None:
-            self._description = self._item.get("description", False)
-            if self._description:
-                description_soup = BeautifulSoup(self._description, "html.parser")
-                if description_str := description_soup.find("a"):
-                    self._description = description_str.text.strip()
-        return self._description
-
-    @property
-    def url(self) -> str | bool:
-        if self._url is None:
-            self._url = self._item.get("link", False)
-        return self._url
+        Args:
+            entry (feedparser.util.FeedParserDict): The parsed entry.
+            feed_version (str): The version of the feed, like 'rss20' or 'atom10'.
 
-    @property
-    def publication_time(self) -> time.struct_time | bool:
-        if self._publication_time is None:
-            self._publication_time = self._item.get("updated_parsed", False)
-        return self._publication_time
+        Returns:
+            XMLFeedItem: The item.
+        """
+        image = False
+        if "rss2" in feed_version:
+            with contextlib.suppress(AttributeError, IndexError, KeyError):
+                image = entry.media_thumbnail[0]["url"]
+        description = entry.get("description", False)
+        if description and (link_text := first_link_text(description)) is not None:
+            description = link_text
+        publication_time = entry.get("updated_parsed")
+        return cls(
+            url=entry.get("link", False),
+            title=entry.get("title", False),
+            description=description,
+            image=image,
+            publication_timestamp=calendar.timegm(publication_time)
+            if publication_time
+            else None,
+        )
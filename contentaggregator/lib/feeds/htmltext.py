@@ -0,0 +1,85 @@
+"""Fast text extraction from the html of feeds descriptions.
+Tokenizes the html by the standard library parser [the one BeautifulSoup's "html.parser" builds it's tree by],
+without building a tree, and stops at the end of the wanted element.
+"""
+
+from __future__ import annotations
+import html
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import List
+
+# Elements whose strings are not text, like BeautifulSoup's Script and Stylesheet strings.
+_NON_TEXT_ELEMENTS = frozenset(("script", "style", "template", "rt", "rp"))
+
+
+class _LinkClosed(Exception):
+    """Raised to stop tokenizing once the first link is closed."""
+
+
+class _FirstLinkTextParser(HTMLParser):
+    """Collects the text of the first <a> element, including the text of it's descendants."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.found: bool = False
+        self.text: List[str] = []
+        self._links_depth: int = 0
+        self._non_text_depth: int = 0
+
+    def handle_starttag(self, tag: str, attrs: List) -> None:
+        if tag == "a":
+            self.found = True
+            self._links_depth += 1
+        elif self._links_depth and tag in _NON_TEXT_ELEMENTS:
+            self._non_text_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._links_depth:
+            return
+        if tag == "a":
+            self._links_depth -= 1
+            if not self._links_depth:
+                raise _LinkClosed
+        elif tag in _NON_TEXT_ELEMENTS and self._non_text_depth:
+            self._non_text_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._links_depth and not self._non_text_depth:
+            self.text.append(data)
+
+    def handle_entityref(self, name: str) -> None:
+        # Unknown entities are kept as literal text, without their semicolon, like BeautifulSoup does.
+        self.handle_data(html5.get(f"{name};", f"&{name}"))
+
+    def handle_charref(self, name: str) -> None:
+        self.handle_data(html.unescape(f"&#{name};"))
+
+    def unknown_decl(self, data: str) -> None:
+        # CDATA sections are text as well.
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA[") :])
+
+
+def first_link_text(html_str: str) -> str | None:
+    """Extracts the text of the first link of the given html,
+    like BeautifulSoup(html, "html.parser").find("a").text.strip().
+
+    Args:
+        html_str (str): The html, like the description of a feed item.
+
+    Returns:
+        str | None: The stripped text of the first <a> element, None if there isn't one.
+    """
+    # Most descriptions have no links at all, and are not tokenized.
+    if "<a" not in html_str and "<A" not in html_str:
+        return None
+    parser = _FirstLinkTextParser()
+    try:
+        parser.feed(html_str)
+        parser.close()
+    except _LinkClosed:
+        pass
+    if not parser.found:
+        return None
+    return "".join(parser.text).strip()
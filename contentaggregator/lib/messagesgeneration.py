@@ -2,36 +2,147 @@
 which intended to generate messages in several forms, for various destinations
 such as Email, whatsapp, voice messages, etc.
 """
-from typing import List
+from typing import List, Dict, Iterable, Tuple, Callable, NamedTuple
+from concurrent import futures
+import heapq
+import html
+import itertools
+import re
+import threading
 import time
 
+import cachetools
+import jinja2
 import tinyhtml
 
 from contentaggregator.lib import config
 from contentaggregator.lib.feeds.feed import Feed, FeedItem
+from contentaggregator.lib.metrics import METRICS
+from contentaggregator.lib.thumbnails import (
+    image_url,
+    render_tracking_pending_images,
+)
 
 
-def _sort_feed_items(feed_items: List[FeedItem]) -> None:
-    """Sorts items in-place by it's publishing date if it's available, in a reverse order
+class RenderCacheInfo(NamedTuple):
+    """Statistics of the FeedRenderCache."""
 
-    Args:
-        feed_items (List[FeedItem]): List of feed items.
+    hits: int
+    misses: int
+    currsize: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of the hits out of all cache lookups, 0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FeedRenderCache:
+    """A memory bounded LRU cache for rendered feeds.
+    Each entry is keyed by the feed id, the render function [so the format],
+    and the other inputs of the render [the items size and the channel metadata],
+    and it's stored with the content version it was rendered from,
+    so it's invalidated once the feed downloads new items.
+    Renders that reference an original image, since it's thumbnail is still pending, are not cached,
+    so the thumbnail is referenced once it's stored.
+    The lookups are counted by METRICS as render_cache_lookups, labeled by the renderer and the result.
     """
-    if all(item.publication_time for item in feed_items):
-        feed_items.sort(
-            key=lambda x: (
-                x.publication_time.tm_year,
-                x.publication_time.tm_mon,
-                x.publication_time.tm_mday,
-                x.publication_time.tm_hour,
-                x.publication_time.tm_min,
-            ),
-            reverse=True,
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: cachetools.LRUCache = cachetools.LRUCache(
+            maxsize=maxsize, getsizeof=lambda entry: len(entry[1])
         )
+        self._lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
 
+    def get_or_render(self, feed: Feed, render: Callable[[Feed], str]) -> str:
+        """Gets the rendered string of the feed from the cache,
+        or renders it by the given render function if it's missing or outdated.
 
-def generate_html_feed_summery(feed: Feed) -> str:
-    """Generates a prettify HTML string for specific given feed.
+        Args:
+            feed (Feed): The feed to be rendered.
+            render (Callable[[Feed], str]): The function that renders the feed.
+
+        Returns:
+            str: The rendered string.
+        """
+        version = feed.content_version
+        key = (
+            feed.id,
+            render.__name__,
+            feed.items_size,
+            feed.title,
+            feed.website,
+            feed.image,
+        )
+        with self._lock:
+            entry: Tuple[int, str] | None = self._cache.get(key)
+            if entry and entry[0] == version:
+                self._hits += 1
+                is_hit = True
+            else:
+                self._misses += 1
+                is_hit = False
+        METRICS.increment(
+            "render_cache_lookups",
+            renderer=render.__name__,
+            result="hit" if is_hit else "miss",
+        )
+        if is_hit:
+            return entry[1]
+        with METRICS.timer("render_seconds", renderer=render.__name__):
+            rendered, has_pending_images = render_tracking_pending_images(
+                render, feed
+            )
+        if has_pending_images:
+            return rendered
+        with self._lock:
+            try:
+                self._cache[key] = version, rendered
+            except ValueError:
+                # The rendered string is larger than the whole cache.
+                self._cache.pop(key, None)
+        return rendered
+
+    def info(self) -> RenderCacheInfo:
+        """Returns the statistics of the cache.
+
+        Returns:
+            RenderCacheInfo: Hits, misses, current and maximum size of the cache.
+        """
+        with self._lock:
+            return RenderCacheInfo(
+                self._hits, self._misses, self._cache.currsize, self._cache.maxsize
+            )
+
+    def clear(self) -> None:
+        """Removes all entries and resets the statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
+
+
+# Shared by all messages, so each feed version is rendered once for all it's subscribers.
+RENDER_CACHE = FeedRenderCache(config.RENDER_CACHE_MAX_SIZE)
+
+
+def _recency(item: FeedItem) -> int:
+    """Sorting key of items by their publication time, items without one are the oldest.
+
+    Args:
+        item (FeedItem): The item.
+
+    Returns:
+        int: The publication timestamp, 0 if it's unavailable.
+    """
+    return item.publication_timestamp or 0
+
+
+def _render_html_feed_summery(feed: Feed) -> str:
+    """Renders a prettify HTML string for specific given feed.
 
     Args:
         feed (Feed): A feed to be extract from.
@@ -40,12 +151,11 @@ def generate_html_feed_summery(feed: Feed) -> str:
         str: The html string.
     """
     feed_content = feed.content
-    _sort_feed_items(feed_content)
     html_obj = tinyhtml.h("div", style="text-align: center;")(
         #Place the website image or trademark on the top of the summary.
         (
             tinyhtml.h("a", href=feed.website)(
-                tinyhtml.h("img", src=feed.image) if feed.image else None
+                tinyhtml.h("img", src=image_url(feed.image)) if feed.image else None
             )
             if feed.website
             else None
@@ -68,7 +178,9 @@ def generate_html_feed_summery(feed: Feed) -> str:
                 (tinyhtml.h("h3")(item.description if item.title else "")),
                 (
                     tinyhtml.h(
-                        "img", src=item.image, style="max-width: 50%;max-height: 50%"
+                        "img",
+                        src=image_url(item.image),
+                        style="max-width: 50%;max-height: 50%",
                     )
                     if item.image
                     else ""
@@ -78,3 +190,407 @@ def generate_html_feed_summery(feed: Feed) -> str:
         ),
     )
     return html_obj.render()
+
+
+_HTML_TEMPLATES_ENVIRONMENT = jinja2.Environment(
+    autoescape=True,
+    # Like tinyhtml, None is rendered as nothing.
+    finalize=lambda value: "" if value is None else value,
+)
+_HTML_TEMPLATES_ENVIRONMENT.filters.update(
+    publication_time=lambda publication_time: time.strftime(
+        "%d/%m/%Y %H:%M", publication_time
+    ),
+    image_url=image_url,
+)
+
+# Compiled once, renders the same markup as _render_html_feed_summery without building an element tree.
+_HTML_FEED_TEMPLATE: jinja2.Template = _HTML_TEMPLATES_ENVIRONMENT.from_string(
+    '<div style="text-align: center;">'
+    "{% if feed.website %}"
+    '<a href="{{ feed.website }}">'
+    '{% if feed.image %}<img src="{{ feed.image | image_url }}">{% endif %}'
+    "</a>"
+    "{% endif %}"
+    "{% if feed.title %}<h1>{{ feed.title }}</h1>{% endif %}"
+    "{% for item in items %}"
+    "<h2>"
+    '<div style="font-size: 15px;">'
+    "{% if item.publication_time %}"
+    "{{ item.publication_time | publication_time }}"
+    "{% endif %}"
+    "</div>"
+    '<a{% if item.url %} href="{{ item.url }}"{% endif %}>'
+    '{{ item.title if item.title else "%s" % item.description }}'
+    "</a>"
+    '<h3>{{ item.description if item.title else "" }}</h3>'
+    "{% if item.image %}"
+    '<img src="{{ item.image | image_url }}" style="max-width: 50%;max-height: 50%">'
+    "{% endif %}"
+    "</h2>"
+    "{% endfor %}"
+    "</div>"
+)
+
+
+def _render_html_feed_summery_by_template(feed: Feed) -> str:
+    """Renders a prettify HTML string for specific given feed, by a precompiled template.
+
+    Args:
+        feed (Feed): A feed to be extract from.
+
+    Returns:
+        str: The html string.
+    """
+    feed_content = feed.content
+    return _HTML_FEED_TEMPLATE.render(feed=feed, items=feed_content)
+
+
+# The html renderers, by the engine names that can be chosen by config.HTML_RENDER_ENGINE.
+HTML_RENDERERS: Dict[str, Callable[[Feed], str]] = {
+    "tinyhtml": _render_html_feed_summery,
+    "jinja2": _render_html_feed_summery_by_template,
+}
+
+
+def _format_publication_time(item: FeedItem) -> str:
+    """Formats the publication time of the item, like in the html messages.
+
+    Args:
+        item (FeedItem): The item to format it's publication time.
+
+    Returns:
+        str: The formatted time, or an empty string if it's unavailable.
+    """
+    if not item.publication_time:
+        return ""
+    return time.strftime("%d/%m/%Y %H:%M", item.publication_time)
+
+
+def _render_text_feed_summery(feed: Feed) -> str:
+    """Renders a plain text summery for specific given feed.
+
+    Args:
+        feed (Feed): A feed to be extract from.
+
+    Returns:
+        str: The text string.
+    """
+    feed_content = feed.content
+    lines = [feed.title] if feed.title else []
+    for item in feed_content:
+        headline = item.title or item.description
+        if publication_time := _format_publication_time(item):
+            lines.append(f"- {publication_time} {headline}")
+        else:
+            lines.append(f"- {headline}")
+        if item.url:
+            lines.append(f"  {item.url}")
+    return "\n".join(lines)
+
+
+def _render_whatsapp_feed_summery(feed: Feed) -> str:
+    """Renders a summery with WhatsApp formatting marks [*bold*, _italic_] for specific given feed.
+
+    Args:
+        feed (Feed): A feed to be extract from.
+
+    Returns:
+        str: The text string.
+    """
+    feed_content = feed.content
+    lines = [f"*{feed.title}*"] if feed.title else []
+    for item in feed_content:
+        if publication_time := _format_publication_time(item):
+            lines.append(f"_{publication_time}_")
+        lines.append(f"*{item.title}*" if item.title else f"{item.description}")
+        if item.url:
+            lines.append(item.url)
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def _render_voice_feed_summery(feed: Feed) -> str:
+    """Renders an SSML summery for specific given feed, to be read by a text to speech voice.
+    Links and images can't be spoken, so only the titles are included.
+
+    Args:
+        feed (Feed): A feed to be extract from.
+
+    Returns:
+        str: The SSML string.
+    """
+    feed_content = feed.content
+    sentences = [
+        f"<s>{html.escape(str(item.title or item.description))}</s>"
+        for item in feed_content
+    ]
+    title = f'<s>{html.escape(feed.title)}</s><break time="500ms"/>' if feed.title else ""
+    return f"<p>{title}{''.join(sentences)}</p>"
+
+
+class MessageFormat(NamedTuple):
+    """How the messages of a format are generated:
+    the render function of each feed, and the marks that join the feeds into a message.
+    """
+
+    render: Callable[[Feed], str]
+    separator: str
+    prefix: str = ""
+    suffix: str = ""
+
+
+# The formats of the messages, by config.MESSAGE_FORMATS names.
+MESSAGE_FORMATS: Dict[str, MessageFormat] = {
+    config.MESSAGE_FORMATS.html: MessageFormat(
+        HTML_RENDERERS[config.HTML_RENDER_ENGINE], "\n"
+    ),
+    config.MESSAGE_FORMATS.text: MessageFormat(_render_text_feed_summery, "\n\n"),
+    config.MESSAGE_FORMATS.whatsapp: MessageFormat(
+        _render_whatsapp_feed_summery, "\n\n"
+    ),
+    config.MESSAGE_FORMATS.voice: MessageFormat(
+        _render_voice_feed_summery,
+        # A <Say> per feed, so no single one gets long.
+        '</Say><Pause length="1"/><Say>',
+        "<Response><Say>",
+        "</Say></Response>",
+    ),
+}
+
+
+def generate_feed_summery(feed: Feed, message_format: str) -> str:
+    """Generates the summery of specific given feed in the given format.
+    The summery is rendered once per feed content version and format, and reused by RENDER_CACHE.
+
+    Args:
+        feed (Feed): A feed to be extract from.
+        message_format (str): One of config.MESSAGE_FORMATS.
+
+    Returns:
+        str: The summery string.
+    """
+    return RENDER_CACHE.get_or_render(feed, MESSAGE_FORMATS[message_format].render)
+
+
+def generate_html_feed_summery(feed: Feed) -> str:
+    """Generates a prettify HTML string for specific given feed, by config.HTML_RENDER_ENGINE.
+    The string is rendered once per feed content version, and reused by RENDER_CACHE.
+
+    Args:
+        feed (Feed): A feed to be extract from.
+
+    Returns:
+        str: The html string.
+    """
+    return generate_feed_summery(feed, config.MESSAGE_FORMATS.html)
+
+
+def generate_feeds_fragments(message_format: str, *feeds: Feed) -> Dict[int, str]:
+    """Generates the summery of each of the given feeds in the given format, once per feed.
+    So that it can be shared by all messages of this format that contain the same feed.
+
+    Args:
+        message_format (str): One of config.MESSAGE_FORMATS.
+        feeds (Feed): variable number of feeds.
+
+    Returns:
+        Dict[int, str]: Dictionary of feeds ids as keys and their summery strings as values.
+                        Feeds that could not be rendered are omitted.
+    """
+    with futures.ThreadPoolExecutor(max_workers=5) as executor:
+        threaded_tasks = {
+            executor.submit(generate_feed_summery, feed, message_format): feed.id
+            for feed in feeds
+        }
+        fragments = {}
+        for completed_task in futures.as_completed(threaded_tasks):
+            try:
+                fragments[threaded_tasks[completed_task]] = completed_task.result()
+            except Exception as exc:
+                # TODO log it
+                print(exc)
+    return fragments
+
+
+def generate_html_feeds_fragments(*feeds: Feed) -> Dict[int, str]:
+    """Generates the HTML summery of each of the given feeds, once per feed.
+
+    Args:
+        feeds (Feed): variable number of feeds.
+
+    Returns:
+        Dict[int, str]: Dictionary of feeds ids as keys and their html strings as values.
+                        Feeds that could not be rendered are omitted.
+    """
+    return generate_feeds_fragments(config.MESSAGE_FORMATS.html, *feeds)
+
+
+def assemble_message(
+    message_format: str, feeds: Iterable[Feed], fragments: Dict[int, str]
+) -> str:
+    """Assembles a message of the given format from already rendered feeds fragments.
+
+    Args:
+        message_format (str): One of config.MESSAGE_FORMATS.
+        feeds (Iterable[Feed]): The feeds to be included in the message.
+        fragments (Dict[int, str]): Rendered fragments, as returned by generate_feeds_fragments.
+
+    Returns:
+        str: The string of the whole message.
+    """
+    formatting = MESSAGE_FORMATS[message_format]
+    return (
+        formatting.prefix
+        + formatting.separator.join(
+            fragments[feed.id] for feed in feeds if feed.id in fragments
+        )
+        + formatting.suffix
+    )
+
+
+def split_message(
+    message: str, max_length: int, separators: Tuple[str, ...] = ("\n\n", "\n", " ")
+) -> List[str]:
+    """Splits a text message into parts of up to max_length characters, for transports that limit the messages length.
+    The message is split at the first of the separators possible [between feeds, then lines, then words],
+    parts that are still too long are split by the next separators, or cut if there are no more.
+
+    Args:
+        message (str): The message [text or WhatsApp format].
+        max_length (int): The maximum length of a part.
+        separators (Tuple[str, ...], optional): The separators to split at, by preference.
+                                                Defaults to ("\n\n", "\n", " ").
+
+    Returns:
+        List[str]: The parts of the message, in their order.
+    """
+    if len(message) <= max_length:
+        return [message]
+    if not separators:
+        return [
+            message[start : start + max_length]
+            for start in range(0, len(message), max_length)
+        ]
+    separator, *other_separators = separators
+    parts: List[str] = []
+    current = ""
+    for piece in message.split(separator):
+        joined = f"{current}{separator}{piece}" if current else piece
+        if len(joined) <= max_length:
+            current = joined
+            continue
+        if current:
+            parts.append(current)
+        *completed, current = split_message(piece, max_length, tuple(other_separators))
+        parts.extend(completed)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def truncate_voice_message(message: str, max_length: int) -> str:
+    """Truncates a voice message [TwiML document] to up to max_length characters,
+    for transports that limit the document length. The message is cut after it's last whole sentence that fits,
+    so the document remains valid.
+
+    Args:
+        message (str): The voice message, as assembled from voice fragments.
+        max_length (int): The maximum length of the message.
+
+    Returns:
+        str: The message, or it's beginning if it's too long.
+    """
+    if len(message) <= max_length:
+        return message
+    # Every sentence is inside a paragraph, which is inside a <Say>.
+    closing = "</p></Say></Response>"
+    cut = message.rfind("</s>", 0, max_length - len(closing) - len("</s>"))
+    if cut == -1:
+        # Even the first sentence is too long, so it's cut without a partial tag or entity.
+        cut_sentence = re.sub(
+            r"(<[^>]*|&[^;]*)$", "", message[: max_length - len(closing) - len("</s>")]
+        )
+        return f"{cut_sentence}</s>{closing}"
+    return f"{message[: cut + len('</s>')]}{closing}"
+
+
+class MergedDigest(NamedTuple):
+    """The most recent items of several feeds, rendered as a single feed without a title."""
+
+    content: List[FeedItem]
+    title: str | None = None
+    website: str | bool = False
+    image: str | bool = False
+
+
+def merge_feeds_items(feeds: Iterable[Feed], size: int) -> List[FeedItem]:
+    """Merges the items of the given feeds, and takes the most recent ones.
+    Each feed is sorted by recency, so a lazy k-way merge of them yields the items in order.
+
+    Args:
+        feeds (Iterable[Feed]): The feeds to merge.
+        size (int): The number of the items to take.
+
+    Returns:
+        List[FeedItem]: The most recent items, from the newest to the oldest.
+    """
+    return list(
+        itertools.islice(
+            heapq.merge(
+                *(sorted(feed.content, key=_recency, reverse=True) for feed in feeds),
+                key=_recency,
+                reverse=True,
+            ),
+            size,
+        )
+    )
+
+
+def generate_merged_message(message_format: str, feeds: Iterable[Feed]) -> str:
+    """Generates a message of the given format, with the config.MERGED_DIGEST_SIZE most recent items
+    of all the given feeds together, instead of a section per feed.
+
+    Args:
+        message_format (str): One of config.MESSAGE_FORMATS.
+        feeds (Iterable[Feed]): The feeds to be included in the message.
+
+    Returns:
+        str: The string of the whole message.
+    """
+    formatting = MESSAGE_FORMATS[message_format]
+    digest = MergedDigest(merge_feeds_items(feeds, config.MERGED_DIGEST_SIZE))
+    with METRICS.timer(
+        "render_seconds", renderer=formatting.render.__name__, digest="merged"
+    ):
+        return formatting.prefix + formatting.render(digest) + formatting.suffix
+
+
+def ensure_updated_feeds(*feeds: Feed) -> None:
+    """Updates the content of the given feeds concurrently, if it's outdated.
+    So that the messages generated for them later don't wait to the downloads one by one.
+
+    Args:
+        feeds (Feed): variable number of feeds.
+    """
+    with futures.ThreadPoolExecutor(max_workers=5) as executor:
+        threaded_tasks = [executor.submit(feed.ensure_updated_stream) for feed in feeds]
+        for completed_task in futures.as_completed(threaded_tasks):
+            try:
+                completed_task.result()
+            except Exception as exc:
+                # TODO log it
+                print(exc)
+
+
+def assemble_html_message(feeds: Iterable[Feed], fragments: Dict[int, str]) -> str:
+    """Assembles an HTML message from already rendered feeds fragments.
+
+    Args:
+        feeds (Iterable[Feed]): The feeds to be included in the message.
+        fragments (Dict[int, str]): Rendered fragments, as returned by generate_html_feeds_fragments.
+
+    Returns:
+        str: The html string of the whole message.
+    """
+    return assemble_message(config.MESSAGE_FORMATS.html, feeds, fragments)
@@ -0,0 +1,216 @@
+"""Histograms of the durations of the distribution pipeline stages, and of the sending lateness.
+Enables to tell how late messages go out, and which stage [fetch, parse, render or transport]
+should be scaled.
+"""
+
+from __future__ import annotations
+import bisect
+import contextlib
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from contentaggregator.lib import config
+
+
+class HistogramSnapshot(NamedTuple):
+    """The state of a Histogram at a point of time."""
+
+    bounds: Tuple[float, ...]
+    counts: Tuple[int, ...]
+    count: int
+    total: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, fraction: float) -> float:
+        """Estimates the value at the given fraction of the observations, by the buckets bounds.
+
+        Args:
+            fraction (float): The fraction, between 0 and 1 [0.99 for p99].
+
+        Returns:
+            float: The upper bound of the bucket of the quantile,
+                   infinity if it falls beyond the last bound.
+        """
+        rank = fraction * self.count
+        accumulated = 0
+        for bound, count in zip(self.bounds, self.counts):
+            accumulated += count
+            if accumulated >= rank:
+                return bound
+        return float("inf")
+
+
+class Histogram:
+    """Thread safe counts of observations, by fixed buckets."""
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        """
+        Args:
+            bounds (Tuple[float, ...]): Sorted upper bounds of the buckets,
+                                        larger observations are counted in an overflow bucket.
+        """
+        self._bounds = bounds
+        self._counts: List[int] = [0] * (len(bounds) + 1)
+        self._count: int = 0
+        self._total: float = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Counts an observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        bucket = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[bucket] += 1
+            self._count += 1
+            self._total += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Returns the current state of the histogram.
+
+        Returns:
+            HistogramSnapshot: The counts of the buckets, the number and the sum of the observations.
+        """
+        with self._lock:
+            return HistogramSnapshot(
+                self._bounds, tuple(self._counts), self._count, self._total
+            )
+
+
+# Name and sorted labels of a histogram.
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """Histograms by name and labels, like transport_seconds of the email channel,
+    and counters by name and labels, like the hits of a cache.
+    """
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        """
+        Args:
+            bounds (Tuple[float, ...]): Upper bounds of the buckets of every histogram.
+        """
+        self._bounds = bounds
+        self._histograms: Dict[MetricKey, Histogram] = {}
+        self._counters: Dict[MetricKey, int] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Gets the histogram of the given name and labels, creates it if it doesn't exist.
+
+        Args:
+            name (str): The name of the histogram.
+            labels (str): The labels of the histogram, like channel='email'.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(self._bounds)
+            return self._histograms[key]
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Counts an observation in the histogram of the given name and labels.
+
+        Args:
+            name (str): The name of the histogram.
+            value (float): The observed value.
+            labels (str): The labels of the histogram.
+        """
+        self.histogram(name, **labels).observe(value)
+
+    def increment(self, name: str, amount: int = 1, **labels: str) -> None:
+        """Increments the counter of the given name and labels, creates it if it doesn't exist.
+
+        Args:
+            name (str): The name of the counter.
+            amount (int, optional): The amount to add. Defaults to 1.
+            labels (str): The labels of the counter, like result='hit'.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counters(self) -> Dict[MetricKey, int]:
+        """Returns the current values of all counters.
+
+        Returns:
+            Dict[MetricKey, int]: Names and labels of the counters as keys, and their values as values.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observes the duration of the with block, in seconds, even if it raises.
+
+        Args:
+            name (str): The name of the histogram.
+            labels (str): The labels of the histogram.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[MetricKey, HistogramSnapshot]:
+        """Returns the current state of all histograms.
+
+        Returns:
+            Dict[MetricKey, HistogramSnapshot]: Names and labels of the histograms as keys,
+                                                and their snapshots as values.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {key: histogram.snapshot() for key, histogram in histograms.items()}
+
+    def merged(self, name: str, **labels: str) -> HistogramSnapshot:
+        """Merges the histograms of the given name that have the given labels [and maybe others].
+
+        Args:
+            name (str): The name of the histograms.
+            labels (str): The labels the histograms must have, like channel='email'.
+
+        Returns:
+            HistogramSnapshot: The sum of the matching histograms.
+        """
+        counts = [0] * (len(self._bounds) + 1)
+        count, total = 0, 0.0
+        for (key_name, key_labels), snapshot in self.snapshot().items():
+            if key_name == name and labels.items() <= dict(key_labels).items():
+                counts = [sum(pair) for pair in zip(counts, snapshot.counts)]
+                count += snapshot.count
+                total += snapshot.total
+        return HistogramSnapshot(self._bounds, tuple(counts), count, total)
+
+    def report(self) -> str:
+        """Summarizes all histograms and counters, a line per histogram or counter.
+
+        Returns:
+            str: The summary, with the count, mean, p50 and p99 of each histogram, and the value of each counter.
+        """
+        lines = []
+        for (name, labels), snapshot in sorted(self.snapshot().items()):
+            labels_str = ",".join(f"{label}={value}" for label, value in labels)
+            lines.append(
+                f"{name}{{{labels_str}}} count={snapshot.count} mean={snapshot.mean:.3f} "
+                f"p50<={snapshot.quantile(0.5)} p99<={snapshot.quantile(0.99)}"
+            )
+        for (name, labels), counter_value in sorted(self.counters().items()):
+            labels_str = ",".join(f"{label}={value}" for label, value in labels)
+            lines.append(f"{name}{{{labels_str}}} {counter_value}")
+        return "\n".join(lines)
+
+
+# Shared by all the distribution pipeline stages of the process.
+METRICS = MetricsRegistry(config.METRICS_BUCKETS)
@@ -0,0 +1,80 @@
+"""A compact index of the users sending schedules.
+Each UTC minute of the week has a slot with a packed array of the ids of the users due at it,
+so finding everyone due at a given minute is a single slot read.
+"""
+
+from __future__ import annotations
+from array import array
+import datetime
+from typing import Dict, List, Tuple
+
+from contentaggregator.lib.user.userproperties.time import (
+    MINUTES_IN_DAY,
+    MINUTES_IN_WEEK,
+    Time,
+)
+
+
+def week_minute(moment: datetime.datetime) -> int:
+    """Calculates the minute of the week of the given time [Monday 00:00 is 0].
+
+    Args:
+        moment (datetime.datetime): The time to calculate for.
+
+    Returns:
+        int: The minute of the week.
+    """
+    return moment.weekday() * MINUTES_IN_DAY + moment.hour * 60 + moment.minute
+
+
+class ScheduleIndex:
+    """Array-backed index of sending schedules, by UTC minute of the week."""
+
+    def __init__(self) -> None:
+        # Slots are allocated lazily, most minutes of the week have no sendings.
+        self._slots: List[array | None] = [None] * MINUTES_IN_WEEK
+        self._users_minutes: Dict[int, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._users_minutes)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._users_minutes
+
+    def add(self, user_id: int, sending_time: Time, at: datetime.datetime) -> None:
+        """Adds the sendings of a user to the index, replacing it's previous sendings.
+
+        Args:
+            user_id (int): The id of the user.
+            sending_time (Time): The sending time of the user.
+            at (datetime.datetime): Naive UTC time, the timezone offset is calculated at.
+        """
+        self.remove(user_id)
+        minutes = tuple(sending_time.week_minutes(at))
+        for minute in minutes:
+            if self._slots[minute] is None:
+                self._slots[minute] = array("I")
+            self._slots[minute].append(user_id)
+        self._users_minutes[user_id] = minutes
+
+    def remove(self, user_id: int) -> None:
+        """Removes the sendings of a user from the index, if there are any.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        for minute in self._users_minutes.pop(user_id, ()):
+            self._slots[minute].remove(user_id)
+            if not self._slots[minute]:
+                self._slots[minute] = None
+
+    def due(self, minute: int) -> array:
+        """Gets the users due at the given minute of the week.
+
+        Args:
+            minute (int): The minute of the week.
+
+        Returns:
+            array: The ids of the due users.
+        """
+        return array("I", self._slots[minute] or ())
@@ -0,0 +1,263 @@
+"""A pool of reusable SMTP sessions.
+Opening an SMTP session costs a TLS handshake and an authentication,
+so sessions are kept open and reused for many messages.
+The messages are composed by yagmail, and sent through smtplib sessions that are held by the pool,
+since yagmail itself opens a new connection for every message.
+"""
+
+from __future__ import annotations
+import queue
+import smtplib
+import threading
+from typing import Dict, List, NamedTuple, Tuple
+
+import yagmail
+
+from contentaggregator.lib import config, exceptions
+
+
+class SMTPSessionPoolStats(NamedTuple):
+    """Statistics of the SMTPSessionPool."""
+
+    opened_sessions: int
+    sent_messages: int
+    failed_attempts: int
+
+
+class _PooledSession:
+    """An open SMTP session and the number of the messages sent through it."""
+
+    def __init__(self, smtp: smtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.sent_messages: int = 0
+
+
+class _ConnectionLost(Exception):
+    """The connection of a session broke before the message data was sent,
+    so nothing was delivered and the sending is safe to retry."""
+
+
+class SMTPSessionPool:
+    """Pool of authenticated SMTP sessions, shared by the sending threads.
+    An idle session is checked by NOOP before it's reused, and replaced if it's broken.
+    A session is also replaced after max_messages messages, or once a sending through it fails.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_messages: int,
+        *,
+        user: str,
+        password: str | None = None,
+        host: str,
+        port: int,
+        smtp_ssl: bool = True,
+        smtp_starttls: bool = False,
+        smtp_skip_login: bool = False,
+    ) -> None:
+        """
+        Args:
+            size (int): Maximum number of concurrently open sessions.
+            max_messages (int): Maximum number of messages sent through a single session.
+            user (str): The sender address, and the user to log in as.
+            password (str | None, optional): The password of the user,
+                                             None to get it from the keyring [like yagmail]. Defaults to None.
+            host (str): The host of the SMTP server.
+            port (int): The port of the SMTP server.
+            smtp_ssl (bool, optional): If the connection is encrypted from the start. Defaults to True.
+            smtp_starttls (bool, optional): If the connection is upgraded by STARTTLS. Defaults to False.
+            smtp_skip_login (bool, optional): If the server requires no authentication. Defaults to False.
+        """
+        self._max_messages = max_messages
+        self._host = host
+        self._port = port
+        self._smtp_ssl = smtp_ssl
+        self._smtp_starttls = smtp_starttls
+        self._password = password
+        self._smtp_skip_login = smtp_skip_login
+        # Composes the messages only, it never connects.
+        self._composer = yagmail.SMTP(user, password, smtp_skip_login=True)
+        self._idle_sessions: queue.LifoQueue[_PooledSession] = queue.LifoQueue()
+        self._sessions_semaphore = threading.BoundedSemaphore(size)
+        self._stats_lock = threading.Lock()
+        self._opened_sessions: int = 0
+        self._sent_messages: int = 0
+        self._failed_attempts: int = 0
+
+    def _open_session(self) -> _PooledSession:
+        """Opens a new SMTP session, and logs in.
+
+        Returns:
+            _PooledSession: The new session.
+        """
+        connection = smtplib.SMTP_SSL if self._smtp_ssl else smtplib.SMTP
+        smtp = connection(self._host, self._port, timeout=config.SMTP_TIMEOUT)
+        with self._stats_lock:
+            self._opened_sessions += 1
+        try:
+            if self._smtp_starttls:
+                smtp.starttls()
+            if not self._smtp_skip_login:
+                user = self._composer.user
+                smtp.login(user, self._composer.handle_password(user, self._password))
+        except Exception:
+            self._close_session(_PooledSession(smtp))
+            raise
+        return _PooledSession(smtp)
+
+    def _get_session(self) -> _PooledSession:
+        """Gets an idle session that is still connected, or opens a new one if there is none.
+
+        Returns:
+            _PooledSession: A session to send through.
+        """
+        while True:
+            try:
+                session = self._idle_sessions.get_nowait()
+            except queue.Empty:
+                return self._open_session()
+            try:
+                if session.smtp.noop()[0] == 250:
+                    return session
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_session(session)
+
+    @staticmethod
+    def _close_session(session: _PooledSession) -> None:
+        """Closes the given session, ignoring errors of a broken connection.
+
+        Args:
+            session (_PooledSession): The session to close.
+        """
+        try:
+            session.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            session.smtp.close()
+
+    @staticmethod
+    def _raise_refusal(error: smtplib.SMTPException) -> None:
+        """Raises the given refusal of the server, as exceptions.UndeliverableMessage if it's permanent [5xx].
+
+        Args:
+            error (smtplib.SMTPException): The refusal.
+
+        Raises:
+            exceptions.UndeliverableMessage: If the refusal is permanent.
+            smtplib.SMTPException: Otherwise, the given refusal.
+        """
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            codes = [code for code, _ in error.recipients.values()]
+        else:
+            codes = [getattr(error, "smtp_code", 0)]
+        if codes and all(500 <= code < 600 for code in codes):
+            raise exceptions.UndeliverableMessage(str(error)) from error
+        raise error
+
+    def _send_through(
+        self, session: _PooledSession, recipients: List[str], message: str
+    ) -> None:
+        """Sends the message through the given session, by the SMTP commands of smtplib.SMTP.sendmail,
+        so a broken connection before the message data can be told apart from one after it.
+
+        Args:
+            session (_PooledSession): The session to send through.
+            recipients (List[str]): The addresses of the recipients.
+            message (str): The composed message.
+
+        Raises:
+            _ConnectionLost: If the connection broke before the message data was sent.
+            smtplib.SMTPException: If the server refused the sender or any of the recipients,
+                                   or the message, or the connection broke during it's data.
+        """
+        smtp = session.smtp
+        refused: Dict[str, Tuple[int, bytes]] = {}
+        try:
+            smtp.ehlo_or_helo_if_needed()
+            code, response = smtp.mail(self._composer.user)
+            if code != 250:
+                smtp.rset()
+                raise smtplib.SMTPSenderRefused(code, response, self._composer.user)
+            for recipient in recipients:
+                code, response = smtp.rcpt(recipient)
+                if code not in (250, 251):
+                    refused[recipient] = code, response
+        except (smtplib.SMTPServerDisconnected, OSError) as e:
+            raise _ConnectionLost() from e
+        if refused:
+            # Not sent to the others either, a partial delivery would be retried as a whole.
+            smtp.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        code, response = smtp.data(message)
+        if code != 250:
+            raise smtplib.SMTPDataError(code, response)
+
+    def send(self, to: str, subject: str, contents: str) -> None:
+        """Sends a message through a pooled session.
+        If the connection breaks before the message data is sent, it is retried once through a new session.
+        Once the data was sent it's never retried here, so a message is not sent twice.
+
+        Args:
+            to (str): The address of the recipient.
+            subject (str): The subject of the message.
+            contents (str): The contents of the message, like yagmail.SMTP.send contents.
+
+        Raises:
+            exceptions.UndeliverableMessage: If the server refused the message permanently [5xx].
+            Exception: If the sending failed otherwise.
+        """
+        recipients, message = self._composer.prepare_send(
+            to=to, subject=subject, contents=contents
+        )
+        with self._sessions_semaphore:
+            session = self._get_session()
+            try:
+                try:
+                    self._send_through(session, recipients, message)
+                except _ConnectionLost:
+                    with self._stats_lock:
+                        self._failed_attempts += 1
+                    self._close_session(session)
+                    session = self._open_session()
+                    self._send_through(session, recipients, message)
+            except Exception as e:
+                with self._stats_lock:
+                    self._failed_attempts += 1
+                if isinstance(e, _ConnectionLost):
+                    self._close_session(session)
+                    raise smtplib.SMTPServerDisconnected(str(e.__cause__)) from e
+                if isinstance(
+                    e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+                ):
+                    # The session is still usable after a refusal.
+                    self._idle_sessions.put(session)
+                    self._raise_refusal(e)
+                self._close_session(session)
+                raise
+            session.sent_messages += 1
+            with self._stats_lock:
+                self._sent_messages += 1
+            if session.sent_messages >= self._max_messages:
+                self._close_session(session)
+            else:
+                self._idle_sessions.put(session)
+
+    def stats(self) -> SMTPSessionPoolStats:
+        """Returns the statistics of the pool.
+
+        Returns:
+            SMTPSessionPoolStats: Numbers of the opened sessions, sent messages and failed attempts.
+        """
+        with self._stats_lock:
+            return SMTPSessionPoolStats(
+                self._opened_sessions, self._sent_messages, self._failed_attempts
+            )
+
+    def close(self) -> None:
+        """Closes all the idle sessions."""
+        while True:
+            try:
+                self._close_session(self._idle_sessions.get_nowait())
+            except queue.Empty:
+                return
@@ -2,6 +2,8 @@
 Functions collection for some custom SQL queries required for the system.
 """
 
+from datetime import datetime
+import json
 from typing import List, Tuple, Iterable, Any, Dict, Union, Set
 
 from .databasecursor import MySQLCursorCM
@@ -14,6 +16,9 @@ def select(
     table: str,
     condition_expr: str | None = None,
     desired_rows_num: int | None = None,
+    case_sensitive: bool = True,
+    order_by: str | Iterable[str] | None = None,
+    limit: int | None = None,
 ) -> List[Tuple[Any, ...]]:
     """Select the desired columns and rows
     from the specified table in the database defined by MySQLCursorCM class.
@@ -26,15 +31,28 @@ def select(
                                           Defaults to None
                                           [has no effect if it's not required by the caller].
         desired_rows_num (int): The desired number of rows.
+        case_sensitive (bool, optional): If the condition should compare strings case sensitively.
+                                         Must be False for conditions that should use an index.
+                                         Defaults to True.
+        order_by (str | Iterable[str] | None, optional): The name(s) of the column(s) to order the rows by.
+                                                         Defaults to None [unordered].
+        limit (int | None, optional): Maximum number of rows the database should return.
+                                      Defaults to None [unlimited].
 
     Returns:
         List[Tuple[str, ...]]: A list with the desired rows as tuples.
     """
     if isinstance(cols, Union[Tuple, List]):
         cols = ", ".join(cols)
+    if isinstance(order_by, Union[Tuple, List]):
+        order_by = ", ".join(order_by)
     query_str = f"SELECT {cols} FROM {table}"
     if condition_expr:
-        query_str += f" WHERE BINARY {condition_expr}"
+        query_str += f" WHERE {'BINARY ' if case_sensitive else ''}{condition_expr}"
+    if order_by:
+        query_str += f" ORDER BY {order_by}"
+    if limit is not None:
+        query_str += f" LIMIT {limit}"
     print(query_str)
     with MySQLCursorCM() as cursor:
         cursor.execute(query_str)
@@ -119,9 +137,32 @@ def delete(*, table: str, condition_expr: str | None = None) -> int | None:
         return cursor.rowcount
 
 
-def get_users_set() -> Set[int] | None:
+def _shard_condition(column: str, shard_index: int, shards_number: int) -> str:
+    """Creates a condition expression for the rows of the given shard.
+
+    Args:
+        column (str): The column of the user id.
+        shard_index (int): The index of the requested shard.
+        shards_number (int): The number of shards.
+
+    Returns:
+        str: The condition expression, an always true one if there is a single shard.
+    """
+    return (
+        f"MOD({column}, {shards_number}) = {shard_index}" if shards_number > 1 else "TRUE"
+    )
+
+
+def get_users_set(shard_index: int = 0, shards_number: int = 1) -> Set[int] | None:
     # TODO with threads
     """Collects all users id's and returns them as a set of ints.
+    When the users are partitioned into several shards,
+    only the users of the requested shard are collected.
+
+    Args:
+        shard_index (int, optional): The index of the requested shard. Defaults to 0.
+        shards_number (int, optional): The number of shards the users are partitioned into.
+                                       Defaults to 1 [all users].
 
     Returns:
         Set[int] | None: A set of user's id's if there is any users, None otherwise.
@@ -129,19 +170,408 @@ def get_users_set() -> Set[int] | None:
     db_response = select(
         cols=config.USERS_DATA_COLUMNS.id,
         table=config.DATABASE_TABLES_NAMES.users_table,
+        condition_expr=_shard_condition(
+            config.USERS_DATA_COLUMNS.id, shard_index, shards_number
+        ),
+        case_sensitive=False,
     )
-    return {user_data[0] for user_data in db_response} if db_response[0][0] else None
+    return {user_data[0] for user_data in db_response} if db_response else None
 
 
-def get_feeds_set() -> List[Tuple[int | str]]:
-    """Collects all feeds existing in the database
-    and returns them as a set of feeds objects.
+def get_due_users(
+    until: datetime, shard_index: int = 0, shards_number: int = 1
+) -> List[Tuple[Any, ...]]:
+    """Collects the full rows of the users whose next sending is due, by the next_send_at index.
+
+    Args:
+        until (datetime): Naive UTC time, users whose next sending is until this time are due.
+        shard_index (int, optional): The shard of the users to collect. Defaults to 0.
+        shards_number (int, optional): The number of shards. Defaults to 1 [all users].
 
     Returns:
-        List[Tuple[int | str]]: A list of tuples that holds
-        feed id and feed type.
+        List[Tuple[Any, ...]]: The rows of the due users.
     """
+    columns = config.USERS_DATA_COLUMNS
+    return select(
+        table=config.DATABASE_TABLES_NAMES.users_table,
+        condition_expr=(
+            f"{columns.next_send_at} <= '{until:%Y-%m-%d %H:%M:%S}' "
+            f"AND {_shard_condition(columns.id, shard_index, shards_number)}"
+        ),
+        case_sensitive=False,
+    )
+
+
+def get_unscheduled_users(
+    shard_index: int = 0, shards_number: int = 1
+) -> List[Tuple[Any, ...]]:
+    """Collects the full rows of the users who have a sending time,
+    but no next_send_at or sending days.
+
+    Args:
+        shard_index (int, optional): The shard of the users to collect. Defaults to 0.
+        shards_number (int, optional): The number of shards. Defaults to 1 [all users].
+
+    Returns:
+        List[Tuple[Any, ...]]: The rows of the unscheduled users.
+    """
+    columns = config.USERS_DATA_COLUMNS
+    return select(
+        table=config.DATABASE_TABLES_NAMES.users_table,
+        condition_expr=(
+            f"({columns.next_send_at} IS NULL OR {columns.sending_days} IS NULL) "
+            f"AND {columns.sending_time} IS NOT NULL "
+            f"AND {_shard_condition(columns.id, shard_index, shards_number)}"
+        ),
+        case_sensitive=False,
+    )
+
+
+def get_users_schedules(
+    shard_index: int = 0,
+    shards_number: int = 1,
+    users_ids: Iterable[int] | None = None,
+) -> List[Tuple[int, int, int, str | None]]:
+    """Collects the compact sending schedules of all users who have one.
+
+    Args:
+        shard_index (int, optional): The shard of the users to collect. Defaults to 0.
+        shards_number (int, optional): The number of shards. Defaults to 1 [all users].
+        users_ids (Iterable[int] | None, optional): Collect only these users. Defaults to None [all users].
+
+    Returns:
+        List[Tuple[int, int, int, str | None]]: Tuples of user id, sending days bitmask,
+                                                sending minute of the day and timezone.
+    """
+    columns = config.USERS_DATA_COLUMNS
+    condition_expr = (
+        f"{columns.sending_days} IS NOT NULL "
+        f"AND {_shard_condition(columns.id, shard_index, shards_number)}"
+    )
+    if users_ids is not None:
+        ids = ", ".join(str(user_id) for user_id in users_ids)
+        if not ids:
+            return []
+        condition_expr += f" AND {columns.id} IN ({ids})"
     return select(
-        cols=[config.FEEDS_DATA_COLUMNS.id, config.FEEDS_DATA_COLUMNS.feed_type],
-        table=config.DATABASE_TABLES_NAMES.feeds_table,
+        cols=(
+            columns.id,
+            columns.sending_days,
+            columns.sending_minute,
+            columns.timezone,
+        ),
+        table=config.DATABASE_TABLES_NAMES.users_table,
+        condition_expr=condition_expr,
+        case_sensitive=False,
+    )
+
+
+def get_users_info(users_ids: Iterable[int]) -> List[Tuple[Any, ...]]:
+    """Collects the full rows of the given users by a single query.
+
+    Args:
+        users_ids (Iterable[int]): The ids of the requested users.
+
+    Returns:
+        List[Tuple[Any, ...]]: The rows of the users.
+    """
+    ids = ", ".join(str(user_id) for user_id in users_ids)
+    if not ids:
+        return []
+    return select(
+        table=config.DATABASE_TABLES_NAMES.users_table,
+        condition_expr=f"{config.USERS_DATA_COLUMNS.id} IN ({ids})",
+        case_sensitive=False,
+    )
+
+
+def set_next_send_at(users_ids: Iterable[int], next_send_at: datetime | None) -> None:
+    """Sets the time of the next sending of the given users.
+
+    Args:
+        users_ids (Iterable[int]): The ids of the users.
+        next_send_at (datetime | None): Naive UTC time of the next sending, None for no sending.
+    """
+    ids = ", ".join(str(user_id) for user_id in users_ids)
+    if not ids:
+        return
+    update(
+        table=config.DATABASE_TABLES_NAMES.users_table,
+        updates_dict={
+            config.USERS_DATA_COLUMNS.next_send_at: repr(
+                next_send_at.strftime("%Y-%m-%d %H:%M:%S")
+            )
+            if next_send_at
+            else None
+        },
+        condition_expr=f"{config.USERS_DATA_COLUMNS.id} IN ({ids})",
+    )
+
+
+def get_feeds_info() -> List[Tuple[Any, ...]]:
+    """Collects the rows of all feeds existing in the database, by a single query.
+
+    Returns:
+        List[Tuple[Any, ...]]: A list of the feeds rows, with all their columns.
+    """
+    return select(table=config.DATABASE_TABLES_NAMES.feeds_table)
+
+
+def set_feed_channel(feed_id: int, channel_info: Dict[str, str | None]) -> None:
+    """Stores the channel metadata of the given feed, as it was last downloaded.
+    The values are passed as query parameters, since they come from the feed source.
+
+    Args:
+        feed_id (int): The id of the feed.
+        channel_info (Dict[str, str | None]): Dictionary of the channel columns names as keys,
+                                              and their values [None if unavailable] as values.
+    """
+    assignments = ", ".join(f"{column} = %s" for column in channel_info)
+    query_str = (
+        f"UPDATE {config.DATABASE_TABLES_NAMES.feeds_table} SET {assignments} "
+        f"WHERE {config.FEEDS_DATA_COLUMNS.id} = %s"
+    )
+    with MySQLCursorCM() as cursor:
+        cursor.execute(query_str, (*channel_info.values(), feed_id))
+
+
+def materialize_outbox_sends(sends: Iterable[Tuple[int, str, str]]) -> int:
+    """Inserts due sends to the outbox table, as pending sends.
+    Sends that already exist (by their idempotency key) are ignored,
+    so materializing the same slot twice does not duplicate sends.
+
+    Args:
+        sends (Iterable[Tuple[int, str, str]]): Tuples of user id, channel and slot.
+
+    Returns:
+        int: The number of the inserted sends.
+    """
+    columns = config.OUTBOX_DATA_COLUMNS
+    rows = [
+        (f"{user_id}:{channel}:{slot}", user_id, channel, slot)
+        for user_id, channel, slot in sends
+    ]
+    if not rows:
+        return 0
+    query_str = (
+        f"INSERT IGNORE INTO {config.DATABASE_TABLES_NAMES.outbox_table} "
+        f"({columns.idempotency_key}, {columns.user_id}, {columns.channel}, {columns.slot}, "
+        f"{columns.status}, {columns.attempts}, {columns.next_attempt_at}) "
+        f"VALUES (%s, %s, %s, %s, '{config.OUTBOX_STATUSES.pending}', 0, NOW())"
+    )
+    print(query_str, len(rows))
+    with MySQLCursorCM() as cursor:
+        cursor.executemany(query_str, rows)
+        return cursor.rowcount
+
+
+def claim_outbox_sends(
+    batch_size: int,
+    shard_index: int = 0,
+    shards_number: int = 1,
+    channels: Iterable[str] | None = None,
+) -> List[Tuple[int, int, str, str, int]]:
+    """Claims a batch of due sends from the outbox table.
+    Due sends are pending sends whose next attempt time has come,
+    or claimed sends that were abandoned for more than config.OUTBOX_CLAIM_TIMEOUT seconds.
+    Rows locked by another claimer are skipped, so concurrent claimers never get the same send.
+
+    Args:
+        batch_size (int): Maximum number of sends to claim.
+        shard_index (int, optional): The shard of the users to claim sends for. Defaults to 0.
+        shards_number (int, optional): The number of shards. Defaults to 1 [all users].
+        channels (Iterable[str] | None, optional): Claim only the sends of these channels.
+                                                   Defaults to None [all channels].
+
+    Returns:
+        List[Tuple[int, int, str, str, int]]: Tuples of send id, user id, channel, slot,
+                                              and the number of attempts including this one.
+    """
+    table = config.DATABASE_TABLES_NAMES.outbox_table
+    columns = config.OUTBOX_DATA_COLUMNS
+    statuses = config.OUTBOX_STATUSES
+    condition_expr = (
+        f"(({columns.status} = '{statuses.pending}' AND {columns.next_attempt_at} <= NOW()) "
+        f"OR ({columns.status} = '{statuses.claimed}' "
+        f"AND {columns.claimed_at} <= NOW() - INTERVAL {config.OUTBOX_CLAIM_TIMEOUT} SECOND))"
+    )
+    condition_expr += (
+        f" AND {_shard_condition(columns.user_id, shard_index, shards_number)}"
+    )
+    if channels is not None:
+        channels_expr = ", ".join(f"'{channel}'" for channel in channels)
+        condition_expr += f" AND {columns.channel} IN ({channels_expr})"
+    query_str = (
+        f"SELECT {columns.id}, {columns.user_id}, {columns.channel}, {columns.slot}, "
+        f"{columns.attempts} "
+        f"FROM {table} WHERE {condition_expr} ORDER BY {columns.id} "
+        f"LIMIT {batch_size} FOR UPDATE SKIP LOCKED"
+    )
+    print(query_str)
+    with MySQLCursorCM() as cursor:
+        cursor.execute("START TRANSACTION")
+        cursor.execute(query_str)
+        rows = cursor.fetchall()
+        if rows:
+            ids = ", ".join(str(row[0]) for row in rows)
+            cursor.execute(
+                f"UPDATE {table} SET {columns.status} = '{statuses.claimed}', "
+                f"{columns.claimed_at} = NOW(), {columns.attempts} = {columns.attempts} + 1 "
+                f"WHERE {columns.id} IN ({ids})"
+            )
+        cursor.execute("COMMIT")
+    return [(*row[:4], row[4] + 1) for row in rows]
+
+
+def _claim_condition(send_id: int, attempts: int) -> str:
+    """Creates a condition expression for a send that is still claimed by the given claim.
+
+    Args:
+        send_id (int): The id of the send.
+        attempts (int): The number of attempts of the send, as returned by claim_outbox_sends.
+
+    Returns:
+        str: The condition expression.
+    """
+    columns = config.OUTBOX_DATA_COLUMNS
+    return (
+        f"{columns.id} = {send_id} "
+        f"AND {columns.status} = '{config.OUTBOX_STATUSES.claimed}' "
+        f"AND {columns.attempts} = {attempts}"
+    )
+
+
+def renew_outbox_claim(send_id: int, attempts: int) -> bool:
+    """Renews the claim of a send right before it is sent,
+    so that a send that waited in the delivery queue is not considered abandoned.
+    The attempts number serves as the claim token - if the send was claimed again since
+    [or was already done], it belongs to the other claimer and should not be sent.
+
+    Args:
+        send_id (int): The id of the send.
+        attempts (int): The number of attempts of the send, as returned by claim_outbox_sends.
+
+    Returns:
+        bool: True if the claim is still held and has been renewed, False otherwise.
+    """
+    table = config.DATABASE_TABLES_NAMES.outbox_table
+    columns = config.OUTBOX_DATA_COLUMNS
+    condition_expr = _claim_condition(send_id, attempts)
+    with MySQLCursorCM() as cursor:
+        cursor.execute("START TRANSACTION")
+        cursor.execute(
+            f"SELECT {columns.id} FROM {table} WHERE {condition_expr} FOR UPDATE"
+        )
+        is_held = bool(cursor.fetchall())
+        if is_held:
+            cursor.execute(
+                f"UPDATE {table} SET {columns.claimed_at} = NOW() WHERE {condition_expr}"
+            )
+        cursor.execute("COMMIT")
+    return is_held
+
+
+def complete_outbox_send(send_id: int, attempts: int) -> None:
+    """Marks a claimed send as sent, unless it was claimed again since.
+
+    Args:
+        send_id (int): The id of the send.
+        attempts (int): The number of attempts of the send, as returned by claim_outbox_sends.
+    """
+    update(
+        table=config.DATABASE_TABLES_NAMES.outbox_table,
+        updates_dict={config.OUTBOX_DATA_COLUMNS.status: repr(config.OUTBOX_STATUSES.sent)},
+        condition_expr=_claim_condition(send_id, attempts),
+    )
+
+
+def fail_outbox_send(
+    send_id: int, attempts: int, error: str, retry_delay: int | None
+) -> None:
+    """Records a failure of a claimed send, and returns it to the pending sends,
+    to be retried after retry_delay seconds. Ignored if the send was claimed again since.
+
+    Args:
+        send_id (int): The id of the send.
+        attempts (int): The number of attempts of the send, as returned by claim_outbox_sends.
+        error (str): Description of the failure.
+        retry_delay (int | None): Seconds to wait before the next attempt,
+                                  or None if the send should not be retried.
+    """
+    columns = config.OUTBOX_DATA_COLUMNS
+    statuses = config.OUTBOX_STATUSES
+    assignments = (
+        f"{columns.status} = '{statuses.failed}'"
+        if retry_delay is None
+        else f"{columns.status} = '{statuses.pending}', "
+        f"{columns.next_attempt_at} = NOW() + INTERVAL {retry_delay} SECOND"
+    )
+    # The error is passed as a query parameter, since it may come from a remote server.
+    query_str = (
+        f"UPDATE {config.DATABASE_TABLES_NAMES.outbox_table} "
+        f"SET {columns.last_error} = %s, {assignments} "
+        f"WHERE {_claim_condition(send_id, attempts)}"
+    )
+    print(query_str)
+    with MySQLCursorCM() as cursor:
+        cursor.execute(query_str, (error[:255],))
+
+
+def log_change(entity: str, entity_id: int, fields: Iterable[str] | None) -> None:
+    """Appends a change record to the changes log table,
+    so that other processes can apply the change without reloading everything.
+
+    Args:
+        entity (str): The type of the changed entity [one of config.CHANGED_ENTITIES].
+        entity_id (int): The id of the changed entity.
+        fields (Iterable[str] | None): The names of the changed columns, None if the entity was deleted.
+    """
+    columns = config.CHANGES_DATA_COLUMNS
+    insert(
+        table=config.DATABASE_TABLES_NAMES.changes_table,
+        cols=(columns.entity, columns.entity_id, columns.fields),
+        values=(
+            entity,
+            entity_id,
+            json.dumps(list(fields)) if fields is not None else None,
+        ),
+    )
+
+
+def get_last_change_id() -> int:
+    """Returns the id of the last change in the changes log table, 0 if it's empty."""
+    columns = config.CHANGES_DATA_COLUMNS
+    return (
+        select(
+            cols=f"COALESCE(MAX({columns.id}), 0)",
+            table=config.DATABASE_TABLES_NAMES.changes_table,
+        )[0][0]
+    )
+
+
+def get_changes(
+    after_id: int, limit: int
+) -> List[Tuple[int, str, int, List[str] | None]]:
+    """Reads the changes that were logged after the given change, in their order.
+
+    Args:
+        after_id (int): The id of the last change that was already read.
+        limit (int): Maximum number of changes to read.
+
+    Returns:
+        List[Tuple[int, str, int, List[str] | None]]: Tuples of change id, entity type, entity id,
+                                                      and the changed columns [None if it was deleted].
+    """
+    columns = config.CHANGES_DATA_COLUMNS
+    rows = select(
+        cols=(columns.id, columns.entity, columns.entity_id, columns.fields),
+        table=config.DATABASE_TABLES_NAMES.changes_table,
+        condition_expr=f"{columns.id} > {after_id}",
+        case_sensitive=False,
+        order_by=columns.id,
+        limit=limit,
     )
+    return [
+        (change_id, entity, entity_id, json.loads(fields) if fields else None)
+        for change_id, entity, entity_id, fields in rows
+    ]
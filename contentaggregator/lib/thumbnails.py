@@ -0,0 +1,416 @@
+"""A content addressed store of downscaled images.
+Messages reference the thumbnails instead of hot-linking the full size images,
+each unique image is fetched and downscaled once, and stored by the hash of it's content,
+so an image that is published by several feeds or urls is stored once.
+The images are fetched in the background, so rendering never waits for them,
+and the least recently used thumbnails are removed once the directory exceeds it's size limit.
+Images are fetched only from public addresses [of the allowed hosts, if they are configured],
+and images that are too large to download or decode are rejected.
+"""
+
+from __future__ import annotations
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Set, Tuple, TypeVar
+
+import cachetools
+import requests
+from PIL import Image
+
+from contentaggregator.lib import config, exceptions
+from contentaggregator.lib.metrics import METRICS
+
+
+T = TypeVar("T")
+
+# Marks the renders of the current thread that referenced an original image, since it's thumbnail was pending.
+_RENDERING = threading.local()
+
+
+class ThumbnailStoreInfo(NamedTuple):
+    """Statistics of the ThumbnailStore."""
+
+    url_hits: int
+    content_hits: int
+    misses: int
+    failures: int
+    # Lookups answered by the original url, the pending fetches, and the ones skipped since too many were pending.
+    fallbacks: int
+    pending_fetches: int
+    skipped_fetches: int
+    original_bytes: int
+    stored_bytes: int
+    pruned_files: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of the lookups that were served by a stored thumbnail."""
+        lookups = self.url_hits + self.fallbacks
+        return self.url_hits / lookups if lookups else 0.0
+
+
+class ThumbnailStore:
+    """Fetches images, and stores downscaled copies of them in a directory, named by their content hash.
+    The thumbnails are served from the directory under base_url.
+    Concurrent lookups of the same new image share a single background fetch,
+    and get the original url until it's thumbnail is stored.
+    The modification time of a thumbnail is it's last use, so the directory is pruned
+    by the least recently used thumbnails, also when it's shared by several processes.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        base_url: str,
+        max_size: Tuple[int, int],
+        max_urls: int,
+        max_bytes: int,
+        fetch_workers: int,
+        max_pending_fetches: int,
+    ) -> None:
+        """
+        Args:
+            directory (str): The directory to store the thumbnails in.
+            base_url (str): The public url the directory is served from.
+            max_size (Tuple[int, int]): Maximum width and height of the thumbnails.
+            max_urls (int): Maximum number of images urls to remember the thumbnails of.
+            max_bytes (int): Maximum size of the directory, in bytes.
+            fetch_workers (int): The number of the threads that fetch the images.
+            max_pending_fetches (int): Maximum number of the images that are queued or fetched at once.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._base_url = base_url.rstrip("/")
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._max_pending_fetches = max_pending_fetches
+        self._executor = ThreadPoolExecutor(
+            max_workers=fetch_workers, thread_name_prefix="thumbnails"
+        )
+        # Image url as keys, and the name of it's thumbnail as values [None if it failed].
+        self._urls: cachetools.LRUCache = cachetools.LRUCache(maxsize=max_urls)
+        # The urls of the images that are queued or fetched.
+        self._fetching: Set[str] = set()
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        # Bytes stored by this process since the directory was last measured.
+        self._unmeasured_bytes: int = 0
+        self._url_hits: int = 0
+        self._content_hits: int = 0
+        self._misses: int = 0
+        self._failures: int = 0
+        self._fallbacks: int = 0
+        self._skipped_fetches: int = 0
+        self._original_bytes: int = 0
+        self._stored_bytes: int = 0
+        self._pruned_files: int = 0
+
+    def _store(self, image_bytes: bytes) -> str:
+        """Stores a thumbnail of the given image, if it's not already stored.
+
+        Args:
+            image_bytes (bytes): The content of the original image.
+
+        Returns:
+            str: The file name of the thumbnail.
+
+        Raises:
+            exceptions.ImageRejected: If the image has more than THUMBNAIL_MAX_IMAGE_PIXELS pixels.
+        """
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        # Only the header is read here, so the size is checked before the image is decoded.
+        image = Image.open(io.BytesIO(image_bytes))
+        if image.width * image.height > config.THUMBNAIL_MAX_IMAGE_PIXELS:
+            raise exceptions.ImageRejected(
+                f"The image has {image.width}x{image.height} pixels"
+            )
+        # Images with transparency are kept as PNG, and the others are compressed as JPEG.
+        image_format = (
+            "PNG"
+            if image.mode in ("RGBA", "LA") or "transparency" in image.info
+            else "JPEG"
+        )
+        file_name = f"{digest}.{image_format.lower()}"
+        path = os.path.join(self._directory, file_name)
+        if self._touch(file_name):
+            with self._lock:
+                self._content_hits += 1
+            return file_name
+        image.thumbnail(self._max_size)
+        thumbnail = io.BytesIO()
+        if image_format == "JPEG":
+            image.convert("RGB").save(
+                thumbnail, "JPEG", quality=config.THUMBNAIL_JPEG_QUALITY, optimize=True
+            )
+        else:
+            image.save(thumbnail, "PNG", optimize=True)
+        # Written aside and renamed, so a partially written thumbnail is never served.
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as thumbnail_file:
+            thumbnail_file.write(thumbnail.getvalue())
+        os.replace(temporary_path, path)
+        with self._lock:
+            self._misses += 1
+            self._original_bytes += len(image_bytes)
+            self._stored_bytes += thumbnail.tell()
+            self._unmeasured_bytes += thumbnail.tell()
+            should_prune = self._unmeasured_bytes > self._max_bytes // 10
+        if should_prune:
+            self._prune()
+        return file_name
+
+    def _touch(self, file_name: str) -> bool:
+        """Marks the given thumbnail as recently used, by it's modification time.
+
+        Args:
+            file_name (str): The file name of the thumbnail.
+
+        Returns:
+            bool: True if the thumbnail exists, False if it's not stored [or was pruned].
+        """
+        try:
+            os.utime(os.path.join(self._directory, file_name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _prune(self) -> None:
+        """Measures the directory, and if it exceeds max_bytes removes the least recently used thumbnails,
+        until it's down to 90% of max_bytes. It's done once the thumbnails stored by this process
+        since the last measurement exceed 10% of max_bytes, so the directory exceeds max_bytes by at most
+        10% per process that shares it.
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                self._unmeasured_bytes = 0
+            thumbnails = []
+            with os.scandir(self._directory) as entries:
+                for entry in entries:
+                    # Thumbnails that are being written are skipped.
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        thumbnails.append((stat.st_mtime, stat.st_size, entry.path))
+            directory_bytes = sum(size for _, size, _ in thumbnails)
+            if directory_bytes <= self._max_bytes:
+                return
+            thumbnails.sort()
+            pruned_files = 0
+            for _, size, path in thumbnails:
+                if directory_bytes <= self._max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Already pruned by another process.
+                    pass
+                directory_bytes -= size
+                pruned_files += 1
+            with self._lock:
+                self._pruned_files += pruned_files
+        finally:
+            self._prune_lock.release()
+
+    @staticmethod
+    def _check_source(image_url: str) -> None:
+        """Checks that the given image may be fetched: It's an http(s) url of an allowed host,
+        and all the addresses of the host are public.
+
+        Args:
+            image_url (str): The url of the image.
+
+        Raises:
+            exceptions.ImageRejected: If the image may not be fetched.
+        """
+        url = urllib.parse.urlsplit(image_url)
+        host = (url.hostname or "").lower()
+        if url.scheme not in ("http", "https") or not host:
+            raise exceptions.ImageRejected(f"{image_url} is not an http(s) url")
+        if config.THUMBNAILS_ALLOWED_HOSTS and not any(
+            host == allowed or host.endswith(f".{allowed}")
+            for allowed in config.THUMBNAILS_ALLOWED_HOSTS
+        ):
+            raise exceptions.ImageRejected(f"{host} is not an allowed host")
+        try:
+            addresses = socket.getaddrinfo(host, url.port, proto=socket.IPPROTO_TCP)
+        except socket.gaierror as exc:
+            raise exceptions.ImageRejected(f"{host} could not be resolved") from exc
+        for *_, socket_address in addresses:
+            address = ipaddress.ip_address(socket_address[0].split("%")[0])
+            if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if not address.is_global or address.is_multicast:
+                raise exceptions.ImageRejected(f"{host} has a non public address")
+
+    def _download(self, image_url: str) -> bytes:
+        """Downloads the given image, following it's redirects, each checked by _check_source.
+
+        Args:
+            image_url (str): The url of the image.
+
+        Returns:
+            bytes: The content of the image.
+
+        Raises:
+            exceptions.ImageRejected: If the image, or any of it's redirects, may not be fetched,
+                                      or it's larger than THUMBNAIL_MAX_IMAGE_BYTES.
+            requests.exceptions.RequestException: If the download failed.
+        """
+        with requests.Session() as session:
+            for _ in range(config.THUMBNAILS_MAX_REDIRECTS + 1):
+                self._check_source(image_url)
+                with session.get(
+                    image_url,
+                    stream=True,
+                    allow_redirects=False,
+                    timeout=config.THUMBNAILS_FETCH_TIMEOUT,
+                    verify=config.SECURITY_CERTIFICATE,
+                ) as response:
+                    if response.is_redirect:
+                        image_url = urllib.parse.urljoin(
+                            image_url, response.headers["location"]
+                        )
+                        continue
+                    response.raise_for_status()
+                    if (
+                        int(response.headers.get("content-length") or 0)
+                        > config.THUMBNAIL_MAX_IMAGE_BYTES
+                    ):
+                        raise exceptions.ImageRejected(f"{image_url} is too large")
+                    image_bytes = bytearray()
+                    # The length header may be missing or false, so the download itself is bounded too.
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        image_bytes += chunk
+                        if len(image_bytes) > config.THUMBNAIL_MAX_IMAGE_BYTES:
+                            raise exceptions.ImageRejected(f"{image_url} is too large")
+                    return bytes(image_bytes)
+        raise exceptions.ImageRejected(f"{image_url} has too many redirects")
+
+    def _fetch(self, image_url: str) -> None:
+        """Fetches the given image and stores it's thumbnail, runs by the fetching threads.
+
+        Args:
+            image_url (str): The url of the original image.
+        """
+        try:
+            with METRICS.timer("thumbnail_seconds"):
+                file_name = self._store(self._download(image_url))
+        except Exception as exc:
+            # TODO log it
+            print(exc)
+            file_name = None
+            with self._lock:
+                self._failures += 1
+        with self._lock:
+            self._urls[image_url] = file_name
+            self._fetching.discard(image_url)
+
+    def url(self, image_url: str) -> str:
+        """Gets the url of the thumbnail of the given image.
+        If it's not stored yet, starts fetching it in the background [unless it's already fetched],
+        and returns the original url meanwhile, so it never waits for the fetch.
+
+        Args:
+            image_url (str): The url of the original image.
+
+        Returns:
+            str: The url of the thumbnail, or the original url if the thumbnail is not available.
+        """
+        with self._lock:
+            file_name = self._urls.get(image_url, False)
+        if file_name is None:
+            # The image could not be fetched before.
+            with self._lock:
+                self._fallbacks += 1
+            return image_url
+        if file_name and self._touch(file_name):
+            with self._lock:
+                self._url_hits += 1
+            return f"{self._base_url}/{file_name}"
+        _RENDERING.has_pending_images = True
+        with self._lock:
+            self._fallbacks += 1
+            if image_url in self._fetching:
+                return image_url
+            if len(self._fetching) >= self._max_pending_fetches:
+                self._skipped_fetches += 1
+                return image_url
+            self._fetching.add(image_url)
+        self._executor.submit(self._fetch, image_url)
+        return image_url
+
+    def info(self) -> ThumbnailStoreInfo:
+        """Returns the statistics of the store.
+
+        Returns:
+            ThumbnailStoreInfo: Hits, misses, failures, fallbacks to the original images, the fetches,
+                                the sizes of the original and the stored images, and the pruned thumbnails.
+        """
+        with self._lock:
+            return ThumbnailStoreInfo(
+                self._url_hits,
+                self._content_hits,
+                self._misses,
+                self._failures,
+                self._fallbacks,
+                len(self._fetching),
+                self._skipped_fetches,
+                self._original_bytes,
+                self._stored_bytes,
+                self._pruned_files,
+            )
+
+
+# Shared by all messages of the process, None if the thumbnails are disabled.
+THUMBNAILS: ThumbnailStore | None = (
+    ThumbnailStore(
+        config.THUMBNAILS_DIRECTORY,
+        config.THUMBNAILS_BASE_URL,
+        config.THUMBNAIL_MAX_SIZE,
+        config.THUMBNAILS_MAX_URLS,
+        config.THUMBNAILS_MAX_BYTES,
+        config.THUMBNAILS_FETCH_WORKERS,
+        config.THUMBNAILS_MAX_PENDING_FETCHES,
+    )
+    if config.THUMBNAILS_BASE_URL
+    else None
+)
+
+
+def image_url(url: str | bool | None) -> str | bool | None:
+    """Gets the url to reference the given image by in messages, it's thumbnail if they are enabled.
+
+    Args:
+        url (str | bool | None): The url of the original image, or a falsy value if there is no image.
+
+    Returns:
+        str | bool | None: The url to reference, or the given falsy value.
+    """
+    if not url or THUMBNAILS is None:
+        return url
+    return THUMBNAILS.url(url)
+
+
+def render_tracking_pending_images(
+    render: Callable[[T], str], item: T
+) -> Tuple[str, bool]:
+    """Renders the given item, and tells if the render referenced any original image
+    since it's thumbnail was still pending, so the render is only a fallback until the thumbnail is stored.
+
+    Args:
+        render (Callable[[T], str]): The render function, runs in the current thread.
+        item (T): The item to be rendered.
+
+    Returns:
+        Tuple[str, bool]: The rendered string, and if it referenced a pending thumbnail.
+    """
+    _RENDERING.has_pending_images = False
+    rendered = render(item)
+    return rendered, _RENDERING.has_pending_images
@@ -1,9 +1,140 @@
 """Handles the encryption and comparison of the passwords.
+bcrypt is CPU-bound, so it runs by a pool of processes that scales across the cores,
+instead of saturating the process that serves the requests.
 """
 
+from __future__ import annotations
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, NamedTuple, Tuple, TypeVar
+
 import bcrypt
 
 from contentaggregator.lib import config
+from contentaggregator.lib import exceptions
+from contentaggregator.lib.metrics import METRICS
+
+T = TypeVar("T")
+
+
+def _timed(function: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    """Runs the given function [in a process of the pool], and measures it's duration.
+
+    Args:
+        function (Callable[..., T]): The function.
+        args (Any): The arguments of the function.
+
+    Returns:
+        Tuple[T, float]: The result of the function, and it's duration in seconds.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordsHashingInfo(NamedTuple):
+    """Statistics of the PasswordsHashingPool."""
+
+    processes: int
+    # Operations that are queued or running, their limit, and the highest number there was.
+    pending: int
+    max_pending: int
+    peak_pending: int
+    rejected: int
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of the operations that wait for a free process."""
+        return max(0, self.pending - self.processes)
+
+
+class PasswordsHashingPool:
+    """A pool of processes for the bcrypt hashing and checking.
+    The number of the pending operations is bounded, beyond it new operations are rejected immediately
+    by exceptions.ServerBusy, instead of waiting behind a burst [like a credential stuffing run].
+    The processes are started on the first operation, so processes that don't hash don't start them.
+    """
+
+    def __init__(self, processes: int, max_pending: int) -> None:
+        """
+        Args:
+            processes (int): The number of the processes.
+            max_pending (int): The maximum number of the operations that are queued or running.
+        """
+        self._processes = processes
+        self._max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending: int = 0
+        self._peak_pending: int = 0
+        self._rejected: int = 0
+
+    def run(self, operation: str, function: Callable[..., T], *args: Any) -> T:
+        """Runs the given function by a process of the pool, and waits for it's result.
+
+        Args:
+            operation (str): The name of the operation for the metrics, like 'hash' or 'check'.
+            function (Callable[..., T]): A module level function [so it can be pickled].
+            args (Any): The arguments of the function.
+
+        Raises:
+            exceptions.ServerBusy: If there are already max_pending pending operations.
+
+        Returns:
+            T: The result of the function.
+        """
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self._rejected += 1
+                raise exceptions.ServerBusy(
+                    "The server is busy, please try again in a few seconds."
+                )
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+            if self._executor is None:
+                # Forking a process that runs threads [like the website server] is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            executor = self._executor
+        try:
+            start = time.perf_counter()
+            result, duration = executor.submit(_timed, function, *args).result()
+            METRICS.observe("password_hash_seconds", duration, operation=operation)
+            METRICS.observe(
+                "password_queue_seconds",
+                time.perf_counter() - start - duration,
+                operation=operation,
+            )
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def info(self) -> PasswordsHashingInfo:
+        """Returns the statistics of the pool.
+
+        Returns:
+            PasswordsHashingInfo: The pending operations and their limit, the peak and the rejections.
+        """
+        with self._lock:
+            return PasswordsHashingInfo(
+                self._processes,
+                self._pending,
+                self._max_pending,
+                self._peak_pending,
+                self._rejected,
+            )
+
+
+# Shared by all the passwords operations of the process.
+HASHING_POOL = PasswordsHashingPool(
+    config.PASSWORDS_HASHING_PROCESSES, config.PASSWORDS_HASHING_MAX_PENDING
+)
+
 
 def encrypt_password(password: str) -> bytes:
     """Encrypt the password using bcrypt.
@@ -11,11 +142,17 @@ def encrypt_password(password: str) -> bytes:
     Args:
         password (str): The original password to be encrypted.
 
+    Raises:
+        exceptions.ServerBusy: If the hashing pool is full.
+
     Returns:
         bytes: The encrypted password.
     """
-    return bcrypt.hashpw(
-        password.encode(config.PASSWORD_ENCODING_METHOD), bcrypt.gensalt()
+    return HASHING_POOL.run(
+        "hash",
+        bcrypt.hashpw,
+        password.encode(config.PASSWORD_ENCODING_METHOD),
+        bcrypt.gensalt(),
     )
 
 
@@ -27,10 +164,15 @@ def is_same_password(original_password: str, hashed_password: bytes) -> bool:
         original_password (str): The password in a plain text format.
         hashed_password (bytes): The password in hashed format.
 
+    Raises:
+        exceptions.ServerBusy: If the hashing pool is full.
+
     Returns:
         bool: True if they are the same password, False otherwise.
     """
-    return bcrypt.checkpw(
+    return HASHING_POOL.run(
+        "check",
+        bcrypt.checkpw,
         original_password.encode(config.PASSWORD_ENCODING_METHOD),
         hashed_password,
     )
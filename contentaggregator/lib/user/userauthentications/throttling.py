@@ -0,0 +1,95 @@
+"""Throttling of the login and sign up attempts, by usernames and clients ips.
+It's checked before the passwords are hashed, so a credential stuffing run is stopped
+without spending the CPU of bcrypt on it.
+"""
+
+from __future__ import annotations
+import collections
+import threading
+import time
+from typing import Deque, Dict, NamedTuple
+
+import cachetools
+
+from contentaggregator.lib import config
+
+
+class SlidingWindowThrottleInfo(NamedTuple):
+    """Statistics of the SlidingWindowThrottle."""
+
+    keys: int
+    max_keys: int
+    admitted: int
+    throttled: int
+
+
+class SlidingWindowThrottle:
+    """Limits the attempts of each key [like 'username:someone@1.2.3.4' or 'ip:1.2.3.4'],
+    within a sliding window of time. The attempts of the least recently used keys are forgotten
+    once more than max_keys keys are tracked.
+    """
+
+    def __init__(self, window: float, max_keys: int) -> None:
+        """
+        Args:
+            window (float): The length of the window, in seconds.
+            max_keys (int): The maximum number of the tracked keys.
+        """
+        self._window = window
+        # Keys as keys, and the monotonic times of their attempts within the window as values.
+        self._attempts: cachetools.LRUCache = cachetools.LRUCache(maxsize=max_keys)
+        self._lock = threading.Lock()
+        self._admitted: int = 0
+        self._throttled: int = 0
+
+    def admit(self, limits: Dict[str, int]) -> float:
+        """Records an attempt of each of the given keys, if all of them are within their limits.
+
+        Args:
+            limits (Dict[str, int]): The keys of the attempt as keys,
+                                     and the number of the attempts they are allowed within the window as values.
+
+        Returns:
+            float: 0 if the attempt is admitted,
+                   otherwise the seconds until all the keys will be within their limits.
+        """
+        now = time.monotonic()
+        with self._lock:
+            retry_after = 0.0
+            for key, limit in limits.items():
+                attempts: Deque[float] = self._attempts.get(key, collections.deque())
+                while attempts and attempts[0] <= now - self._window:
+                    attempts.popleft()
+                if len(attempts) >= limit:
+                    retry_after = max(
+                        retry_after, attempts[-limit] + self._window - now
+                    )
+            if retry_after:
+                self._throttled += 1
+                return retry_after
+            for key in limits:
+                attempts = self._attempts.get(key, collections.deque())
+                attempts.append(now)
+                self._attempts[key] = attempts
+            self._admitted += 1
+            return 0.0
+
+    def info(self) -> SlidingWindowThrottleInfo:
+        """Returns the statistics of the throttle.
+
+        Returns:
+            SlidingWindowThrottleInfo: The tracked keys and their limit, the admitted and the throttled attempts.
+        """
+        with self._lock:
+            return SlidingWindowThrottleInfo(
+                len(self._attempts),
+                self._attempts.maxsize,
+                self._admitted,
+                self._throttled,
+            )
+
+
+# Shared by all the logins and sign ups of the process.
+LOGIN_THROTTLE = SlidingWindowThrottle(
+    config.LOGIN_ATTEMPTS_WINDOW, config.LOGIN_THROTTLE_MAX_KEYS
+)
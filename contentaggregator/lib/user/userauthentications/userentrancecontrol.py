@@ -1,19 +1,23 @@
 """Users entrance control - Enables to initialize a user sessions,
 by login method or signup method. Including username and password verification.
 """
+import math
 from typing import List
 from datetime import datetime
 
 from contentaggregator.lib.user.userinterface import User
 from contentaggregator.lib import config
 from contentaggregator.lib.sqlmanagement import databaseapi
+from contentaggregator.lib import exceptions
 
 from contentaggregator.lib.user.userauthentications import pwdhandler
+from contentaggregator.lib.user.userauthentications.throttling import LOGIN_THROTTLE
 from contentaggregator.lib.user.userauthentications.validators import (
     PRELIMINARY_USERNAME_CHECKERS,
     PASSWORD_CHECKERS,
     check_username_existence,
     check_credentials_compatibility,
+    select_user_info,
 )
 
 
@@ -35,30 +39,50 @@ def _get_credentials_validation_report(
 
 
 def __get_credentials_compatibility_report(
-    username: str, password: str, required_val: bool
-) -> Exception | int:
-    """Creates a list of the credentials verifiers results on the given username and password.
-    It is generated using the sql queries.
+    username: str, password: str
+) -> Exception | User:
+    """Checks the given username and password against the account in the database,
+    by a single query that also provides the full row of the User.
     It is designed and should be called,
     only if all results of the _get_credentials_validation_report, are None.
 
     Args:
         username (str): The username to check.
         password (str): The password to check.
-        required_val (bool): The required value for the existence username checking,
-                             True [in login session] or False [in signup session].
 
     Returns:
-        Exception | int: Exception if something occurred.
-                         else int - The row id of the requested account.
+        Exception | User: Exception if something occurred.
+                          else User - The User of the requested account.
     """
-    username_existence_exc = check_username_existence(username, required_val)
-    verify_compatibility_exc = (
-        None
-        if username_existence_exc
-        else check_credentials_compatibility(username, password)
+    user_info = select_user_info(username)
+    return (
+        check_credentials_compatibility(password, user_info)
+        if user_info
+        else exceptions.UserNotFound("Username does not exist.")
     )
-    return username_existence_exc or verify_compatibility_exc
+
+
+def _throttle(username: str, client_ip: str) -> None:
+    """Records an entrance attempt of the username and the client ip,
+    should be called before the password is hashed or checked.
+    The username is limited per client ip, so attempts of other clients can't lock it's user out.
+
+    Args:
+        username (str): The username of the attempt.
+        client_ip (str): The ip of the client of the attempt, empty if it's unknown.
+
+    Raises:
+        exceptions.TooManyAttempts: If the username [from the client ip] or the client ip had too many recent attempts.
+    """
+    limits = {
+        f"username:{username}@{client_ip}": config.LOGIN_ATTEMPTS_PER_USERNAME
+    }
+    if client_ip:
+        limits[f"ip:{client_ip}"] = config.LOGIN_ATTEMPTS_PER_IP
+    if retry_after := LOGIN_THROTTLE.admit(limits):
+        raise exceptions.TooManyAttempts(
+            f"Too many attempts, please try again in {math.ceil(retry_after)} seconds."
+        )
 
 
 def save_new_user(username: str, password: str) -> int:
@@ -71,23 +95,27 @@ def save_new_user(username: str, password: str) -> int:
     Returns:
         int: The new user row id.
     """
-    return databaseapi.insert(
+    columns = (
+        config.USERS_DATA_COLUMNS.username,
+        config.USERS_DATA_COLUMNS.password,
+        config.USERS_DATA_COLUMNS.last_password_change_date,
+    )
+    user_id = databaseapi.insert(
         table=config.DATABASE_TABLES_NAMES.users_table,
-        cols=(
-            config.USERS_DATA_COLUMNS.username,
-            config.USERS_DATA_COLUMNS.password,
-            config.USERS_DATA_COLUMNS.last_password_change_date,
-        ),
+        cols=columns,
         values=(username, pwdhandler.encrypt_password(password), datetime.now().date()),
     )
+    databaseapi.log_change(config.CHANGED_ENTITIES.user, user_id, columns)
+    return user_id
 
 
-def log_in(username: str, password: str) -> User:
+def log_in(username: str, password: str, client_ip: str = "") -> User:
     """Enters users to the system, subject to the username and password correctness.
 
     Args:
         username (str): Username of the incoming user.
         password (str): Password of the incoming user.
+        client_ip (str, optional): The ip of the incoming user, for the attempts throttling. Defaults to "".
 
     Raises:
         event: Appropriate exception in case an error occurs
@@ -108,7 +136,8 @@ def log_in(username: str, password: str) -> User:
             key=lambda event: event.criticality,
         )
         if any(validation_list)
-        else __get_credentials_compatibility_report(username, password, True)
+        else _throttle(username, client_ip)
+        or __get_credentials_compatibility_report(username, password)
     )
     if isinstance(event, Exception):
         # TODO in case of PasswordNotUpdated error  -
@@ -116,15 +145,16 @@ def log_in(username: str, password: str) -> User:
         # and when handle it by "as err" -> return err.user
         # and prints the massage for replace it's password
         raise event
-    return User(event)
+    return event
 
 
-def sign_up(username: str, password: str) -> User:
+def sign_up(username: str, password: str, client_ip: str = "") -> User:
     """Registers a new user accounts, by the chosen username and password.
 
     Args:
         username (str): The new username to register.
         password (str): The new password to register for this new username.
+        client_ip (str, optional): The ip of the new user, for the attempts throttling. Defaults to "".
 
     Raises:
         event: Appropriate exception in case an error occurs
@@ -143,7 +173,8 @@ def sign_up(username: str, password: str) -> User:
             key=lambda event: event.criticality,
         )
         if any(validation_list)
-        else check_username_existence(username, False)
+        else _throttle(username, client_ip)
+        or check_username_existence(username, False)
     )
 
     if event:
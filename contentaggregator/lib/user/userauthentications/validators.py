@@ -2,9 +2,10 @@
 both in terms of meeting the system requirements, and in terms of matching the existing data.
 """
 
+from __future__ import annotations
 import re
 from datetime import datetime, timedelta
-from typing import Tuple, List, Callable
+from typing import Any, Tuple, List, Callable
 
 
 from contentaggregator.lib.user import userinterface
@@ -249,8 +250,9 @@ def check_username_existence(
     db_response = databaseapi.select(
         cols=config.USERS_DATA_COLUMNS.username,
         table=config.DATABASE_TABLES_NAMES.users_table,
-        condition_expr=f"{config.USERS_DATA_COLUMNS.username} = '{username}'",
+        condition_expr=f"{config.USERS_DATA_COLUMNS.username} = BINARY '{username}'",
         desired_rows_num=1,
+        case_sensitive=False,
     )
     return (
         exceptions.UserNameAlreadyExists(
@@ -302,39 +304,49 @@ def has_been_a_year(last_password_change_date: str) -> bool:
     return datetime.now().date() - last_modified >= timedelta(days=365)
 
 
-def check_credentials_compatibility(
-    username: str, password: str
-) -> exceptions.IncorrectPassword | exceptions.PasswordNotUpdated | int:
-    """Checks if the entered password matches the given username, by database query.
+def select_user_info(username: str) -> Tuple[Any, ...] | None:
+    """Selects the full row of the given username, by a single query on the username index.
 
     Args:
         username (str): The username of the requested account.
-        password (str): The password to check against the username.
 
     Returns:
-        IncorrectPassword | PasswordNotUpdated | int:
-            IncorrectPassword if password does not match the username.
-            PasswordNotUpdated if password match to the username, but it should be updated.
-            otherwise int - the User id for this account.
+        Tuple[Any, ...] | None: The row of the account, or None if the username does not exist.
     """
+    # BINARY on the literal compares case sensitively, while keeping the index of the column usable.
     db_response = databaseapi.select(
-        cols=(
-            config.USERS_DATA_COLUMNS.password,
-            config.USERS_DATA_COLUMNS.last_password_change_date,
-            config.USERS_DATA_COLUMNS.id,
-        ),
         table=config.DATABASE_TABLES_NAMES.users_table,
-        condition_expr=f"{config.USERS_DATA_COLUMNS.username} = '{username}'",
+        condition_expr=f"{config.USERS_DATA_COLUMNS.username} = BINARY '{username}'",
+        desired_rows_num=1,
+        case_sensitive=False,
     )
-    is_match_flag = pwdhandler.is_same_password(password, bytes(db_response[0][0]))
+    return db_response[0] if db_response else None
+
+
+def check_credentials_compatibility(
+    password: str, user_info: Tuple[Any, ...]
+) -> (
+    exceptions.IncorrectPassword | exceptions.PasswordNotUpdated | userinterface.User
+):
+    """Checks if the entered password matches the given account row [from select_user_info].
+
+    Args:
+        password (str): The password to check against the account.
+        user_info (Tuple[Any, ...]): The full row of the requested account.
+
+    Returns:
+        IncorrectPassword | PasswordNotUpdated | User:
+            IncorrectPassword if password does not match the account.
+            PasswordNotUpdated if password match to the account, but it should be updated.
+            otherwise User - the User of this account, with its row already cached.
+    """
+    if not pwdhandler.is_same_password(password, bytes(user_info[2])):
+        return exceptions.IncorrectPassword("The password is incorrect. Try again.")
+    user = userinterface.User(user_info[0], user_info)
     return (
-        exceptions.PasswordNotUpdated(
-            "A new password must be chosen", userinterface.User(db_response[0][2])
-        )
-        if is_match_flag and has_been_a_year(db_response[0][1])
-        else db_response[0][2]
-        if is_match_flag
-        else exceptions.IncorrectPassword("The password is incorrect. Try again.")
+        exceptions.PasswordNotUpdated("A new password must be chosen", user)
+        if has_been_a_year(user_info[3])
+        else user
     )
 
 
@@ -4,7 +4,7 @@
 from __future__ import annotations
 import datetime
 import json
-from typing import List, Tuple, Any
+from typing import Dict, List, Tuple, Any
 
 from contentaggregator.lib.sqlmanagement import databaseapi
 from contentaggregator.lib.feeds.feed import FeedFactory
@@ -16,7 +16,7 @@ from contentaggregator.lib.user.userauthentications.validators import (
     check_username_existence,
 )
 from contentaggregator.lib.user.userproperties import address
-from contentaggregator.lib.user.userproperties.time import Time, Timing
+from contentaggregator.lib.user.userproperties.time import Time, Timing, WeekDays
 from contentaggregator.lib.user.userproperties.collections import (
     UserDictController,
     UserSetController,
@@ -26,14 +26,24 @@ from contentaggregator.lib.user.userproperties.collections import (
 class User:
     """Represents a user in the system"""
 
-    def __init__(self, user_id: int) -> None:
+    def __init__(
+        self, user_id: int, cached_info: Tuple[Any, ...] | None = None
+    ) -> None:
+        """
+        Args:
+            user_id (int): The row id of the user.
+            cached_info (Tuple[Any, ...] | None, optional): The full row of the user,
+                                                           if it has been already selected. Defaults to None.
+        """
         self._id: int = user_id
         self._feeds: UserSetController | bool | None = None
         self._addresses: UserDictController | bool | None = None
         self._username: str | None = None
         self._password: bytes | None = None
         self._sending_time: Time | bool | None = None
-        self._cached_info: List[Tuple[Any, ...]] | None = None
+        self._cached_info: List[Tuple[Any, ...]] | None = (
+            [cached_info] if cached_info else None
+        )
 
     def __repr__(self):
         return f"User(id={self.id})"
@@ -68,6 +78,20 @@ class User:
             desired_rows_num=1,
         )
 
+    def _update_database(self, updates_dict: Dict[str, Any]) -> None:
+        """Updates the row of this user in the database,
+        and logs the change so other processes can apply it.
+
+        Args:
+            updates_dict (Dict[str, Any]): Dictionary of columns names as keys and the new values as values.
+        """
+        databaseapi.update(
+            table=config.DATABASE_TABLES_NAMES.users_table,
+            updates_dict=updates_dict,
+            condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self._id}",
+        )
+        databaseapi.log_change(config.CHANGED_ENTITIES.user, self._id, updates_dict)
+
     @property
     def id(self) -> int:
         """Property getter for user id in the users table.
@@ -114,16 +138,14 @@ class User:
 
     def _update_feeds(self) -> None:
         """Updates the user subscriptions as required by feeds.setter (+=, -= or assignment)."""
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.users_table,
-            updates_dict={
+        self._update_database(
+            {
                 config.USERS_DATA_COLUMNS.subscriptions: repr(
                     json.dumps([feed.id for feed in self._feeds.collection])
                 )
                 if self._feeds
                 else None
-            },
-            condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self.id}",
+            }
         )
 
     def is_subscribed_to(self, feeds: UserSetController) -> bool:
@@ -178,9 +200,8 @@ class User:
 
     def _update_addresses(self) -> None:
         """Updates the user subscriptions as required by feeds.setter (+=, -= or assignment)."""
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.users_table,
-            updates_dict={
+        self._update_database(
+            {
                 config.USERS_DATA_COLUMNS.addresses: repr(
                     json.dumps(
                         {
@@ -191,8 +212,7 @@ class User:
                 )
                 if self._addresses
                 else None
-            },
-            condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self.id}",
+            }
         )
 
     def is_registered_at(self, addresses: UserDictController) -> bool:
@@ -246,11 +266,7 @@ class User:
             )
         if username_existence_exc := check_username_existence(new_username, False):
             raise username_existence_exc
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.users_table,
-            updates_dict={config.USERS_DATA_COLUMNS.username: repr(new_username)},
-            condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self._id}",
-        )
+        self._update_database({config.USERS_DATA_COLUMNS.username: repr(new_username)})
         self._username = new_username
 
     @property
@@ -282,9 +298,8 @@ class User:
         if event := check_password_validation(new_password):
             raise event
         hashed_pwd = pwdhandler.encrypt_password(new_password)
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.users_table,
-            updates_dict={
+        self._update_database(
+            {
                 # Using repr and decode to update sql with regular string like: '@weer8S!~~'
                 # Unlike in sign_up method that uses insert query.
                 config.USERS_DATA_COLUMNS.password: repr(
@@ -295,8 +310,7 @@ class User:
                 config.USERS_DATA_COLUMNS.last_password_change_date: repr(
                     str(datetime.datetime.now().date())
                 ),
-            },
-            condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self.id}",
+            }
         )
         self._password = hashed_pwd
 
@@ -311,11 +325,21 @@ class User:
         if not self._sending_time:
             if not self._cached_info:
                 self._cache_database_info()
+            time_zone = self._cached_info[0][8] or config.DEFAULT_TIMEZONE
+            sending_days, sending_minute = self._cached_info[0][10:12]
             timing_info = self._cached_info[0][4:6][::-1]
-            if all(timing_info):
+            if sending_days is not None and sending_minute is not None:
+                self._sending_time = Time(
+                    datetime.time(*divmod(sending_minute, 60)),
+                    WeekDays(sending_days),
+                    time_zone,
+                )
+            # Sending times that were set before sending days existed.
+            elif all(timing_info):
                 self._sending_time = Time(
                     datetime.datetime.strptime(timing_info[0], "%H:%M").time(),
                     Timing._value2member_map_[timing_info[1]],
+                    time_zone,
                 )
             else:
                 self._sending_time = False
@@ -324,26 +348,51 @@ class User:
     @sending_time.setter
     def sending_time(self, time: Time) -> None:
         """sending_time property setter.
-        Sets the Time object of this user.
+        Sets the Time object of this user, and the time of it's next sending accordingly.
 
         Args:
             Time: The time to send the messages to this user.
+
+        Raises:
+            TimingError: If the sending is timed to saturday, or it has no sending days.
         """
-        databaseapi.update(
-            table=config.DATABASE_TABLES_NAMES.users_table,
-            updates_dict={
+        next_send_at = time.next_sending(
+            datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        )
+        self._update_database(
+            {
                 config.USERS_DATA_COLUMNS.sending_time: repr(
                     time.sending_time.strftime("%H:%M")
                 ),
-                config.USERS_DATA_COLUMNS.sending_schedule: time.sending_schedule.value,
-            },
-            condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self.id}",
+                config.USERS_DATA_COLUMNS.sending_schedule: time.sending_schedule.value
+                if time.sending_schedule
+                else None,
+                config.USERS_DATA_COLUMNS.sending_days: time.sending_days.value,
+                config.USERS_DATA_COLUMNS.sending_minute: time.sending_minute,
+                config.USERS_DATA_COLUMNS.timezone: repr(time.time_zone),
+                config.USERS_DATA_COLUMNS.next_send_at: repr(
+                    next_send_at.strftime("%Y-%m-%d %H:%M:%S")
+                ),
+            }
         )
         self._sending_time = time
 
+    @property
+    def next_send_at(self) -> datetime.datetime | None:
+        """next_send_at property getter.
+        Gets the UTC time of the next sending to this user, as stored in the database.
+
+        Returns:
+            datetime.datetime | None: Naive UTC datetime, or None if the user has no sending time.
+        """
+        if not self._cached_info:
+            self._cache_database_info()
+        return self._cached_info[0][9]
+
     def delete(self) -> None:
         """Deletes this user from the database."""
         databaseapi.delete(
             table=config.DATABASE_TABLES_NAMES.users_table,
             condition_expr=f"{config.USERS_DATA_COLUMNS.id} = {self.id}",
         )
+        databaseapi.log_change(config.CHANGED_ENTITIES.user, self.id, None)
@@ -3,21 +3,68 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import contextlib
+import functools
 import json
 import re
-from concurrent import futures
+from typing import Dict, Iterable, Iterator
 
 import phonenumbers
-import yagmail
+from twilio.base.exceptions import TwilioRestException
+from twilio.rest import Client
 
 from contentaggregator.lib.feeds.feed import Feed
-from contentaggregator.lib import config, webrequests, messagesgeneration
+from contentaggregator.lib import config, exceptions, webrequests, messagesgeneration
+from contentaggregator.lib.metrics import METRICS
+from contentaggregator.lib.smtppool import SMTPSessionPool
+
+
+# Shared by all email addresses, so that messages are sent through open sessions.
+EMAIL_SESSIONS = SMTPSessionPool(
+    config.SMTP_POOL_SIZE,
+    config.SMTP_SESSION_MAX_MESSAGES,
+    user=config.EMAIL_SENDER_ADDRESS,
+    password=config.EMAIL_SENDER_PWD,
+    host=config.SMTP_HOST,
+    port=config.SMTP_PORT,
+    smtp_ssl=config.SMTP_SSL,
+)
+
+
+@functools.cache
+def twilio_client() -> Client:
+    """Returns the Twilio client of the WhatsApp, SMS and phone messages, shared by all addresses.
+    Created on first use, so the Twilio account is required only if these channels are used.
+
+    Returns:
+        Client: The Twilio client.
+    """
+    return Client(config.TWILIO_ACCOUNT_SID, config.TWILIO_AUTH_TOKEN)
+
+
+@contextlib.contextmanager
+def twilio_rejections() -> Iterator[None]:
+    """Raises the rejections of Twilio [4xx responses, other than rate limiting] as exceptions.UndeliverableMessage,
+    so that they are not retried.
+
+    Raises:
+        exceptions.UndeliverableMessage: If Twilio rejected the message.
+    """
+    try:
+        yield
+    except TwilioRestException as e:
+        if 400 <= e.status < 500 and e.status != 429:
+            raise exceptions.UndeliverableMessage(str(e)) from e
+        raise
 
 
 class Address(ABC):
     """An class for an digital / physical address like Email, Phone or Whatsapp
     can't be instantiated directly"""
 
+    # One of config.MESSAGE_FORMATS, the format of the messages sent to this address type.
+    message_format: str
+
     def __init__(
         self,
         address: str | phonenumbers.PhoneNumber,
@@ -49,12 +96,32 @@ class Address(ABC):
         pass
 
     @abstractmethod
-    def send_message(self, *feeds: Feed) -> None:
+    def send_message(self, *feeds: Feed, fragments: Dict[int, str] | None = None) -> None:
         """Sends messages to self.address from system address.
         It's expected to get kwargs as parameters, each concrete method as it's requirements.
+        Pre-rendered fragments of the feeds may be passed, to avoid rendering them again.
         """
         pass
 
+    def _generate_message(self, feeds: Iterable[Feed], fragments: Dict[int, str] | None) -> str:
+        """Generates a message in self.message_format, merged if config.MERGED_DIGEST is set.
+
+        Args:
+            feeds (Iterable[Feed]): The feeds to be included in the message.
+            fragments (Dict[int, str] | None): Already rendered fragments of the feeds in self.message_format,
+                                               shared by other messages. None to render them.
+
+        Returns:
+            str: The message.
+        """
+        if config.MERGED_DIGEST:
+            return messagesgeneration.generate_merged_message(self.message_format, feeds)
+        if fragments is None:
+            fragments = messagesgeneration.generate_feeds_fragments(
+                self.message_format, *feeds
+            )
+        return messagesgeneration.assemble_message(self.message_format, feeds, fragments)
+
 
 class NumberAddress(Address):
     """A middle class between Address and it's fool implementors.
@@ -107,6 +174,8 @@ class NumberAddress(Address):
 class WhatsAppAddress(NumberAddress):
     """Class for an whatsapp number"""
 
+    message_format = config.MESSAGE_FORMATS.whatsapp
+
     def _is_valid(self) -> bool:
         """Check if a number is a valid and if it is a registered whatsapp number.
 
@@ -125,37 +194,79 @@ class WhatsAppAddress(NumberAddress):
         )
         return json.loads(response.text).get("valid", None)
 
-    def send_message(self, *feeds: Feed) -> None:
-        """Sends a message to whatsapp number.
+    def send_message(self, *feeds: Feed, fragments: Dict[int, str] | None = None) -> None:
+        """Sends a message to whatsapp number, split into several messages if it's too long.
 
         Args:
-            message_params (str): Necessary params for specific message,
-            like (content='Hey I am content aggregator...', image='url_or_file_path',
-            audio='audio_url_or_file_path', video='video_url_or_file_path')
+            feeds (Feed): variable number of feeds.
+            fragments (Dict[int, str] | None, optional): Already rendered whatsapp fragments of the feeds,
+                                                        shared by other messages. Defaults to None.
         """
-        pass
+        message = self._generate_message(feeds, fragments)
+        with METRICS.timer(
+            "transport_seconds", channel=config.ADDRESSES_KEYS.whatsapp
+        ), twilio_rejections():
+            for part in messagesgeneration.split_message(
+                message, config.TWILIO_MESSAGE_MAX_LENGTH
+            ):
+                twilio_client().messages.create(
+                    from_=f"whatsapp:{config.TWILIO_WHATSAPP_NUMBER}",
+                    to=f"whatsapp:{self.address}",
+                    body=part,
+                )
 
 
 class PhoneAddress(NumberAddress):
     """Class for a "phone addresses", used for kosher devices, for example [by voice calls]"""
 
-    def send_message(self, *feeds: Feed) -> None:
-        """Sends a voice message to the phone number.
+    message_format = config.MESSAGE_FORMATS.voice
+
+    def send_message(self, *feeds: Feed, fragments: Dict[int, str] | None = None) -> None:
+        """Sends a voice message to the phone number, by a call that reads the message.
+        The message is truncated if it's too long.
 
         Args:
-            feeds_content (str): variable number of feed items lists.
+            feeds (Feed): variable number of feeds.
+            fragments (Dict[int, str] | None, optional): Already rendered voice fragments of the feeds,
+                                                        shared by other messages. Defaults to None.
         """
-        pass
+        message = messagesgeneration.truncate_voice_message(
+            self._generate_message(feeds, fragments), config.TWILIO_TWIML_MAX_LENGTH
+        )
+        with METRICS.timer(
+            "transport_seconds", channel=config.ADDRESSES_KEYS.phone
+        ), twilio_rejections():
+            twilio_client().calls.create(
+                from_=config.TWILIO_PHONE_NUMBER, to=self.address, twiml=message
+            )
 
 
 class SMSAddress(NumberAddress):
     """class for SMS addresses  - Hopefully it will be developed later"""
 
+    message_format = config.MESSAGE_FORMATS.text
+
     def _is_valid(self) -> bool:
         raise NotImplementedError("SMS addresses are not supported yet(:")
 
-    def send_message(self, *feeds: Feed) -> None:
-        pass
+    def send_message(self, *feeds: Feed, fragments: Dict[int, str] | None = None) -> None:
+        """Sends a text message to the SMS number, split into several messages if it's too long.
+
+        Args:
+            feeds (Feed): variable number of feeds.
+            fragments (Dict[int, str] | None, optional): Already rendered text fragments of the feeds,
+                                                        shared by other messages. Defaults to None.
+        """
+        message = self._generate_message(feeds, fragments)
+        with METRICS.timer(
+            "transport_seconds", channel=config.ADDRESSES_KEYS.sms
+        ), twilio_rejections():
+            for part in messagesgeneration.split_message(
+                message, config.TWILIO_MESSAGE_MAX_LENGTH
+            ):
+                twilio_client().messages.create(
+                    from_=config.TWILIO_PHONE_NUMBER, to=self.address, body=part
+                )
 
     # need to implement: __init__ method like in it's siblings,
     # is_valid staticmethod and return NumberAddress.is_valid(number)
@@ -165,6 +276,8 @@ class SMSAddress(NumberAddress):
 class EmailAddress(Address):
     """class for an E-Mail addresses"""
 
+    message_format = config.MESSAGE_FORMATS.html
+
     def _is_valid(self) -> bool:
         """Check if e-mail domain is valid, or a disposable/temporary address.
 
@@ -184,27 +297,17 @@ class EmailAddress(Address):
         data = json.loads(response.text)
         return data.get("valid", False) and not data.get("disposable", True)
 
-    def send_message(self, *feeds: Feed) -> None:
+    def send_message(self, *feeds: Feed, fragments: Dict[int, str] | None = None) -> None:
         """Sends a message to email address.
 
         Args:
             feeds (str): variable number of feeds.
+            fragments (Dict[int, str] | None, optional): Already rendered html fragments of the feeds,
+                                                        shared by other messages. Defaults to None.
         """
-        # message = ""
-        # message = "\n".join(
-        #     messagesgeneration.generate_html_feed_summery(feed) for feed in feeds
-        # )
-        with futures.ThreadPoolExecutor(max_workers=5) as executor:
-            threaded_tasks = [
-                executor.submit(messagesgeneration.generate_html_feed_summery, feed)
-                for feed in feeds
-            ]
-            message = "\n".join(
-                completed_task.result()
-                for completed_task in futures.as_completed(threaded_tasks)
-            )
-        with yagmail.SMTP(config.EMAIL_SENDER_ADDRESS) as yag:
-            yag.send(
+        message = self._generate_message(feeds, fragments)
+        with METRICS.timer("transport_seconds", channel=config.ADDRESSES_KEYS.email):
+            EMAIL_SESSIONS.send(
                 to=self.address,
                 subject="Hi! Here's is BerMen:)",
                 contents=message,
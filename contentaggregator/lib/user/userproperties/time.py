@@ -1,11 +1,17 @@
-"""_summary_#TODO docstring
+"""Sending time of the users messages, including the time of the day,
+the frequency of the sending and the timezone of the user.
 """
 
 
 from __future__ import annotations
-from datetime import time
+from datetime import time, date, datetime, timedelta, timezone
+from typing import List
+import zoneinfo
 
-from enum import Enum
+from enum import Enum, IntFlag
+
+from contentaggregator.lib import config
+from contentaggregator.lib.exceptions import TimingError
 
 
 class Timing(Enum):
@@ -20,16 +26,151 @@ class Timing(Enum):
     SATURDAY = 7
     SUNDAY = 8
 
-#TODO add timezone to the schedule in Messenger and handle it as well by user.sending_time setter and getter.
+
+MINUTES_IN_DAY: int = 24 * 60
+MINUTES_IN_WEEK: int = 7 * MINUTES_IN_DAY
+
+
+class WeekDays(IntFlag):
+    """Bitmask of sending days, the bit of each day is it's datetime.weekday()."""
+
+    MONDAY = 1 << 0
+    TUESDAY = 1 << 1
+    WEDNESDAY = 1 << 2
+    THURSDAY = 1 << 3
+    FRIDAY = 1 << 4
+    SATURDAY = 1 << 5
+    SUNDAY = 1 << 6
+
+    @classmethod
+    def from_timing(cls, timing: Timing) -> WeekDays:
+        """Converts a Timing to the equivalent sending days.
+
+        Args:
+            timing (Timing): The timing to convert.
+
+        Returns:
+            WeekDays: The sending days of the timing.
+        """
+        if timing is Timing.DAILY:
+            return DAILY_DAYS
+        return cls(1 << (timing.value - Timing.MONDAY.value))
+
+
+# Daily sending skips saturdays.
+DAILY_DAYS = ~WeekDays.SATURDAY
+
+
 class Time:
-    """Time of messages sending, including hour, minute, and frequency.
+    """Time of messages sending, including hour, minute, frequency and timezone.
     """
-    def __init__(self, sending_time: time, sending_schedule: Timing) -> None:
+    def __init__(
+        self,
+        sending_time: time,
+        sending_schedule: Timing | WeekDays,
+        time_zone: str = config.DEFAULT_TIMEZONE,
+    ) -> None:
+        """
+        Args:
+            sending_time (time): The time of the day to send at.
+            sending_schedule (Timing | WeekDays): The frequency of the sending,
+                                                  as a Timing or as a bitmask of several days.
+            time_zone (str, optional): IANA timezone name of the sending_time, like 'Asia/Jerusalem'.
+                                       Defaults to config.DEFAULT_TIMEZONE.
+
+        Raises:
+            ValueError: If time_zone is unknown.
+        """
+        try:
+            self._zone = zoneinfo.ZoneInfo(time_zone)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError) as e:
+            raise ValueError(f"Unknown timezone {repr(time_zone)}") from e
         self.sending_time = sending_time
-        self.sending_schedule = sending_schedule
+        self.sending_days: WeekDays = (
+            sending_schedule
+            if isinstance(sending_schedule, WeekDays)
+            else WeekDays.from_timing(sending_schedule)
+        )
+        self.time_zone = time_zone
 
     def __eq__(self, other: Time) -> bool:
         return (
             self.sending_time == other.sending_time
-            and self.sending_schedule == other.sending_schedule
+            and self.sending_days == other.sending_days
+            and self.time_zone == other.time_zone
         )
+
+    @property
+    def sending_schedule(self) -> Timing | None:
+        """The Timing equivalent to self.sending_days.
+
+        Returns:
+            Timing | None: The equivalent Timing, None if there is no such one [several days that aren't daily].
+        """
+        for timing in Timing:
+            if WeekDays.from_timing(timing) == self.sending_days:
+                return timing
+        return None
+
+    @property
+    def sending_minute(self) -> int:
+        """The minute of the day of the sending.
+
+        Returns:
+            int: Minutes since midnight.
+        """
+        return self.sending_time.hour * 60 + self.sending_time.minute
+
+    def week_minutes(self, at: datetime) -> List[int]:
+        """Calculates the UTC minutes of the week [Monday 00:00 is 0] of the sendings,
+        by the offset of the timezone at the given time.
+
+        Args:
+            at (datetime): A naive UTC datetime.
+
+        Returns:
+            List[int]: The minute of the week of each sending day.
+        """
+        offset = at.replace(tzinfo=timezone.utc).astimezone(self._zone).utcoffset()
+        offset_minutes = int(offset.total_seconds()) // 60
+        return [
+            (weekday * MINUTES_IN_DAY + self.sending_minute - offset_minutes)
+            % MINUTES_IN_WEEK
+            for weekday in range(7)
+            if self.sending_days & (1 << weekday)
+        ]
+
+    def is_sending_day(self, day: date) -> bool:
+        """Checks if messages should be sent at the given day.
+
+        Args:
+            day (date): The day to check.
+
+        Returns:
+            bool: True if it's a sending day, False otherwise.
+        """
+        return bool(self.sending_days & (1 << day.weekday()))
+
+    def next_sending(self, after: datetime) -> datetime:
+        """Calculates the first sending that comes after the given time.
+
+        Args:
+            after (datetime): A naive UTC datetime.
+
+        Raises:
+            TimingError: If the sending is timed to saturday, or it has no sending days.
+
+        Returns:
+            datetime: The time of the next sending, as a naive UTC datetime.
+        """
+        if self.sending_days & WeekDays.SATURDAY:
+            raise TimingError("It is Shabes Kodesh!!!, What are you doing?!")
+        if not self.sending_days:
+            raise TimingError("At least one sending day must be chosen.")
+        local_after = after.replace(tzinfo=timezone.utc).astimezone(self._zone)
+        # A week and a day covers the sending day of any schedule, even if it's today but passed.
+        for days in range(8):
+            day = local_after.date() + timedelta(days=days)
+            sending = datetime.combine(day, self.sending_time, tzinfo=self._zone)
+            if sending > local_after and self.is_sending_day(day):
+                return sending.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,323 @@
+"""Catalog module for the feeds presented on the dashboard.
+The catalog is identical for all users, so it's computed once per process as an immutable snapshot,
+built and refreshed in the background [never by the event loop of the server],
+and each session keeps only the ids of it's user subscriptions.
+"""
+from __future__ import annotations
+import bisect
+import math
+import re
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Set, Tuple
+
+import cachetools
+
+from contentaggregator.lib import config
+from contentaggregator.lib.feeds import feed
+from contentaggregator.lib.sqlmanagement import databaseapi
+
+# Presented for feeds without an image.
+DEFAULT_FEED_IMAGE = "https://pynecone.io/black.png"
+
+
+class FeedSummary(NamedTuple):
+    """The details of a feed that are presented on the dashboard."""
+
+    image: str
+    title: str
+    description: str
+    id: int
+    website: str | bool
+    # Names of the feed categories, like 'news'.
+    categories: Tuple[str, ...]
+
+    @classmethod
+    def from_feed(cls, feed_obj: feed.Feed) -> FeedSummary:
+        """Summarizes the given feed, from it's stored properties [without downloading it].
+
+        Args:
+            feed_obj (feed.Feed): The feed to summarize.
+
+        Returns:
+            FeedSummary: The summary of the feed.
+        """
+        return cls(
+            feed_obj.image or DEFAULT_FEED_IMAGE,
+            feed_obj.title,
+            feed_obj.description or feed_obj.title,
+            feed_obj.id,
+            feed_obj.website,
+            tuple(
+                sorted(category.name.lower() for category in feed_obj.categories or ())
+            ),
+        )
+
+    def details(self) -> List[str | int]:
+        """The details in a json serializable form, as they are presented on the dashboard page.
+
+        Returns:
+            List[str | int]: List of the feed image, title, description, id and website.
+        """
+        return [self.image, self.title, self.description, self.id, self.website]
+
+    def search_tokens(self) -> Set[str]:
+        """The words the feed can be searched by, from it's title and categories.
+
+        Returns:
+            Set[str]: The lower case words.
+        """
+        return set(_tokenize(" ".join((self.title, *self.categories))))
+
+
+def _tokenize(text: str) -> List[str]:
+    """Splits the given text to lower case words.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[str]: The words.
+    """
+    return re.findall(r"\w+", text.lower())
+
+
+class CatalogSnapshot(NamedTuple):
+    """An immutable state of the catalog, shared by all sessions."""
+
+    # Summaries of all feeds, by their ids order.
+    feeds: Tuple[FeedSummary, ...]
+    # The details of the feeds [see FeedSummary.details] by the same order,
+    # the pages of all sessions reference them instead of copying them.
+    details: Tuple[List[str | int], ...]
+    # Feeds ids as keys and their positions in feeds as values.
+    positions: Mapping[int, int]
+    # Sorted words of the feeds titles and categories, for searching by prefixes.
+    vocabulary: Tuple[str, ...]
+    # Sorted positions [in feeds] of the feeds of each word of the vocabulary.
+    postings: Tuple[Tuple[int, ...], ...]
+    # Monotonic time the snapshot was created at.
+    created_at: float
+
+    def search(self, query: str) -> Tuple[int, ...]:
+        """Searches the feeds whose titles or categories have words that start with each word of the query.
+
+        Args:
+            query (str): The searched words, like 'tech new'.
+
+        Returns:
+            Tuple[int, ...]: The sorted positions [in feeds] of the matching feeds, all of them if the query is empty.
+        """
+        matches: Set[int] | None = None
+        for word in _tokenize(query):
+            first = bisect.bisect_left(self.vocabulary, word)
+            last = bisect.bisect_left(self.vocabulary, word + "\U0010ffff", first)
+            word_matches = set().union(*self.postings[first:last])
+            matches = word_matches if matches is None else matches & word_matches
+            if not matches:
+                return ()
+        if matches is None:
+            return tuple(range(len(self.feeds)))
+        return tuple(sorted(matches))
+
+
+class CatalogPage(NamedTuple):
+    """A page of the feeds of the catalog."""
+
+    feeds: List[FeedSummary]
+    # The shared details of the feeds of the page.
+    details: List[List[str | int]]
+    # The index of the page, and the number of the pages of the search.
+    page: int
+    pages_number: int
+
+
+def _build_snapshot() -> CatalogSnapshot:
+    """Builds a snapshot of the catalog, by a single query of all feeds rows.
+
+    Returns:
+        CatalogSnapshot: The snapshot.
+    """
+    feeds = tuple(
+        sorted(
+            (
+                FeedSummary.from_feed(
+                    feed.FeedFactory.create(feed_data[0], feed_data[3], feed_data)
+                )
+                for feed_data in databaseapi.get_feeds_info()
+            ),
+            key=lambda summary: summary.id,
+        )
+    )
+    words_positions: Dict[str, List[int]] = {}
+    for position, summary in enumerate(feeds):
+        for word in summary.search_tokens():
+            words_positions.setdefault(word, []).append(position)
+    vocabulary = tuple(sorted(words_positions))
+    return CatalogSnapshot(
+        feeds,
+        tuple(summary.details() for summary in feeds),
+        MappingProxyType(
+            {summary.id: position for position, summary in enumerate(feeds)}
+        ),
+        vocabulary,
+        tuple(tuple(words_positions[word]) for word in vocabulary),
+        time.monotonic(),
+    )
+
+
+# Presented until the first snapshot is built.
+_EMPTY_SNAPSHOT = CatalogSnapshot((), (), MappingProxyType({}), (), (), 0.0)
+
+
+class FeedsCatalog:
+    """Holds the current snapshot of the catalog, and builds and refreshes it periodically in the background."""
+
+    def __init__(self, refresh_interval: int) -> None:
+        """
+        Args:
+            refresh_interval (int): Seconds between refreshes of the snapshot.
+        """
+        self._refresh_interval = refresh_interval
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = threading.Lock()
+        # Queries as keys and the positions of their matches in the current snapshot as values.
+        self._searches: cachetools.LRUCache = cachetools.LRUCache(
+            maxsize=config.FEEDS_CATALOG_CACHED_SEARCHES
+        )
+        self._refresher: threading.Thread | None = None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Returns the current snapshot, it never builds one, so it's called by the event handlers.
+        Until the first snapshot is built in the background [see start] the catalog is empty.
+
+        Returns:
+            CatalogSnapshot: The snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.start()
+            return _EMPTY_SNAPSHOT
+        return snapshot
+
+    def refresh(self) -> None:
+        """Rebuilds the snapshot, like after the feeds were changed.
+        Sessions that already read the previous snapshot keep it, since it's immutable.
+        """
+        snapshot = _build_snapshot()
+        with self._lock:
+            self._snapshot = snapshot
+            self._searches.clear()
+
+    def _refresh_periodically(self) -> None:
+        """Builds the first snapshot, and refreshes it every refresh_interval seconds,
+        for the lifetime of the process.
+        """
+        while True:
+            try:
+                self.refresh()
+            except Exception as exc:
+                # The previous snapshot is kept until the next refresh.
+                # TODO log it
+                print(exc)
+            time.sleep(self._refresh_interval)
+
+    def start(self) -> None:
+        """Starts building and refreshing the snapshot in the background, once per process."""
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_periodically, daemon=True
+            )
+        self._refresher.start()
+
+    def summaries(self, feeds_ids: List[int]) -> List[FeedSummary]:
+        """Gets the summaries of the given feeds, ignores feeds that are not in the catalog.
+
+        Args:
+            feeds_ids (List[int]): The ids of the feeds.
+
+        Returns:
+            List[FeedSummary]: The summaries, in the order of the given ids.
+        """
+        snapshot = self.snapshot()
+        return [
+            snapshot.feeds[snapshot.positions[feed_id]]
+            for feed_id in feeds_ids
+            if feed_id in snapshot.positions
+        ]
+
+    def page(
+        self, query: str, excluded_ids: List[int], page: int, page_size: int
+    ) -> CatalogPage:
+        """Gets a page of the feeds that match the given search query, except the given feeds.
+        Only the feeds of the page are collected, the other matches are only counted.
+
+        Args:
+            query (str): The searched words, empty for all feeds.
+            excluded_ids (List[int]): The ids of the feeds to exclude, like the user's subscriptions.
+            page (int): The index of the page, it's clamped to the existing pages.
+            page_size (int): The number of the feeds in a page.
+
+        Returns:
+            CatalogPage: The feeds of the page and their details, it's index, and the number of the pages.
+        """
+        snapshot = self.snapshot()
+        key = " ".join(_tokenize(query))
+        with self._lock:
+            matches = (
+                self._searches.get(key) if snapshot is self._snapshot else None
+            )
+        if matches is None:
+            matches = snapshot.search(key)
+            with self._lock:
+                if snapshot is self._snapshot:
+                    self._searches[key] = matches
+        excluded = set(excluded_ids)
+        excluded_matches = sum(
+            1
+            for feed_id in excluded
+            if feed_id in snapshot.positions
+            and _is_match(matches, snapshot.positions[feed_id])
+        )
+        pages_number = max(
+            1, math.ceil((len(matches) - excluded_matches) / page_size)
+        )
+        page = min(max(page, 0), pages_number - 1)
+        positions: List[int] = []
+        to_skip = page * page_size
+        for position in matches:
+            if snapshot.feeds[position].id in excluded:
+                continue
+            if to_skip:
+                to_skip -= 1
+                continue
+            positions.append(position)
+            if len(positions) == page_size:
+                break
+        return CatalogPage(
+            [snapshot.feeds[position] for position in positions],
+            [snapshot.details[position] for position in positions],
+            page,
+            pages_number,
+        )
+
+
+def _is_match(matches: Tuple[int, ...], position: int) -> bool:
+    """Checks whether the feed of the given position is one of the matches, by binary search.
+
+    Args:
+        matches (Tuple[int, ...]): Sorted positions of the matching feeds.
+        position (int): The position of the feed.
+
+    Returns:
+        bool: True if the feed is one of the matches, False otherwise.
+    """
+    match = bisect.bisect_left(matches, position)
+    return match < len(matches) and matches[match] == position
+
+
+# Shared by all sessions of the website process.
+CATALOG = FeedsCatalog(config.FEEDS_CATALOG_REFRESH_INTERVAL)
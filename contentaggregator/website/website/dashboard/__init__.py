@@ -38,24 +38,31 @@ class DashboardState(entrance.EntranceState):
     """Dashboard state. inherit from main EntranceState.
     """
     def reload_dashboard(self) -> None:
-        """Resets dashboard classes vars when dashboard page is reloaded.
+        """Resets the dashboard states vars of this session when dashboard page is reloaded.
+        The dashboard states are siblings of this state, under the EntranceState of the session.
         """
+        states = self.parent_state.substates
         # reload username state
-        username_management.DashboardUsernameState.new_username = ""
-        username_management.DashboardUsernameState.username_reset_message = ""
+        username_state = states[username_management.DashboardUsernameState.get_name()]
+        username_state.new_username = ""
+        username_state.username_reset_message = ""
         # reload password state
-        password_management.DashboardPasswordState.old_password = ""
-        password_management.DashboardPasswordState.new_password = ""
-        password_management.DashboardPasswordState.new_password_confirmation = ""
-        password_management.DashboardPasswordState.password_reset_message = ""
+        password_state = states[password_management.DashboardPasswordState.get_name()]
+        password_state.old_password = ""
+        password_state.new_password = ""
+        password_state.new_password_confirmation = ""
+        password_state.password_reset_message = ""
         # reload feeds state
-        feeds_management.FeedsDashboardState.feeds_reset_delete_message = ""
-        feeds_management.FeedsDashboardState.feeds_reset_add_message = ""
-        feeds_management.FeedsDashboardState.is_addition_disabled = True
-        feeds_management.FeedsDashboardState.is_deletion_disabled = True
+        feeds_state = states[feeds_management.FeedsDashboardState.get_name()]
+        feeds_state.feeds_reset_delete_message = ""
+        feeds_state.feeds_reset_add_message = ""
+        feeds_state._candidates_to_add = frozenset()
+        feeds_state._candidates_to_delete = frozenset()
+        feeds_state.is_addition_disabled = True
+        feeds_state.is_deletion_disabled = True
         # reload addresses state
-        addresses_management.AddressesDashboardState.email_address = ""
-        addresses_management.AddressesDashboardState.email_address_reset_message = ""
-        addresses_management.AddressesDashboardState.whatsapp_address_reset_message = ""
-        addresses_management.AddressesDashboardState.phone_address_reset_message = ""
-        addresses_management.AddressesDashboardState.sms_address_reset_message = ""
+        addresses_state = states[addresses_management.AddressesDashboardState.get_name()]
+        addresses_state.email_address_reset_message = ""
+        addresses_state.whatsapp_address_reset_message = ""
+        addresses_state.phone_address_reset_message = ""
+        addresses_state.sms_address_reset_message = ""
@@ -4,8 +4,10 @@
 import pynecone as pc
 
 from contentaggregator.lib import config
+from contentaggregator.lib.user import userinterface
 from contentaggregator.lib.user.userproperties import collections, address
 from . import entrance
+from .. import executors
 
 
 def get_address_type_name(address_key: str) -> str:
@@ -29,6 +31,69 @@ def get_address_type_name(address_key: str) -> str:
             return "PhoneAddress"
 
 
+def _store_address(
+    user: userinterface.User, has_addresses: bool, address_key: str, new_address: str
+) -> bool:
+    """Validate the new address of address_key and store it at user.addresses,
+    blocking [validation requests and database update], it's run by the validation executor.
+    As a dependency of the address status -
+    if it exist, then it will be modified, otherwise it will be added.
+
+    Args:
+        user (userinterface.User): The user.
+        has_addresses (bool): Whether the user has any address.
+        address_key (str): The key of the address change.
+        new_address (str): The new address.
+
+    Returns:
+        bool: True if an existing address was modified, False if it was added.
+    """
+    new_address_obj = address.__dict__[get_address_type_name(address_key)](new_address)
+    # If it is a new address for the user, than add it.
+    if (
+        has_addresses
+        and config.ADDRESSES_KEYS.__dict__[address_key]
+        not in user.addresses.collection
+    ):
+        user.addresses += collections.UserDictController(
+            **{address_key: new_address_obj}
+        )
+        return False
+    # If it is an existing address, modify it
+    if has_addresses:
+        user.addresses.collection[
+            config.ADDRESSES_KEYS.__dict__[address_key]
+        ] = new_address_obj
+        # Update database.
+        # TODO Consider simplify it by adding email, whatsapp, sms and phone properties setters and getters
+        # Inside User class (if it's job..), or inside UserDictController class (but how to access _update_addresses for database without circular importing...)
+        user._update_addresses()
+        return True
+    # If user has no any address, set it's addresses attribute.
+    user.addresses = collections.UserDictController(**{address_key: new_address_obj})
+    return False
+
+
+def _remove_address(
+    user: userinterface.User, address_key: str, current_address: str
+) -> None:
+    """Remove the current address of address_key from user.addresses,
+    blocking [database update], it's run by the database executor.
+
+    Args:
+        user (userinterface.User): The user.
+        address_key (str): The key of the address to delete.
+        current_address (str): The current address of the address_key.
+    """
+    user.addresses -= collections.UserDictController(
+        **{
+            address_key: address.__dict__[get_address_type_name(address_key)](
+                current_address, True, True
+            )
+        }
+    )
+
+
 class AddressesDashboardState(entrance.EntranceState):
     """User addresses dashboard manager."""
 
@@ -59,7 +124,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_no_email_address(self) -> bool:
-        """A ComputedVar that indicates if current self._user is unregistered at email address.
+        """A ComputedVar that indicates if the current user is unregistered at email address.
 
         Returns:
             bool: True if has no, False otherwise.
@@ -68,7 +133,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_no_whatsapp_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is unregistered at whatsapp address.
+        """A ComputedVar that indicates if the user is unregistered at whatsapp address.
 
         Returns:
             bool: True if has no, False otherwise.
@@ -77,7 +142,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_no_sms_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is unregistered at sms address.
+        """A ComputedVar that indicates if the user is unregistered at sms address.
 
         Returns:
             bool: True if has no, False otherwise.
@@ -86,7 +151,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_no_phone_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is unregistered at phone number address.
+        """A ComputedVar that indicates if the user is unregistered at phone number address.
 
         Returns:
             bool: True if has no, False otherwise.
@@ -95,7 +160,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_email_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is registered at email address.
+        """A ComputedVar that indicates if the user is registered at email address.
 
         Returns:
             bool: True if there is, False otherwise.
@@ -104,7 +169,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_sms_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is registered at sms address.
+        """A ComputedVar that indicates if the user is registered at sms address.
 
         Returns:
             bool: True if there is, False otherwise.
@@ -113,7 +178,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_phone_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is registered at phone number.
+        """A ComputedVar that indicates if the user is registered at phone number.
 
         Returns:
             bool: True if there is, False otherwise.
@@ -122,7 +187,7 @@ class AddressesDashboardState(entrance.EntranceState):
 
     @pc.var
     def has_whatsapp_address(self) -> bool:
-        """A ComputedVar that indicates if self._user is registered at whatsapp number.
+        """A ComputedVar that indicates if the user is registered at whatsapp number.
 
         Returns:
             bool: True if there is, False otherwise.
@@ -170,53 +235,32 @@ class AddressesDashboardState(entrance.EntranceState):
             case config.ADDRESSES_KEYS.sms:
                 self.sms_address_reset_message = new_message
 
-    def change_address(self, address_key: str) -> None:
+    async def change_address(self, address_key: str) -> None:
         """Change specified user address.
-        Add it to the self._user.addresses or modify an existing one.
-        As a dependency of the address status -
-        if it exist, then it will be modified, otherwise it will be added.
+        Add it to the user addresses or modify an existing one.
 
         Args:
             address_key (str): The key of the address change.
         """
         self.reset_message(address_key)
-        class_name = get_address_type_name(address_key)
-        if self._user:
+        if user := entrance.get_session_user(self._user_id):
             try:
-                new_address_obj = address.__dict__[class_name](
-                    self.__dict__[f"new_{address_key}_address"]
-                )
-                # If it is a new address for self._user, than add it.
-                if (
-                    self.has_addresses
-                    and config.ADDRESSES_KEYS.__dict__[address_key]
-                    not in self._user.addresses.collection
+                if await executors.run_blocking(
+                    executors.VALIDATION_EXECUTOR,
+                    _store_address,
+                    user,
+                    self.has_addresses,
+                    address_key,
+                    self.__dict__[f"new_{address_key}_address"],
                 ):
-                    self._user.addresses += collections.UserDictController(
-                        **{address_key: new_address_obj}
-                    )
-                # If it is an existing address, modify it
-                elif self.has_addresses:
-                    self._user.addresses.collection[
-                        config.ADDRESSES_KEYS.__dict__[address_key]
-                    ] = new_address_obj
-                    # Update database.
-                    # TODO Consider simplify it by adding email, whatsapp, sms and phone properties setters and getters
-                    # Inside User class (if it's job..), or inside UserDictController class (but how to access _update_addresses for database without circular importing...)
-                    self._user._update_addresses()
                     self.reset_message(address_key, "Address successfully updated!")
-                # If user has no any address, set it's addresses attribute.
-                else:
-                    self._user.addresses = collections.UserDictController(
-                        **{address_key: new_address_obj}
-                    )
-                    self.has_addresses = True
+                self.has_addresses = True
                 self.reset_address(address_key)
             except Exception as e:
                 self.reset_message(address_key, str(e))
 
     def get_current_address(self, address_key: str) -> str:
-        """Returns the current address of the address_key [Foe self._user of course].
+        """Returns the current address of the address_key [Foe the session user of course].
 
         Args:
             address_key (str): The key of the requested address.
@@ -234,28 +278,28 @@ class AddressesDashboardState(entrance.EntranceState):
             case config.ADDRESSES_KEYS.phone:
                 return self.phone_address
 
-    def delete_address(self, address_key: str) -> None:
-        """Delete a certain address from self._user.addresses.
+    async def delete_address(self, address_key: str) -> None:
+        """Delete a certain address from the user addresses.
 
         Args:
             address_key (str): The key of the address to delete.
         """
         self.reset_message(address_key)
-        class_name = get_address_type_name(address_key)
         current_address = self.get_current_address(address_key)
-        if self._user:
+        if user := entrance.get_session_user(self._user_id):
             try:
-                new_address_obj = address.__dict__[class_name](
-                    current_address, True, True
-                )
                 if self.has_addresses:
-                    self._user.addresses -= collections.UserDictController(
-                        **{address_key: new_address_obj}
+                    await executors.run_blocking(
+                        executors.DATABASE_EXECUTOR,
+                        _remove_address,
+                        user,
+                        address_key,
+                        current_address,
                     )
                     self.reset_address(address_key, False)
             except Exception as e:
                 self.reset_message(address_key, str(e))
-            if not self._user.addresses:
+            if not user.addresses:
                 self.has_addresses = False
 
 
@@ -1,20 +1,63 @@
 """User's feeds management and presentation.
 """
 
-from typing import Dict, List
+from typing import FrozenSet, List
 
 import pynecone as pc
 
 from contentaggregator.lib.feeds import feed
+from contentaggregator.lib.user import userinterface
 from contentaggregator.lib.user.userproperties import collections
 from . import entrance
+from .. import executors
+
+
+def _chosen_feeds(feeds_ids: FrozenSet[int]) -> collections.UserSetController:
+    """Creates the feeds of the given ids, a feed that is not registered yet reads it's row from the database.
+
+    Args:
+        feeds_ids (FrozenSet[int]): The ids of the chosen feeds.
+
+    Returns:
+        collections.UserSetController: The feeds.
+    """
+    return collections.UserSetController(
+        *(feed.FeedFactory.create(feed_id) for feed_id in sorted(feeds_ids))
+    )
+
+
+def _unsubscribe(user: userinterface.User, feeds_ids: FrozenSet[int]) -> None:
+    """Remove the given feeds from user.feeds,
+    blocking [database queries], it's run by the database executor.
+
+    Args:
+        user (userinterface.User): The user.
+        feeds_ids (FrozenSet[int]): The ids of the feeds to delete.
+    """
+    user.feeds -= _chosen_feeds(feeds_ids)
+
+
+def _subscribe(user: userinterface.User, feeds_ids: FrozenSet[int]) -> None:
+    """Add the given feeds to user.feeds,
+    blocking [database queries], it's run by the database executor.
+
+    Args:
+        user (userinterface.User): The user.
+        feeds_ids (FrozenSet[int]): The ids of the feeds to add.
+    """
+    if user.feeds:
+        user.feeds += _chosen_feeds(feeds_ids)
+    else:
+        user.feeds = _chosen_feeds(feeds_ids)
 
 
 class FeedsDashboardState(entrance.EntranceState):
     """A user feeds dashboard manager"""
 
-    _candidates_to_delete: Dict[int, feed.Feed] = dict()
-    _candidates_to_add: Dict[int, feed.Feed] = dict()
+    # Ids of the feeds the user has chosen to delete or to add.
+    # The sets are immutable, each choice assigns a new set to the session.
+    _candidates_to_delete: FrozenSet[int] = frozenset()
+    _candidates_to_add: FrozenSet[int] = frozenset()
     feeds_reset_add_message: str = ""
     feed_to_check: int = -1
     current_feed_id: int = -1
@@ -25,7 +68,7 @@ class FeedsDashboardState(entrance.EntranceState):
 
     @pc.var
     def is_available_feeds_exists(self) -> bool:
-        """A ComputedVar that indicates if there are any feeds that the current self._user,
+        """A ComputedVar that indicates if there are any feeds that the current user,
         does not subscribe to them.
 
         Returns:
@@ -33,6 +76,26 @@ class FeedsDashboardState(entrance.EntranceState):
         """
         return bool(self.available_feeds)
 
+    def search_feeds(self, query: str) -> None:
+        """Searches the available feeds by their titles and categories, from the first page.
+
+        Args:
+            query (str): The searched words.
+        """
+        self.catalog_query = query
+        self.catalog_page = 0
+        entrance.load_available_feeds(self)
+
+    def next_feeds_page(self) -> None:
+        """Loads the next page of the available feeds."""
+        self.catalog_page += 1
+        entrance.load_available_feeds(self)
+
+    def previous_feeds_page(self) -> None:
+        """Loads the previous page of the available feeds."""
+        self.catalog_page -= 1
+        entrance.load_available_feeds(self)
+
     def set_current_feed_id(self, feed_id: int) -> None:
         """Set the current_feed_id the user is currently engaged with.
 
@@ -42,43 +105,43 @@ class FeedsDashboardState(entrance.EntranceState):
         self.current_feed_id = feed_id
 
     def update_candidates_to_delete(self, is_selected: bool) -> None:
-        """Update self._candidates_to_delete dictionary, with the user's selection or de-selection.
+        """Update self._candidates_to_delete set, with the user's selection or de-selection.
 
         Args:
             is_selected (bool): Has the user selected the feed or de-selected itץ
         """
         if is_selected:
-            self._candidates_to_delete[self.current_feed_id] = feed.FeedFactory.create(
-                self.current_feed_id
-            )
+            self._candidates_to_delete |= {self.current_feed_id}
             self.is_deletion_disabled = False
         else:
-            self._candidates_to_delete.pop(self.current_feed_id)
+            self._candidates_to_delete -= {self.current_feed_id}
             if not bool(self._candidates_to_delete):
                 self.is_deletion_disabled = True
 
     def update_feeds_subscriptions(self) -> None:
-        """Update self.user_feeds and self.available_feeds lists.
+        """Update self.subscribed_feeds_ids.
         Used after feed deletion, to update lists accordance the last changes.
         """
-        for feed_obj in self._candidates_to_delete.values():
-            self.user_feeds.remove(entrance.prepare_specific_feed_details(feed_obj))
-            self.available_feeds.append(
-                entrance.prepare_specific_feed_details(feed_obj)
-            )
-            self.available_feeds_status[feed_obj.id] = True
-            self.user_feeds_status[feed_obj.id] = False
-
-    def delete_feeds(self) -> None:
+        self.subscribed_feeds_ids = [
+            feed_id
+            for feed_id in self.subscribed_feeds_ids
+            if feed_id not in self._candidates_to_delete
+        ]
+        entrance.load_available_feeds(self)
+
+    async def delete_feeds(self) -> None:
         """Delete all chosen feeds."""
-        if self._user:
+        if user := entrance.get_session_user(self._user_id):
             try:
-                self._user.feeds -= collections.UserSetController(
-                    *tuple(self._candidates_to_delete.values())
+                await executors.run_blocking(
+                    executors.DATABASE_EXECUTOR,
+                    _unsubscribe,
+                    user,
+                    self._candidates_to_delete,
                 )
                 self.update_feeds_subscriptions()
-                self._candidates_to_delete.clear()
-                if not self._user.feeds:
+                self._candidates_to_delete = frozenset()
+                if not user.feeds:
                     self.has_feeds = False
                 self.is_deletion_disabled = True
                 self.feeds_reset_add_message = ""
@@ -89,48 +152,41 @@ class FeedsDashboardState(entrance.EntranceState):
                 self.feeds_reset_delete_message = str(e)
 
     def update_candidates_to_add(self, is_selected: bool) -> None:
-        """Update self._candidates_to_add dictionary,
+        """Update self._candidates_to_add set,
         with the user's selection or de-selection.
 
         Args:
             is_selected (bool): Has the user selected the feed or de-selected it.
         """
         if is_selected:
-            self._candidates_to_add[self.current_feed_id] = feed.FeedFactory.create(
-                self.current_feed_id
-            )
+            self._candidates_to_add |= {self.current_feed_id}
             self.is_addition_disabled = False
         else:
-            self._candidates_to_add.pop(self.current_feed_id)
+            self._candidates_to_add -= {self.current_feed_id}
             if not bool(self._candidates_to_add):
                 self.is_addition_disabled = True
 
     def update_feeds_availability(self) -> None:
-        """Update self.user_feeds and self.available_feeds lists.
+        """Update self.subscribed_feeds_ids.
         Used after feed addition, to update lists accordance the last changes.
         """
-        for feed_obj in self._candidates_to_add.values():
-            self.available_feeds.remove(
-                entrance.prepare_specific_feed_details(feed_obj)
-            )
-            self.user_feeds.append(entrance.prepare_specific_feed_details(feed_obj))
-            self.user_feeds_status[feed_obj.id] = True
-            self.available_feeds_status[feed_obj.id] = False
-
-    def add_feeds(self) -> None:
+        self.subscribed_feeds_ids = sorted(
+            set(self.subscribed_feeds_ids).union(self._candidates_to_add)
+        )
+        entrance.load_available_feeds(self)
+
+    async def add_feeds(self) -> None:
         """Add all chosen feeds."""
-        if self._user:
+        if user := entrance.get_session_user(self._user_id):
             try:
-                if self._user.feeds:
-                    self._user.feeds += collections.UserSetController(
-                        *tuple(self._candidates_to_add.values())
-                    )
-                else:
-                    self._user.feeds = collections.UserSetController(
-                        *tuple(self._candidates_to_add.values())
-                    )
+                await executors.run_blocking(
+                    executors.DATABASE_EXECUTOR,
+                    _subscribe,
+                    user,
+                    self._candidates_to_add,
+                )
                 self.update_feeds_availability()
-                self._candidates_to_add.clear()
+                self._candidates_to_add = frozenset()
                 self.has_feeds = True
                 self.is_addition_disabled = True
                 self.feeds_reset_delete_message = ""
@@ -140,41 +196,35 @@ class FeedsDashboardState(entrance.EntranceState):
             except Exception as e:
                 self.feeds_reset_add_message = str(e)
 
-
 def render_feed_box(
     feed_details: List[str],
-    condition: pc.vars.BaseVar,
     is_candidate_to_delete: bool,
 ) -> pc.Component:
     """Render feed component with feed details.
 
     Args:
         feed_details (List[str]): A list that contains any data needed for rendering.
-        condition (pc.vars.Var): The condition for feed component.
         is_candidate_to_delete (bool): If is a user's feed or not.
 
     Returns:
-        pc.Component: The conditional component for specific feed.
+        pc.Component: The component for specific feed.
     """
     _feed_title = feed_details[2]
     _feed_id = feed_details[3]
-    _feed_website = FeedsDashboardState.websites_links[_feed_id]
+    _feed_website = feed_details[4]
     button_event_handler = (
         FeedsDashboardState.update_candidates_to_delete
         if is_candidate_to_delete
         else FeedsDashboardState.update_candidates_to_add
     )
-    return pc.cond(
-        condition,
-        pc.hstack(
-            pc.link(
-                _feed_title,
-                href=_feed_website,
-                is_external=True,
-            ),
-            pc.checkbox(color_scheme="green", on_change=button_event_handler),
-            on_mouse_over=lambda _: FeedsDashboardState.set_current_feed_id(_feed_id),
+    return pc.hstack(
+        pc.link(
+            _feed_title,
+            href=_feed_website,
+            is_external=True,
         ),
+        pc.checkbox(color_scheme="green", on_change=button_event_handler),
+        on_mouse_over=lambda _: FeedsDashboardState.set_current_feed_id(_feed_id),
     )
 
 
@@ -191,11 +241,7 @@ def feeds_presentation() -> pc.Component:
             pc.vstack(
                 pc.foreach(
                     FeedsDashboardState.user_feeds,
-                    lambda feed_data: render_feed_box(
-                        feed_data,
-                        FeedsDashboardState.user_feeds_status[feed_data[3]],
-                        True,
-                    ),
+                    lambda feed_data: render_feed_box(feed_data, True),
                 ),
                 pc.button(
                     "Delete",
@@ -213,15 +259,35 @@ def feeds_presentation() -> pc.Component:
         ),
         pc.text(FeedsDashboardState.feeds_reset_delete_message),
         pc.text("Available feeds:", as_="b"),
+        pc.input(
+            placeholder="Search feeds by title or category...",
+            on_change=FeedsDashboardState.search_feeds,
+            color="#676767",
+            size="md",
+        ),
         pc.cond(
             FeedsDashboardState.is_available_feeds_exists,
             pc.vstack(
                 pc.foreach(
                     FeedsDashboardState.available_feeds,
-                    lambda feed_data: render_feed_box(
-                        feed_data,
-                        FeedsDashboardState.available_feeds_status[feed_data[3]],
-                        False,
+                    lambda feed_data: render_feed_box(feed_data, False),
+                ),
+                pc.hstack(
+                    pc.button(
+                        "Previous",
+                        is_disabled=FeedsDashboardState.catalog_page == 0,
+                        on_click=FeedsDashboardState.previous_feeds_page,
+                    ),
+                    pc.text(
+                        FeedsDashboardState.catalog_page + 1,
+                        " / ",
+                        FeedsDashboardState.catalog_pages_number,
+                    ),
+                    pc.button(
+                        "Next",
+                        is_disabled=FeedsDashboardState.catalog_page + 1
+                        >= FeedsDashboardState.catalog_pages_number,
+                        on_click=FeedsDashboardState.next_feeds_page,
                     ),
                 ),
                 pc.button(
@@ -4,6 +4,7 @@ import pynecone as pc
 
 from contentaggregator.lib.user.userauthentications import pwdhandler
 from . import entrance
+from .. import executors
 
 
 class DashboardPasswordState(entrance.EntranceState):
@@ -14,26 +15,33 @@ class DashboardPasswordState(entrance.EntranceState):
     new_password_confirmation: str = ""
     password_reset_message: str = ""
 
-    def save_new_password(self) -> None:
-        """Save new password for self._user"""
-        if not self._user:
+    async def save_new_password(self) -> None:
+        """Save new password for the session user.
+        The password check and hashing are run by the passwords executor,
+        unless too many passwords operations are pending.
+        """
+        if not (user := entrance.get_session_user(self._user_id)):
             return
-        # Verify old password correctness and new password compatibility.
-        if not pwdhandler.is_same_password(self.old_password, self._user.password):
-            self.password_reset_message = "Old password is incorrect"
-        elif self.new_password != self.new_password_confirmation:
-            self.password_reset_message = "New password has not been confirmed"
-        # If new password is not realy `new` - it's the same with the old: do nothing.
-        # Else reset self._user.password
-        elif self.old_password != self.new_password:
-            try:
-                self._user.password = self.new_password
+        try:
+            # Verify old password correctness and new password compatibility.
+            if not await executors.run_password_operation(
+                lambda: pwdhandler.is_same_password(self.old_password, user.password)
+            ):
+                self.password_reset_message = "Old password is incorrect"
+            elif self.new_password != self.new_password_confirmation:
+                self.password_reset_message = "New password has not been confirmed"
+            # If new password is not realy `new` - it's the same with the old: do nothing.
+            # Else reset user.password
+            elif self.old_password != self.new_password:
+                await executors.run_password_operation(
+                    setattr, user, "password", self.new_password
+                )
                 self.password_reset_message = "Password changed successfully!"
                 self.old_password = ""
                 self.new_password = ""
                 self.new_password_confirmation = ""
-            except Exception as e:
-                self.password_reset_message = str(e)
+        except Exception as e:
+            self.password_reset_message = str(e)
 
 
 def password_presentation() -> pc.Component:
@@ -1,10 +1,15 @@
 """User's sending_time management and presentation.
 """
 from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import Dict
+import zoneinfo
 
 import pynecone as pc
 
 from . import entrance
+from .. import executors
 from contentaggregator.lib.user.userproperties import time
 
 
@@ -13,19 +18,71 @@ class SendingTimeDashboard(entrance.EntranceState):
 
     sending_time_reset_message: str = ""
 
-    def save_changes(self) -> None:
-        """Reset self._user.sending_time property."""
-        if self._user:
+    @pc.var
+    def send_days_status(self) -> Dict[str, bool]:
+        """A ComputedVar that indicates for each weekday if it's a chosen sending day.
+
+        Returns:
+            Dict[str, bool]: Days names as keys, and True for chosen days as values.
+        """
+        return {day.name: day.name in self.send_days for day in time.WeekDays}
+
+    def toggle_send_day(self, day_name: str, is_selected: bool) -> None:
+        """Adds or removes a day from the chosen sending days.
+
+        Args:
+            day_name (str): The name of the day, like 'MONDAY'.
+            is_selected (bool): Has the user selected the day or de-selected it.
+        """
+        if is_selected and day_name not in self.send_days:
+            self.send_days.append(day_name)
+        elif not is_selected and day_name in self.send_days:
+            self.send_days.remove(day_name)
+
+    async def save_changes(self) -> None:
+        """Reset the session user sending_time property.
+        The database update is run by the database executor.
+        """
+        if user := entrance.get_session_user(self._user_id):
             try:
-                self._user.sending_time = time.Time(
-                    datetime.strptime(self.send_hour, "%H:%M").time(),
-                    time.Timing.__dict__[self.send_timing.upper()],
+                await executors.run_blocking(
+                    executors.DATABASE_EXECUTOR,
+                    setattr,
+                    user,
+                    "sending_time",
+                    time.Time(
+                        datetime.strptime(self.send_hour, "%H:%M").time(),
+                        reduce(
+                            or_,
+                            (time.WeekDays[day_name] for day_name in self.send_days),
+                            time.WeekDays(0),
+                        ),
+                        self.send_timezone,
+                    ),
                 )
                 self.sending_time_reset_message = "Updated successfully!"
             except Exception as e:
                 self.sending_time_reset_message = str(e)
 
 
+def sending_day_checkbox(day: time.WeekDays) -> pc.Component:
+    """Generate a checkbox for choosing a sending day.
+
+    Args:
+        day (time.WeekDays): The day of the checkbox.
+
+    Returns:
+        pc.Component: The checkbox component.
+    """
+    return pc.checkbox(
+        day.name.capitalize(),
+        is_checked=SendingTimeDashboard.send_days_status[day.name],
+        on_change=lambda is_selected: SendingTimeDashboard.toggle_send_day(
+            day.name, is_selected
+        ),
+    )
+
+
 def sending_time_presentation() -> pc.Component:
     """Generate a sending time reset box part an the dashboard page
 
@@ -36,18 +93,25 @@ def sending_time_presentation() -> pc.Component:
         pc.text("Schedule a frequency and time of sending:", as_="b"),
         pc.vstack(
             pc.hstack(
-                pc.select(
-                    [key.name.capitalize() for key in time.Timing],
-                    placeholder="Select timing",
-                    default_value=SendingTimeDashboard.send_timing,
-                    on_change=SendingTimeDashboard.set_send_timing,
+                *(
+                    sending_day_checkbox(day)
+                    for day in time.WeekDays
+                    if day is not time.WeekDays.SATURDAY
                 ),
+            ),
+            pc.hstack(
                 pc.input(
                     type_="time",
                     placeholder="Select hour",
                     default_value=SendingTimeDashboard.send_hour,
                     on_change=SendingTimeDashboard.set_send_hour,
                 ),
+                pc.select(
+                    sorted(zoneinfo.available_timezones()),
+                    placeholder="Select timezone",
+                    default_value=SendingTimeDashboard.send_timezone,
+                    on_change=SendingTimeDashboard.set_send_timezone,
+                ),
             ),
             pc.button("Save", on_click=SendingTimeDashboard.save_changes),
             pc.text(SendingTimeDashboard.sending_time_reset_message),
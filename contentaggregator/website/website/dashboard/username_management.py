@@ -3,6 +3,7 @@
 import pynecone as pc
 
 from . import entrance
+from .. import executors
 
 
 class DashboardUsernameState(entrance.EntranceState):
@@ -11,22 +12,20 @@ class DashboardUsernameState(entrance.EntranceState):
     new_username: str = ""
     username_reset_message: str = ""
 
-    @pc.var
-    def updated_username(self) -> str:
-        """ComputedVar that return current username
-
-        Returns:
-            str: The current username.
-        """
-        if self._user:
-            return self._user.username
-
-    def save_new_username(self) -> None:
-        """Save new username of the self._user
+    async def save_new_username(self) -> None:
+        """Save new username of the session user.
+        The queries are run by the database executor.
         """
-        if self._user:
+        if user := entrance.get_session_user(self._user_id):
             try:
-                self._user.username = self.new_username
+                await executors.run_blocking(
+                    executors.DATABASE_EXECUTOR,
+                    setattr,
+                    user,
+                    "username",
+                    self.new_username,
+                )
+                self.session_username = self.new_username
                 self.username_reset_message = "Saved Successfully:)"
             except Exception as e:
                 self.username_reset_message = str(e)
@@ -43,7 +42,7 @@ def username_presentation() -> pc.Component:
         pc.hstack(
             pc.input(
                 place_holder="New username",
-                default_value=DashboardUsernameState.updated_username,
+                default_value=DashboardUsernameState.session_username,
                 on_change=DashboardUsernameState.set_new_username,
             ),
             pc.button(
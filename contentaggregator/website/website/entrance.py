@@ -1,32 +1,74 @@
 """Entrance module for users entrance management and presentation
 """
-from typing import List, Dict
+import threading
+from typing import List
 
+import cachetools
 import pynecone as pc
 
 from contentaggregator.lib import config
 from contentaggregator.lib.user.userauthentications import userentrancecontrol
 from contentaggregator.lib.user import userinterface
-from contentaggregator.lib.feeds import feed
-from contentaggregator.lib.sqlmanagement import databaseapi
+from contentaggregator.lib.user.userproperties import time
+from . import catalog
+from . import executors
 
 
-def prepare_specific_feed_details(feed_obj: feed.Feed) -> List[str | int]:
-    """Prepare specific feed details, in a json serializable form
-    - List of the details needed to be presented on the dashboard page.
+# The users of the logged in sessions by their ids, shared by all sessions of the website process.
+# Sessions keep only the ids of their users, so their state stays small [and cheap to pickle],
+# and evicted users are created again once required [their properties are read lazily].
+_SESSIONS_USERS: cachetools.LRUCache = cachetools.LRUCache(
+    maxsize=config.WEBSITE_CACHED_USERS
+)
+_SESSIONS_USERS_LOCK = threading.Lock()
+
+
+def register_session_user(user: userinterface.User) -> int:
+    """Shares the given logged in user with the sessions, instead of a previous object of it.
+
+    Args:
+        user (userinterface.User): The user that has logged in or signed up.
+
+    Returns:
+        int: The id of the user, for the session to keep.
+    """
+    with _SESSIONS_USERS_LOCK:
+        _SESSIONS_USERS[user.id] = user
+    return user.id
+
+
+def get_session_user(user_id: int) -> userinterface.User | bool:
+    """Gets the user of a session by it's id.
+
+    Args:
+        user_id (int): The id the session keeps, 0 if no user has logged in.
+
+    Returns:
+        userinterface.User | bool: The user, False if no user has logged in.
+    """
+    if not user_id:
+        return False
+    with _SESSIONS_USERS_LOCK:
+        if (user := _SESSIONS_USERS.get(user_id)) is None:
+            user = _SESSIONS_USERS[user_id] = userinterface.User(user_id)
+    return user
+
+
+def load_user_properties(user: userinterface.User) -> str:
+    """Reads the properties of the user that are presented on the dashboard,
+    they are cached by the user object, so presenting them doesn't block.
+    Blocking, it's run by an executor.
 
     Args:
-        feed_obj (feed.Feed): The Feed object to extract details from.
+        user (userinterface.User): The user to load it's properties.
 
     Returns:
-        List[str | int]: List with the following details: feed.image, feed.title, feed.description, feed.id.
+        str: The username of the user, for the session to keep.
     """
-    return [
-        feed_obj.image or "https://pynecone.io/black.png",
-        feed_obj.title,
-        feed_obj.description or feed_obj.title,
-        feed_obj.id,
-    ]
+    check_feeds_existence(user)
+    user.addresses
+    user.sending_time
+    return user.username
 
 
 def check_feeds_existence(user: userinterface.User) -> bool:
@@ -48,24 +90,29 @@ def check_feeds_existence(user: userinterface.User) -> bool:
 class EntranceState(pc.State):
     """User entrance process manager."""
 
-    # User backend var. There will be a real user object, lives at this state,
-    # once login or sign-up is successful.
-    _user: userinterface.User | bool = False
+    # User backend var. The id of the user once login or sign-up is successful, 0 otherwise.
+    # The user object itself is shared by the sessions, see get_session_user.
+    _user_id: int = 0
     username: str = ""
+    # The username of the logged in user, stored by the login and sign-up handlers,
+    # so presenting it never queries the database [the shared user object may have been evicted].
+    session_username: str = ""
     password: str = ""
     # Message to present on the entrance page when the user trying to login or sign up.
     message: str = ""
     is_clicked: bool = False
     #
     # For the FeedsDashboardState inheriting class.
-    user_feeds_status: Dict[int, bool] = dict()  # ? still needed?
-    available_feeds_status: Dict[int, bool] = dict()  # ? still needed?
-    websites_links: Dict[int, str] = dict()
     has_feeds: bool = False
-    # List of feed details where the user is registered.
-    user_feeds: List[List[str | int]] = []
-    # List of feed details where the user is unregistered.
+    # Ids of the feeds where the user is registered,
+    # the details of the feeds are read from the shared catalog.
+    subscribed_feeds_ids: List[int] = []
+    # The details of the current page of the feeds where the user is unregistered,
+    # only the searched feeds [by title or category] are paginated.
     available_feeds: List[List[str | int]] = []
+    catalog_query: str = ""
+    catalog_page: int = 0
+    catalog_pages_number: int = 1
     #
     # For the AddressesDashboardState inheriting class.
     has_addresses: bool = False
@@ -75,8 +122,10 @@ class EntranceState(pc.State):
     sms_address: str = ""
     #
     # For the SendingTimeDashboard inheriting class.
-    send_timing: str = ""
+    # Names of the chosen sending days, like 'MONDAY'.
+    send_days: List[str] = []
     send_hour: str = ""
+    send_timezone: str = config.DEFAULT_TIMEZONE
 
     @pc.var
     def is_authenticated(self) -> bool:
@@ -84,42 +133,39 @@ class EntranceState(pc.State):
 
         Returns:
             bool: True if has logged, False otherwise."""
-        return bool(self._user)
+        return bool(self._user_id)
+
+    @pc.var
+    def user_feeds(self) -> List[List[str | int]]:
+        """A ComputedVar of the details of the feeds where the user is registered.
+
+        Returns:
+            List[List[str | int]]: Lists of feed image, title, description, id and website.
+        """
+        return [
+            summary.details()
+            for summary in catalog.CATALOG.summaries(self.subscribed_feeds_ids)
+        ]
 
     def reload(self) -> None:
         """Resets the entrance page components when it's reloaded."""
-        self._user = False
+        self._user_id = 0
         self.username = ""
+        self.session_username = ""
         self.password = ""
         self.is_clicked = False
         self.message = ""
 
     def prepare_feeds_data(self) -> None:
         """Prepare the necessary data about feeds.
-        Feeds links dicts and feeds details lists.  
+        Only the ids of the user feeds, the details of all feeds are shared by the catalog.
         """
-        suggested_feeds_data = databaseapi.get_feeds_set()
-        suggested_feeds = [
-            feed.FeedFactory.create(feed_data[0], feed_data[1])
-            for feed_data in suggested_feeds_data
-        ]
-        print("I will prepare")
-        self.websites_links = {feed.id: feed.website for feed in suggested_feeds}
-        if self._user:
-            if self._user.feeds:
-                self.available_feeds = [
-                    prepare_specific_feed_details(feed)
-                    for feed in suggested_feeds
-                    if feed not in self._user.feeds.collection
-                ]
-                self.user_feeds = [
-                    prepare_specific_feed_details(feed)
-                    for feed in self._user.feeds.collection
-                ]
-            else:
-                self.available_feeds = [
-                    prepare_specific_feed_details(feed) for feed in suggested_feeds
-                ]
+        user = get_session_user(self._user_id)
+        self.subscribed_feeds_ids = (
+            sorted(feed.id for feed in user.feeds.collection)
+            if user and user.feeds
+            else []
+        )
 
     def initialize_feeds_status(self) -> None:
         """Initialize user feeds Status.
@@ -127,58 +173,110 @@ class EntranceState(pc.State):
         """
         # First of all, prepare the necessary feeds lists.
         self.prepare_feeds_data()
-        self.has_feeds = check_feeds_existence(self._user)
-        # ? from this line on... it's needed if the dictionories doesn't helpful
-        for feed_details in self.user_feeds:
-            self.user_feeds_status[feed_details[3]] = True  # ?
-            self.available_feeds_status[feed_details[3]] = False  # ?
-        for feed_details in self.available_feeds:  # ?
-            self.available_feeds_status[feed_details[3]] = True  # ?
-            self.user_feeds_status[feed_details[3]] = False  # ?
+        self.has_feeds = check_feeds_existence(get_session_user(self._user_id))
+        self.catalog_query = ""
+        self.catalog_page = 0
+        load_available_feeds(self)
 
     def initialize_user_addresses(self) -> None:
         """Initialize user addresses,
         so that they will be available for display in the input boxes by default.
         """
         if self.has_addresses:
-            for address_key, address in self._user.addresses.collection.items():
+            for address_key, address in get_session_user(
+                self._user_id
+            ).addresses.collection.items():
                 self.__dict__[f"{address_key}_address"] = address.address
 
     def initialize_user_sending_time(self) -> None:
         """Initialize user sending time preference."""
-        if self._user and self._user.sending_time:
-            self.send_timing = self._user.sending_time.sending_time.strftime("%H:%M")
-            self.send_hour = self._user.sending_time.sending_schedule.name.capitalize()
+        user = get_session_user(self._user_id)
+        if user and user.sending_time:
+            self.send_hour = user.sending_time.sending_time.strftime("%H:%M")
+            self.send_days = [
+                day.name
+                for day in time.WeekDays
+                if day in user.sending_time.sending_days
+            ]
+            self.send_timezone = user.sending_time.time_zone
+
+    def initialize_dashboard(self) -> None:
+        """Initialize the dashboard vars of the logged in user,
+        from it's already loaded properties [see load_user_properties].
+        """
+        self.initialize_feeds_status()
+        self.has_addresses = bool(get_session_user(self._user_id).addresses)
+        self.initialize_user_addresses()
+        self.initialize_user_sending_time()
 
-    def log_in(self) -> pc.event.EventSpec | None:
+    async def log_in(self) -> pc.event.EventSpec | None:
         """Log in the current user.
         And redirect into the dashboard view page (if the login was successful).
+        The password check and the queries are run by the executors,
+        unless too many passwords operations are pending.
         """
         self.is_clicked = True
         self.message = ""
         try:
-            self._user = userentrancecontrol.log_in(self.username, self.password)
-            self.initialize_feeds_status()
-            self.has_addresses = bool(self._user.addresses)
-            self.initialize_user_addresses()
-            self.initialize_user_sending_time()
+            user = await executors.run_password_operation(
+                userentrancecontrol.log_in,
+                self.username,
+                self.password,
+                self.get_client_ip(),
+            )
+            self.session_username = await executors.run_blocking(
+                executors.DATABASE_EXECUTOR, load_user_properties, user
+            )
+            self._user_id = register_session_user(user)
+            self.initialize_dashboard()
             self.message = "Login successful!"
             return pc.redirect("/dashboard")
         except Exception as e:
             self.message = str(e)
 
-    def sign_up(self) -> pc.event.EventSpec | None:
-        """Sign up for new users."""
+    async def sign_up(self) -> pc.event.EventSpec | None:
+        """Sign up for new users.
+        The password hashing and the queries are run by the executors,
+        unless too many passwords operations are pending.
+        """
         self.is_clicked = True
         self.message = ""
         try:
-            self._user = userentrancecontrol.sign_up(self.username, self.password)
+            self._user_id = register_session_user(
+                await executors.run_password_operation(
+                    userentrancecontrol.sign_up,
+                    self.username,
+                    self.password,
+                    self.get_client_ip(),
+                )
+            )
+            self.session_username = self.username
             self.message = """Sign Up Success! Please white until user dashboard will be available \nand set your favorite feeds, addresses and sending time."""
             return pc.redirect("/dashboard")
         except Exception as e:
             self.message = str(e)
 
 
+
+def load_available_feeds(state: EntranceState) -> None:
+    """Loads the current page of the feeds where the user of the session is unregistered,
+    that match the current search query.
+    It's a function, so the dashboard states can call it as well,
+    since the methods of a pynecone state are event handlers that only it can call.
+
+    Args:
+        state (EntranceState): The state of the session, or one of it's dashboard states.
+    """
+    catalog_page = catalog.CATALOG.page(
+        state.catalog_query,
+        state.subscribed_feeds_ids,
+        state.catalog_page,
+        config.FEEDS_CATALOG_PAGE_SIZE,
+    )
+    state.available_feeds = catalog_page.details
+    state.catalog_page = catalog_page.page
+    state.catalog_pages_number = catalog_page.pages_number
+
 def entrance_message() -> pc.Component:
     """Generates conditional component message, accordance the backend occurrence.
 
@@ -0,0 +1,84 @@
+"""Executors for the blocking work of the event handlers.
+The event handlers run on the event loop of the server, so the bcrypt hashing, the database queries
+and the http requests they require are run by bounded pools of worker threads,
+and the loop keeps serving the other clients meanwhile.
+The passwords operations are bounded before they are handed off to their pool,
+so a burst of them is rejected immediately instead of queued by it.
+"""
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+import functools
+import threading
+from typing import Any, Callable, TypeVar
+
+from contentaggregator.lib import config
+from contentaggregator.lib import exceptions
+from contentaggregator.lib.metrics import METRICS
+
+T = TypeVar("T")
+
+# Passwords operations, they wait for the passwords hashing processes [see pwdhandler.HASHING_POOL].
+PASSWORDS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=config.WEBSITE_PASSWORDS_WORKERS, thread_name_prefix="passwords"
+)
+# Passwords operations that were handed off to PASSWORDS_EXECUTOR and are not done yet.
+_PASSWORDS_SLOTS = threading.BoundedSemaphore(config.PASSWORDS_HASHING_MAX_PENDING)
+# Database queries of the users settings.
+DATABASE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=config.WEBSITE_DATABASE_WORKERS, thread_name_prefix="database"
+)
+# Addresses validation by http requests [RapidAPI], followed by their database update.
+VALIDATION_EXECUTOR = ThreadPoolExecutor(
+    max_workers=config.WEBSITE_VALIDATION_WORKERS, thread_name_prefix="validation"
+)
+
+
+async def run_blocking(
+    executor: Executor, function: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Runs the given blocking function by the given executor, without blocking the event loop.
+
+    Args:
+        executor (Executor): The executor to run the function by.
+        function (Callable[..., T]): The blocking function.
+        args (Any): Positional arguments of the function.
+        kwargs (Any): Keyword arguments of the function.
+
+    Returns:
+        T: The result of the function, it's exception is raised if it failed.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(function, *args, **kwargs)
+    )
+
+
+async def run_password_operation(
+    function: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Runs the given passwords operation [like a login] by PASSWORDS_EXECUTOR, without blocking the event loop.
+    It's rejected before it's handed off if PASSWORDS_HASHING_MAX_PENDING operations are not done yet.
+
+    Args:
+        function (Callable[..., T]): The blocking function.
+        args (Any): Positional arguments of the function.
+        kwargs (Any): Keyword arguments of the function.
+
+    Raises:
+        exceptions.ServerBusy: If there are already PASSWORDS_HASHING_MAX_PENDING pending operations.
+
+    Returns:
+        T: The result of the function, it's exception is raised if it failed.
+    """
+    if not _PASSWORDS_SLOTS.acquire(blocking=False):
+        METRICS.increment("passwords_operations_rejected")
+        raise exceptions.ServerBusy(
+            "The server is busy, please try again in a few seconds."
+        )
+    try:
+        future = PASSWORDS_EXECUTOR.submit(function, *args, **kwargs)
+    except BaseException:
+        _PASSWORDS_SLOTS.release()
+        raise
+    # Released once the operation is done, even if the awaiting handler is cancelled before.
+    future.add_done_callback(lambda _: _PASSWORDS_SLOTS.release())
+    return await asyncio.wrap_future(future)
@@ -1,6 +1,15 @@
 """Website module for users entrance management"""
+import threading
+import time
+
 import pynecone as pc
+from starlette.staticfiles import StaticFiles
 
+from contentaggregator.lib import config
+from contentaggregator.lib.metrics import METRICS
+from contentaggregator.lib.user.userauthentications import pwdhandler
+from contentaggregator.lib.user.userauthentications.throttling import LOGIN_THROTTLE
+from . import catalog
 from . import entrance
 from . import dashboard
 
@@ -78,9 +87,28 @@ def index() -> pc.Component:
         background_image="/homepage_back.png",
     )
 
+def report_metrics() -> None:
+    """Prints the passwords hashing and the entrance throttling metrics,
+    every config.METRICS_REPORT_INTERVAL seconds, for the lifetime of the process.
+    """
+    while True:
+        time.sleep(config.METRICS_REPORT_INTERVAL)
+        # TODO log it
+        print(METRICS.report())
+        print(pwdhandler.HASHING_POOL.info())
+        print(LOGIN_THROTTLE.info())
+
+
 # Create app.
 app = pc.App(state=entrance.EntranceState)
 
+# Serve the messages thumbnails [see contentaggregator.lib.thumbnails].
+app.api.mount(
+    config.THUMBNAILS_ROUTE,
+    StaticFiles(directory=config.THUMBNAILS_DIRECTORY, check_dir=False),
+    name="thumbnails",
+)
+
 app.add_page(
     index,
     title="Content Aggregation",
@@ -110,3 +138,9 @@ app.add_page(
 )
 
 app.compile()
+
+# The catalog of the feeds is shared by all sessions, and built and refreshed in the background.
+catalog.CATALOG.start()
+
+# The hash latency, it's queue depth and the throttled attempts are reported in the background.
+threading.Thread(target=report_metrics, daemon=True).start()
@@ -0,0 +1,39 @@
+"""Tests of the DeliveryPool channels isolation."""
+
+import threading
+import time
+
+from contentaggregator.lib.deliverypool import DeliveryPool
+
+
+def test_slow_limited_channel_does_not_delay_other_channels():
+    pool = DeliveryPool(4, 100, {"phone": 1, "email": 2})
+    pool.start()
+    release_phone = threading.Event()
+    email_done = threading.Event()
+    try:
+        # A backlog on the phone channel, larger than all the workers of the pool.
+        for _ in range(10):
+            pool.submit("phone", release_phone.wait, 5)
+        start = time.monotonic()
+        pool.submit("email", email_done.set)
+        assert email_done.wait(1)
+        assert time.monotonic() - start < 0.5
+        assert pool.free_slots("phone") == 100 - 9
+        assert pool.free_slots("email") == 100
+    finally:
+        release_phone.set()
+        pool.shutdown()
+
+
+def test_unlimited_channels_share_a_queue():
+    pool = DeliveryPool(2, 10, {"phone": 1})
+    pool.submit("email", lambda: None)
+    pool.submit("sms", lambda: None)
+    assert pool.free_slots("email") == pool.free_slots("sms") == 8
+    assert pool.free_slots("phone") == 10
+    assert pool.stats().queue_depth == 2
+    pool.start()
+    pool.join()
+    pool.shutdown()
+    assert pool.stats().completed_tasks == 2
@@ -0,0 +1,51 @@
+"""Tests of the website executors passwords operations bound."""
+
+import asyncio
+import os
+import threading
+
+# The configuration requires the deployment secrets, they are not used by these tests.
+for name in (
+    "SQL_USERNAME",
+    "SQL_HOST",
+    "SQL_PASSWORD",
+    "DATABASE_NAME",
+    "RAPID_API_KEY",
+    "EMAIL_SENDER_ADDRESS",
+    "EMAIL_SENDER_PWD",
+):
+    os.environ.setdefault(name, "test")
+
+from contentaggregator.lib import config, exceptions
+from contentaggregator.website.website import executors
+
+
+def test_passwords_burst_beyond_the_cap_is_rejected():
+    release = threading.Event()
+    burst = config.PASSWORDS_HASHING_MAX_PENDING + 10
+
+    async def run_burst():
+        tasks = [
+            asyncio.ensure_future(executors.run_password_operation(release.wait, 5))
+            for _ in range(burst)
+        ]
+        # The rejected operations fail before they are handed off to a thread.
+        await asyncio.sleep(0.1)
+        rejected = [
+            task
+            for task in tasks
+            if task.done() and isinstance(task.exception(), exceptions.ServerBusy)
+        ]
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # The slots are released once the operations are done.
+        after = await executors.run_password_operation(lambda: "done")
+        return rejected, results, after
+
+    try:
+        rejected, results, after = asyncio.run(run_burst())
+    finally:
+        release.set()
+    assert len(rejected) == 10
+    assert results.count(True) == config.PASSWORDS_HASHING_MAX_PENDING
+    assert after == "done"